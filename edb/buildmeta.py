@@ -44,7 +44,7 @@ from edb.common import verutils
 
 
 # Increment this whenever the database layout or stdlib changes.
-EDGEDB_CATALOG_VERSION = 2022_09_29_00_00
+EDGEDB_CATALOG_VERSION = 2022_10_19_00_02
 EDGEDB_MAJOR_VERSION = 3
 
 
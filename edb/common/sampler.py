@@ -0,0 +1,119 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""A sampling profiler cheap enough to leave running in production.
+
+The stack of the main thread is sampled on SIGPROF, which the ITIMER_PROF
+interval timer sends after every 1/rate seconds of CPU time consumed by
+the process, so an idle process costs nothing.  Samples are aggregated
+in "collapsed stacks" form: one line per distinct stack, with the frames
+from the outermost one separated by semicolons and followed by the number
+of samples, which `edb flamegraph` renders into an SVG flame graph.
+"""
+
+from __future__ import annotations
+from typing import *
+
+import signal
+import types
+
+
+# Frames deeper than that are not recorded, which keeps the cost of
+# a sample bounded on runaway recursion.
+MAX_DEPTH = 256
+
+
+class StackSampler:
+    """Samples the stack of the main thread of the process.
+
+    There can only be one running sampler per process, as it takes over
+    the SIGPROF handler.
+    """
+
+    def __init__(self, label: str) -> None:
+        # The root frame of all collected stacks, e.g. "server".
+        self._label = label
+        self._rate = 0
+        self._stacks: Dict[Tuple[types.CodeType, ...], int] = {}
+
+    @property
+    def rate(self) -> int:
+        return self._rate
+
+    def start(self, rate: int) -> None:
+        """Start sampling `rate` times per second of CPU time.
+
+        A `rate` of 0 stops the sampler.
+        """
+        if rate <= 0:
+            self.stop()
+            return
+
+        signal.signal(signal.SIGPROF, self._sample)
+        interval = 1 / rate
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        self._rate = rate
+
+    def stop(self) -> None:
+        if not self._rate:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        # Not SIG_DFL, which terminates the process on a stray SIGPROF.
+        signal.signal(signal.SIGPROF, signal.SIG_IGN)
+        self._rate = 0
+        self._stacks = {}
+
+    def collect(self) -> Dict[str, int]:
+        """Return the stacks sampled since the previous call."""
+        stacks, self._stacks = self._stacks, {}
+        result: Dict[str, int] = {}
+        for codes, count in stacks.items():
+            frames = [self._label]
+            frames.extend(_frame_name(code) for code in reversed(codes))
+            stack = ';'.join(frames)
+            result[stack] = result.get(stack, 0) + count
+        return result
+
+    def _sample(self, signum: int, frame: Optional[types.FrameType]) -> None:
+        codes: List[types.CodeType] = []
+        while frame is not None and len(codes) < MAX_DEPTH:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        key = tuple(codes)
+        stacks = self._stacks
+        stacks[key] = stacks.get(key, 0) + 1
+
+
+def _frame_name(code: types.CodeType) -> str:
+    # Semicolons separate the frames of a stack.
+    name = code.co_name.replace(';', ':')
+    filename = code.co_filename.replace(';', ':')
+    return f'{name} ({filename}:{code.co_firstlineno})'
+
+
+def merge_collapsed(
+    target: Dict[str, int],
+    stacks: Mapping[str, int],
+) -> None:
+    for stack, count in stacks.items():
+        target[stack] = target.get(stack, 0) + count
+
+
+def format_collapsed(stacks: Mapping[str, int]) -> str:
+    return ''.join(
+        f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
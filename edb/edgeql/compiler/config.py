@@ -27,6 +27,8 @@ import json
 
 from edb import errors
 
+from edb.common import parsing
+
 from edb.edgeql import qltypes
 
 from edb.ir import ast as irast
@@ -59,6 +61,9 @@ class SettingInfo(NamedTuple):
     requires_restart: bool
     backend_setting: str | None
     affects_compilation: bool
+    # Bounds of std::min_value and std::max_value constraints.
+    min_value: Any = None
+    max_value: Any = None
 
 
 @dispatch.compile.register
@@ -96,6 +101,9 @@ def compile_ConfigSet(
             context=expr.expr.context
         ) from e
     else:
+        if val is not None:
+            _check_bounds(info, val, context=expr.expr.context)
+
         if isinstance(val, statypes.ScalarType) and info.backend_setting:
             backend_expr = dispatch.compile(
                 qlast.StringConstant.from_python(val.to_backend_str()),
@@ -289,6 +297,47 @@ def _validate_global_op(
                        affects_compilation=False)
 
 
+def _check_bounds(
+    info: SettingInfo,
+    val: Any,
+    *,
+    context: Optional[parsing.ParserContext],
+) -> None:
+    if info.min_value is not None and val < info.min_value:
+        raise errors.ConfigurationError(
+            f'invalid setting value for {info.param_name}: '
+            f'minimum allowed value is {info.min_value}',
+            context=context,
+        )
+    if info.max_value is not None and val > info.max_value:
+        raise errors.ConfigurationError(
+            f'invalid setting value for {info.param_name}: '
+            f'maximum allowed value is {info.max_value}',
+            context=context,
+        )
+
+
+def _get_bounds(
+    ptr: s_pointers.Pointer, *,
+    ctx: context.ContextLevel,
+) -> Tuple[Any, Any]:
+    schema = ctx.env.schema
+    bounds = {}
+    for constr in ptr.get_constraints(schema).objects(schema):
+        shortname = str(constr.get_shortname(schema))
+        if shortname not in ('std::min_value', 'std::max_value'):
+            continue
+        args = constr.get_args(schema)
+        assert args is not None
+        [arg] = args
+        with ctx.new() as subctx:
+            arg_ir = dispatch.compile(arg.qlast, ctx=subctx)
+        bounds[shortname] = ireval.evaluate_to_python_val(
+            arg_ir, schema=ctx.env.schema)
+
+    return bounds.get('std::min_value'), bounds.get('std::max_value')
+
+
 def _validate_op(
         expr: qlast.ConfigOp, *,
         ctx: context.ContextLevel) -> SettingInfo:
@@ -401,10 +450,14 @@ def _validate_op(
             f'{name!r} is a system-level configuration parameter; '
             f'use "CONFIGURE INSTANCE"')
 
+    min_value, max_value = _get_bounds(ptr, ctx=ctx)
+
     return SettingInfo(param_name=name,
                        param_type=cfg_type,
                        cardinality=cardinality,
                        required=False,
                        requires_restart=requires_restart,
                        backend_setting=backend_setting,
-                       affects_compilation=affects_compilation)
+                       affects_compilation=affects_compilation,
+                       min_value=min_value,
+                       max_value=max_value)
@@ -46,3 +46,7 @@ class GraphQLValidationError(GraphQLTranslationError):
 
 class GraphQLCoreError(GraphQLError):
     pass
+
+
+class GraphQLPersistedQueryNotFoundError(GraphQLError):
+    pass
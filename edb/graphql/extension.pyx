@@ -26,6 +26,7 @@ from typing import (
 )
 
 import cython
+import hashlib
 import http
 import json
 import logging
@@ -39,6 +40,7 @@ from edb.graphql import errors as gql_errors
 from edb.server.dbview cimport dbview
 from edb.server import compiler
 from edb.server import defines as edbdef
+from edb.server import metrics
 from edb.server.pgcon import errors as pgerrors
 from edb.server.protocol import execute
 
@@ -55,6 +57,7 @@ _USER_ERRORS = (
     _graphql_rewrite.SyntaxError,
     _graphql_rewrite.NotFoundError,
 )
+_HEX_DIGITS = frozenset('0123456789abcdef')
 
 @cython.final
 cdef class CacheRedirect:
@@ -64,6 +67,16 @@ cdef class CacheRedirect:
         self.key_vars = key_vars
 
 
+@cython.final
+cdef class PersistedQuery:
+    cdef public str query
+    cdef public dict rewrites  # operation name -> rewritten query
+
+    def __init__(self, query: str):
+        self.query = query
+        self.rewrites = {}
+
+
 CacheEntry = Union[
     CacheRedirect,
     Tuple[compiler.QueryUnitGroup, translator.TranspiledOperation],
@@ -92,6 +105,8 @@ async def handle_request(
     variables = None
     globals = None
     query = None
+    extensions = None
+    query_hash = None
 
     try:
         if request.method == b'POST':
@@ -104,6 +119,7 @@ async def handle_request(
                 operation_name = body.get('operationName')
                 variables = body.get('variables')
                 globals = body.get('globals')
+                extensions = body.get('extensions')
             elif request.content_type == 'application/graphql':
                 query = request.body.decode('utf-8')
             else:
@@ -139,10 +155,23 @@ async def handle_request(
                         raise TypeError(
                             '"globals" must be a JSON object')
 
+                extensions = qs.get('extensions')
+                if extensions is not None:
+                    try:
+                        extensions = json.loads(extensions[0])
+                    except Exception:
+                        raise TypeError(
+                            '"extensions" must be a JSON object')
+
         else:
             raise TypeError('expected a GET or a POST request')
 
-        if not query:
+        if extensions is not None:
+            if not isinstance(extensions, dict):
+                raise TypeError('"extensions" must be a JSON object')
+            query_hash = _get_persisted_query_hash(extensions, query)
+
+        if not query and query_hash is None:
             raise TypeError('invalid GraphQL request: query is missing')
 
         if (operation_name is not None and
@@ -168,7 +197,8 @@ async def handle_request(
     response.content_type = b'application/json'
     try:
         result = await _execute(
-            db, server, query, operation_name, variables, globals)
+            db, server, query, query_hash, operation_name, variables,
+            globals, request.turn)
     except Exception as ex:
         if debug.flags.server:
             markup.dump(ex)
@@ -188,11 +218,91 @@ async def handle_request(
                 hasattr(ex, 'col')):
             err_dct['locations'] = [{'line': ex.line, 'column': ex.col}]
 
+        if isinstance(ex, gql_errors.GraphQLPersistedQueryNotFoundError):
+            # The code Apollo clients look for before retrying with
+            # the full query text.
+            err_dct['extensions'] = {'code': 'PERSISTED_QUERY_NOT_FOUND'}
+
         response.body = json.dumps({'errors': [err_dct]}).encode()
     else:
         response.body = b'{"data":' + result + b'}'
 
 
+def _get_persisted_query_hash(dict extensions, query):
+    pq = extensions.get('persistedQuery')
+    if pq is None:
+        return None
+
+    if not isinstance(pq, dict) or pq.get('version') != 1:
+        raise TypeError('unsupported "persistedQuery" version')
+
+    query_hash = pq.get('sha256Hash')
+    if (
+        not isinstance(query_hash, str)
+        or len(query_hash) != 64
+        or not _HEX_DIGITS.issuperset(query_hash.lower())
+    ):
+        raise TypeError('"sha256Hash" must be a hex-encoded SHA-256 hash')
+    query_hash = query_hash.lower()
+
+    if query and (
+        hashlib.sha256(query.encode('utf-8')).hexdigest() != query_hash
+    ):
+        raise TypeError('"sha256Hash" does not match the query')
+
+    return query_hash
+
+
+async def _get_persisted_query(db, server, str query_hash, query, turn):
+    persisted = db.lookup_persisted_graphql_query(query_hash)
+    if persisted is not None:
+        return persisted
+
+    if query and turn is not None:
+        # Registering the query writes to the database, even with GET,
+        # so the pipelined requests received before it have to be done.
+        await turn.start(False)
+
+    pgcon = await server.acquire_pgcon(db.name)
+    try:
+        if query:
+            # The query has been checked against its hash already.
+            await pgcon.sql_fetch(
+                b'INSERT INTO edgedb._graphql_persisted_query '
+                b'(hash, query) VALUES ($1, $2) '
+                b'ON CONFLICT (hash) DO NOTHING',
+                args=(query_hash.encode(), query.encode('utf-8')),
+            )
+        else:
+            data = await pgcon.sql_fetch_val(
+                b'SELECT query FROM edgedb._graphql_persisted_query '
+                b'WHERE hash = $1',
+                args=(query_hash.encode(),),
+            )
+            if data is None:
+                raise gql_errors.GraphQLPersistedQueryNotFoundError(
+                    'PersistedQueryNotFound')
+            query = data.decode('utf-8')
+    finally:
+        server.release_pgcon(db.name, pgcon)
+
+    persisted = PersistedQuery(query)
+    db.cache_persisted_graphql_query(query_hash, persisted)
+    return persisted
+
+
+cdef _rewrite(PersistedQuery persisted, operation_name, query):
+    if persisted is None:
+        return _graphql_rewrite.rewrite(operation_name, query)
+
+    # Persisted queries are only rewritten once per operation.
+    rewritten = persisted.rewrites.get(operation_name)
+    if rewritten is None:
+        rewritten = _graphql_rewrite.rewrite(operation_name, query)
+        persisted.rewrites[operation_name] = rewritten
+    return rewritten
+
+
 async def compile(
     db,
     server,
@@ -218,9 +328,24 @@ async def compile(
     )
 
 
-async def _execute(db, server, query, operation_name, variables, globals):
+cdef int _estimate_entry_size(str prepared_query, object qug):
+    # A rough estimate of the memory taken by a cache entry: the parts
+    # that grow with the query, plus a fixed overhead for the rest.
+    cdef int size = 512 + len(prepared_query)
+    size += len(qug.out_type_data) + len(qug.in_type_data)
+    for unit in qug:
+        for sql in unit.sql:
+            size += len(sql)
+    return size
+
+
+async def _execute(
+    db, server, query, query_hash, operation_name, variables, globals,
+    turn
+):
+    cdef PersistedQuery persisted = None
+
     dbver = db.dbver
-    query_cache = server._http_query_cache
 
     if variables:
         for var_name in variables:
@@ -231,13 +356,18 @@ async def _execute(db, server, query, operation_name, variables, globals):
     query_cache_enabled = not (
         debug.flags.disable_qcache or debug.flags.graphql_compile)
 
+    if query_hash is not None:
+        persisted = await _get_persisted_query(
+            db, server, query_hash, query, turn)
+        query = persisted.query
+
     if debug.flags.graphql_compile:
         debug.header('Input graphql')
         print(query)
         print(f'variables: {variables}')
 
     try:
-        rewritten = _graphql_rewrite.rewrite(operation_name, query)
+        rewritten = _rewrite(persisted, operation_name, query)
 
         vars = rewritten.variables().copy()
         if variables:
@@ -267,17 +397,22 @@ async def _execute(db, server, query, operation_name, variables, globals):
             print(f'key_vars: {key_var_names}')
             print(f'variables: {vars}')
 
-    cache_key = ('graphql', prepared_query, key_vars, operation_name, dbver)
+    # The cache is per database and is purged whenever its schema
+    # changes, so the keys don't need to include either.
+    cache_key = (prepared_query, key_vars, operation_name)
     use_prep_stmt = False
 
     entry: CacheEntry = None
     if query_cache_enabled:
-        entry = query_cache.get(cache_key, None)
+        entry = db.lookup_graphql_query(cache_key)
 
-    if isinstance(entry, CacheRedirect):
-        key_vars2 = tuple(vars[k] for k in entry.key_vars)
-        cache_key2 = (prepared_query, key_vars2, operation_name, dbver)
-        entry = query_cache.get(cache_key2, None)
+        if isinstance(entry, CacheRedirect):
+            key_vars2 = tuple(vars[k] for k in entry.key_vars)
+            cache_key2 = (prepared_query, key_vars2, operation_name)
+            entry = db.lookup_graphql_query(cache_key2)
+
+        metrics.graphql_query_cache_lookups.inc(
+            1.0, db.name, 'miss' if entry is None else 'hit')
 
     if entry is None:
         if rewritten is not None:
@@ -301,25 +436,35 @@ async def _execute(db, server, query, operation_name, variables, globals):
                 vars,
             )
 
-        key_var_set = set(key_var_names)
-        if gql_op.cache_deps_vars and gql_op.cache_deps_vars != key_var_set:
-            key_var_set.update(gql_op.cache_deps_vars)
-            key_var_names = sorted(key_var_set)
-            redir = CacheRedirect(key_vars=key_var_names)
-            query_cache[cache_key] = redir
-            key_vars2 = tuple(vars[k] for k in key_var_names)
-            cache_key2 = (
-                'graphql', prepared_query, key_vars2, operation_name, dbver
-            )
-            query_cache[cache_key2] = qug, gql_op
-        else:
-            query_cache[cache_key] = qug, gql_op
+        if query_cache_enabled:
+            size = _estimate_entry_size(prepared_query, qug)
+            key_var_set = set(key_var_names)
+            if (
+                gql_op.cache_deps_vars
+                and gql_op.cache_deps_vars != key_var_set
+            ):
+                key_var_set.update(gql_op.cache_deps_vars)
+                key_var_names = sorted(key_var_set)
+                redir = CacheRedirect(key_vars=key_var_names)
+                db.cache_graphql_query(
+                    cache_key, redir, len(prepared_query), dbver)
+                key_vars2 = tuple(vars[k] for k in key_var_names)
+                cache_key2 = (prepared_query, key_vars2, operation_name)
+                db.cache_graphql_query(
+                    cache_key2, (qug, gql_op), size, dbver)
+            else:
+                db.cache_graphql_query(
+                    cache_key, (qug, gql_op), size, dbver)
     else:
         qug, gql_op = entry
         # This is at least the second time this query is used
         # and it's safe to cache.
         use_prep_stmt = True
 
+    if turn is not None:
+        # Pipelined queries run concurrently, mutations run in order.
+        await turn.start(not qug.capabilities)
+
     compiled = dbview.CompiledQuery(query_unit_group=qug)
 
     dbv = await server.new_dbview(
@@ -328,7 +473,10 @@ async def _execute(db, server, query, operation_name, variables, globals):
         protocol_version=edbdef.CURRENT_PROTOCOL,
     )
 
-    pgcon = await server.acquire_pgcon(db.name)
+    pgcon = await server.acquire_pgcon(
+        db.name,
+        state=(<dbview.DatabaseConnectionView>dbv).serialize_state(),
+    )
     try:
         return await execute.execute_json(
             pgcon,
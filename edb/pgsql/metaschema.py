@@ -122,6 +122,27 @@ class DMLDummyTable(dbops.Table):
     '''
 
 
+class GraphQLPersistedQueryTable(dbops.Table):
+    """GraphQL documents registered by clients as persisted queries.
+
+    The documents are keyed by the hex-encoded SHA-256 of their text.
+    """
+    def __init__(self) -> None:
+        super().__init__(name=('edgedb', '_graphql_persisted_query'))
+
+        self.add_columns([
+            dbops.Column(name='hash', type='text'),
+            dbops.Column(name='query', type='text'),
+        ])
+
+        self.add_constraint(
+            dbops.UniqueConstraint(
+                table_name=('edgedb', '_graphql_persisted_query'),
+                columns=['hash'],
+            ),
+        )
+
+
 class ExpressionType(dbops.CompositeType):
     def __init__(self) -> None:
         super().__init__(name=('edgedb', 'expression_t'))
@@ -4089,6 +4110,7 @@ async def bootstrap(
         dbops.CreateTable(DBConfigTable()),
         dbops.CreateTable(DMLDummyTable()),
         dbops.Query(DMLDummyTable.SETUP_QUERY),
+        dbops.CreateTable(GraphQLPersistedQueryTable()),
         dbops.CreateFunction(IntervalToMillisecondsFunction()),
         dbops.CreateFunction(SafeIntervalCastFunction()),
         dbops.CreateFunction(QuoteIdentFunction()),
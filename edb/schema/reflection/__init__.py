@@ -18,6 +18,7 @@
 
 
 from .reader import parse_into, SchemaClassLayout
+from .reader import parse_changes_into, get_changed_objects_closure
 from .structure import generate_structure
 from .structure import SchemaTypeLayout
 from .writer import write_meta
@@ -26,6 +27,8 @@ __all__ = (
     'generate_structure',
     'write_meta',
     'parse_into',
+    'parse_changes_into',
+    'get_changed_objects_closure',
     'SchemaTypeLayout',
     'SchemaClassLayout',
 )
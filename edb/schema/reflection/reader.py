@@ -218,7 +218,8 @@ def parse_into(
         id_to_data[objid] = tuple(objdata)
 
     for objid, updates in refdict_updates.items():
-        if updates:
+        # Objects that are not being (re-)loaded already have those.
+        if updates and objid in id_to_data:
             sclass = s_obj.ObjectMeta.get_schema_class(id_to_type[objid])
             updated_data = list(id_to_data[objid])
             for fn, v in updates.items():
@@ -254,7 +255,8 @@ def parse_into(
         id_to_data=schema._id_to_data.update(id_to_data),
         name_to_id=schema._name_to_id.update(name_to_id),
         shortname_to_id=schema._shortname_to_id.update(
-            (k, frozenset(v)) for k, v in shortname_to_id.items()
+            (k, schema._shortname_to_id.get(k, frozenset()) | v)
+            for k, v in shortname_to_id.items()
         ),
         globalname_to_id=schema._globalname_to_id.update(globalname_to_id),
         refs_to=mm.finish(),
@@ -263,6 +265,82 @@ def parse_into(
     return schema
 
 
+def get_changed_objects_closure(
+    schema: s_schema.FlatSchema,
+    object_ids: Iterable[uuid.UUID],
+) -> Set[uuid.UUID]:
+    """Return ids of the objects to reload to apply the given changes.
+
+    Some properties of an object are reflected on the link from the
+    object that contains it in a refdict, so the containers of the
+    changed objects, and their containers in turn, have to be reloaded
+    along with them.
+    """
+
+    result = set(object_ids)
+    pending = list(result)
+    while pending:
+        obj = schema.get_by_id(pending.pop(), default=None)
+        if obj is None:
+            continue
+        for (mcls, fn), referrers in schema.get_referrers_ex(obj).items():
+            if mcls.has_refdict(fn):
+                for referrer in referrers:
+                    if referrer.id not in result:
+                        result.add(referrer.id)
+                        pending.append(referrer.id)
+
+    return result
+
+
+def parse_changes_into(
+    std_schema: s_schema.FlatSchema,
+    global_schema: s_schema.FlatSchema,
+    schema: s_schema.FlatSchema,
+    data: Union[str, bytes],
+    object_ids: Iterable[uuid.UUID],
+    schema_class_layout: SchemaClassLayout,
+) -> s_schema.FlatSchema:
+    """Update the schema with the current state of some of its objects.
+
+    Args:
+        std_schema:
+            The standard library schema.
+        global_schema:
+            The global schema.
+        schema:
+            A user schema instance to update.
+        data:
+            A JSON-encoded schema object data of the objects that
+            still exist, as returned by an introspection query.
+        object_ids:
+            Ids of all created, altered and deleted objects, as
+            returned by :func:`get_changed_objects_closure`.
+        schema_class_layout:
+            A mapping describing schema class layout in the reflection.
+
+    Returns:
+        A schema instance derived from *schema*, so that the objects
+        that have not changed are shared with it.
+    """
+
+    for objid in object_ids:
+        obj = schema.get_by_id(objid, default=None)
+        if obj is not None:
+            schema = schema.delete(obj)
+
+    return parse_into(
+        base_schema=s_schema.ChainedSchema(
+            std_schema,
+            schema,
+            global_schema,
+        ),
+        schema=schema,
+        data=data,
+        schema_class_layout=schema_class_layout,
+    )
+
+
 def _parse_expression(val: Dict[str, Any]) -> s_expr.Expression:
     refids = frozenset(
         uuidgen.UUID(r) for r in val['refs']
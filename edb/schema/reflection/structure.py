@@ -93,6 +93,7 @@ class SchemaReflectionParts(NamedTuple):
     intro_schema_delta: sd.Command
     class_layout: Dict[Type[s_obj.Object], SchemaTypeLayout]
     local_intro_parts: List[str]
+    local_intro_objects_parts: List[str]
     global_intro_parts: List[str]
 
 
@@ -770,6 +771,7 @@ def generate_structure(schema: s_schema.Schema) -> SchemaReflectionParts:
                 read_shape.append(read_ptr)
 
     local_parts = []
+    local_objects_parts = []
     global_parts = []
     for py_cls, shape_els in read_sets.items():
         if (
@@ -788,19 +790,26 @@ def generate_structure(schema: s_schema.Schema) -> SchemaReflectionParts:
                 {shape}
             }}
         '''
+        # The same, restricted to the objects with the ids passed
+        # as a JSON array in $ids.
+        objects_qry = (
+            qry + ' FILTER .id IN <uuid>json_array_unpack(<json>$ids)')
         if not issubclass(py_cls, (s_types.Collection, s_obj.GlobalObject)):
             qry += ' FILTER NOT .builtin'
+            objects_qry += ' AND NOT .builtin'
 
         if issubclass(py_cls, s_obj.GlobalObject):
             global_parts.append(qry)
         else:
             local_parts.append(qry)
+            local_objects_parts.append(objects_qry)
 
     delta.canonical = True
     return SchemaReflectionParts(
         intro_schema_delta=delta,
         class_layout=classlayout,
         local_intro_parts=local_parts,
+        local_intro_objects_parts=local_objects_parts,
         global_intro_parts=global_parts,
     )
 
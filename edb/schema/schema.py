@@ -23,13 +23,13 @@ from typing import *
 
 import abc
 import collections
-import functools
 import itertools
 
 import immutables as immu
 
 from edb import errors
 from edb.common import english
+from edb.common import lru
 
 from . import casts as s_casts
 from . import functions as s_func
@@ -472,6 +472,89 @@ class Schema(abc.ABC):
         raise NotImplementedError
 
 
+# Lookups memoized per FlatSchema: the name of the map their results
+# only depend on, which makes the memoized results shared with derived
+# schemas for as long as it is unchanged, and the maximum number of
+# memoized results.
+_MEMO_TABLES: Dict[str, Tuple[Optional[str], int]] = {
+    'referrers': ('_refs_to', 4096),
+    'referrers_ex': ('_refs_to', 1024),
+    # Casts are filtered by their data too.
+    'casts': (None, 1024),
+    'functions': ('_shortname_to_id', 1024),
+    'operators': ('_shortname_to_id', 1024),
+    # Migrations are ordered by their data.
+    'last_migration': (None, 1),
+}
+
+_MISSING = object()
+
+
+class MemoStats:
+    """Hit-rate statistics of a memoized schema lookup."""
+
+    __slots__ = ('hits', 'misses')
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f'<{type(self).__name__} hits={self.hits} '
+            f'misses={self.misses}>')
+
+
+# Statistics of the memoized lookups of all schemas of the process.
+MEMO_STATS: Dict[str, MemoStats] = {
+    table: MemoStats() for table in _MEMO_TABLES
+}
+
+
+# Object ids grouped by the name of their schema class and by their
+# module (None for objects that are not qualified).
+_ObjectIndex = Dict[Tuple[str, Optional[sn.Name]], Tuple['uuid.UUID', ...]]
+
+
+# A difference between two immutables.Map instances: the set items,
+# the recursive differences of the changed items which are maps too,
+# and the deleted keys.
+_MapDelta = Tuple[
+    Tuple[Tuple[Any, Any], ...],
+    Tuple[Tuple[Any, Any], ...],
+    Tuple[Any, ...],
+]
+
+
+class FlatSchemaDelta(NamedTuple):
+    """A compact difference between two FlatSchema instances.
+
+    Obtained with FlatSchema.get_delta() and applied to the base schema
+    with FlatSchema.apply_delta().
+    """
+
+    base_generation: int
+    generation: int
+    id_to_data: _MapDelta
+    id_to_type: _MapDelta
+    name_to_id: _MapDelta
+    shortname_to_id: _MapDelta
+    globalname_to_id: _MapDelta
+    refs_to: _MapDelta
+
+    def get_changed_object_ids(self) -> Set[uuid.UUID]:
+        """Return ids of the created, altered and deleted objects."""
+        sets, _, deletes = self.id_to_data
+        changed = {obj_id for obj_id, _ in sets}
+        changed.update(deletes)
+        return changed
+
+
 class FlatSchema(Schema):
 
     _id_to_data: immu.Map[uuid.UUID, Tuple[Any, ...]]
@@ -487,6 +570,10 @@ class FlatSchema(Schema):
     ]
     _refs_to: Refs_T
     _generation: int
+    # Built on first use by get_objects() and never pickled.
+    _object_index: Optional[_ObjectIndex] = None
+    # Memoized lookups by table, also never pickled.
+    _memo: Optional[Dict[str, lru.LRUMapping]] = None
 
     def __init__(self) -> None:
         self._id_to_data = immu.Map()
@@ -548,8 +635,60 @@ class FlatSchema(Schema):
 
         new._generation = self._generation + 1
 
+        if (
+            new._id_to_type is self._id_to_type
+            and new._name_to_id is self._name_to_id
+            and self._object_index is not None
+        ):
+            # No object was created, deleted or renamed.
+            new._object_index = self._object_index
+
+        if self._memo:
+            shared = {}
+            for table, entries in self._memo.items():
+                depends_on = _MEMO_TABLES[table][0]
+                if (
+                    depends_on is not None
+                    and getattr(new, depends_on) is getattr(self, depends_on)
+                ):
+                    shared[table] = entries
+            if shared:
+                new._memo = shared
+
         return new
 
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('_object_index', None)
+        state.pop('_memo', None)
+        return state
+
+    def _memo_get(self, table: str, key: Hashable) -> Any:
+        """Return a memoized result of a lookup, or _MISSING."""
+        stats = MEMO_STATS[table]
+        if self._memo is not None:
+            entries = self._memo.get(table)
+            if entries is not None:
+                try:
+                    result = entries[key]
+                except KeyError:
+                    pass
+                else:
+                    stats.hits += 1
+                    return result
+
+        stats.misses += 1
+        return _MISSING
+
+    def _memo_set(self, table: str, key: Hashable, result: Any) -> None:
+        if self._memo is None:
+            self._memo = {}
+        entries = self._memo.get(table)
+        if entries is None:
+            entries = lru.LRUMapping(maxsize=_MEMO_TABLES[table][1])
+            self._memo[table] = entries
+        entries[key] = result
+
     def _update_obj_name(
         self,
         obj_id: uuid.UUID,
@@ -835,6 +974,7 @@ class FlatSchema(Schema):
         if not objfields:
             return self._refs_to
 
+        changed = False
         with self._refs_to.mutate() as mm:
             for field in objfields:
                 if not new_refs:
@@ -865,6 +1005,9 @@ class FlatSchema(Schema):
                     new_ids = None
                     old_ids = orig_ids
 
+                if new_ids or old_ids:
+                    changed = True
+
                 if new_ids:
                     for ref_id in new_ids:
                         try:
@@ -893,6 +1036,11 @@ class FlatSchema(Schema):
 
             result = mm.finish()
 
+        if not changed:
+            # Keep the map, and the lookups memoized for it, when
+            # the references are the same.
+            return self._refs_to
+
         return result
 
     def add_raw(
@@ -1122,7 +1270,6 @@ class FlatSchema(Schema):
                 type=s_oper.Operator,
             )
 
-    @functools.lru_cache()
     def _get_casts(
         self,
         stype: s_types.Type,
@@ -1131,6 +1278,26 @@ class FlatSchema(Schema):
         implicit: bool = False,
         assignment: bool = False,
     ) -> FrozenSet[s_casts.Cast]:
+        key = (stype, disposition, implicit, assignment)
+        result = self._memo_get('casts', key)
+        if result is _MISSING:
+            result = self._find_casts(
+                stype,
+                disposition=disposition,
+                implicit=implicit,
+                assignment=assignment,
+            )
+            self._memo_set('casts', key, result)
+        return cast(FrozenSet[s_casts.Cast], result)
+
+    def _find_casts(
+        self,
+        stype: s_types.Type,
+        *,
+        disposition: str,
+        implicit: bool,
+        assignment: bool,
+    ) -> FrozenSet[s_casts.Cast]:
 
         all_casts = cast(
             FrozenSet[s_casts.Cast],
@@ -1175,16 +1342,20 @@ class FlatSchema(Schema):
         scls_type: Optional[Type[so.Object_T]] = None,
         field_name: Optional[str] = None,
     ) -> FrozenSet[so.Object_T]:
-        return self._get_referrers(
-            scls, scls_type=scls_type, field_name=field_name)
+        key = (scls, scls_type, field_name)
+        result = self._memo_get('referrers', key)
+        if result is _MISSING:
+            result = self._find_referrers(
+                scls, scls_type=scls_type, field_name=field_name)
+            self._memo_set('referrers', key, result)
+        return cast(FrozenSet[so.Object_T], result)
 
-    @functools.lru_cache()
-    def _get_referrers(
+    def _find_referrers(
         self,
         scls: so.Object,
         *,
-        scls_type: Optional[Type[so.Object_T]] = None,
-        field_name: Optional[str] = None,
+        scls_type: Optional[Type[so.Object_T]],
+        field_name: Optional[str],
     ) -> FrozenSet[so.Object_T]:
 
         try:
@@ -1216,7 +1387,6 @@ class FlatSchema(Schema):
 
             return frozenset(referrers)  # type: ignore
 
-    @functools.lru_cache()
     def get_referrers_ex(
         self,
         scls: so.Object,
@@ -1225,6 +1395,25 @@ class FlatSchema(Schema):
     ) -> Dict[
         Tuple[Type[so.Object_T], str],
         FrozenSet[so.Object_T],
+    ]:
+        key = (scls, scls_type)
+        result = self._memo_get('referrers_ex', key)
+        if result is _MISSING:
+            result = self._find_referrers_ex(scls, scls_type=scls_type)
+            self._memo_set('referrers_ex', key, result)
+        return cast(
+            Dict[Tuple[Type[so.Object_T], str], FrozenSet[so.Object_T]],
+            result,
+        )
+
+    def _find_referrers_ex(
+        self,
+        scls: so.Object,
+        *,
+        scls_type: Optional[Type[so.Object_T]],
+    ) -> Dict[
+        Tuple[Type[so.Object_T], str],
+        FrozenSet[so.Object_T],
     ]:
         try:
             refs = self._refs_to[scls.id]
@@ -1383,9 +1572,83 @@ class FlatSchema(Schema):
     def has_object(self, object_id: uuid.UUID) -> bool:
         return object_id in self._id_to_type
 
+    def get_object_count(self) -> int:
+        return len(self._id_to_data)
+
+    def get_delta(self, base: FlatSchema) -> FlatSchemaDelta:
+        """Return the difference between *base* and this schema.
+
+        Object data is compared by identity, so the delta is only compact
+        if this schema was derived from *base*.  It might include objects
+        that were updated to an equivalent state, but it never misses
+        a created, altered or deleted object.
+        """
+        return FlatSchemaDelta(
+            base_generation=base._generation,
+            generation=self._generation,
+            id_to_data=_get_map_delta(base._id_to_data, self._id_to_data),
+            id_to_type=_get_map_delta(base._id_to_type, self._id_to_type),
+            name_to_id=_get_map_delta(base._name_to_id, self._name_to_id),
+            shortname_to_id=_get_map_delta(
+                base._shortname_to_id, self._shortname_to_id),
+            globalname_to_id=_get_map_delta(
+                base._globalname_to_id, self._globalname_to_id),
+            refs_to=_get_map_delta(base._refs_to, self._refs_to),
+        )
+
+    def apply_delta(self, delta: FlatSchemaDelta) -> FlatSchema:
+        """Return a copy of this schema with *delta* applied to it.
+
+        The objects not changed by the delta are shared with this schema.
+        """
+        if delta.base_generation != self._generation:
+            raise ValueError(
+                f'cannot apply a schema delta made against generation '
+                f'{delta.base_generation} to a schema of generation '
+                f'{self._generation}')
+
+        new = self._replace(
+            id_to_data=_apply_map_delta(self._id_to_data, delta.id_to_data),
+            id_to_type=_apply_map_delta(self._id_to_type, delta.id_to_type),
+            name_to_id=_apply_map_delta(self._name_to_id, delta.name_to_id),
+            shortname_to_id=_apply_map_delta(
+                self._shortname_to_id, delta.shortname_to_id),
+            globalname_to_id=_apply_map_delta(
+                self._globalname_to_id, delta.globalname_to_id),
+            refs_to=_apply_map_delta(self._refs_to, delta.refs_to),
+        )
+        new._generation = delta.generation
+        return new
+
     def has_module(self, module: str) -> bool:
         return self.get_global(s_mod.Module, module, None) is not None
 
+    def _get_object_index(self) -> _ObjectIndex:
+        index = self._object_index
+        if index is not None:
+            return index
+
+        module_names: Dict[str, sn.Name] = {}
+        id_to_module: Dict[uuid.UUID, sn.Name] = {}
+        for name, obj_id in self._name_to_id.items():
+            try:
+                module = module_names[name.module]
+            except KeyError:
+                module = module_names[name.module] = name.get_module_name()
+            id_to_module[obj_id] = module
+
+        groups: Dict[Tuple[str, Optional[sn.Name]], List[uuid.UUID]] = {}
+        for obj_id, sclass_name in self._id_to_type.items():
+            key = (sclass_name, id_to_module.get(obj_id))
+            try:
+                groups[key].append(obj_id)
+            except KeyError:
+                groups[key] = [obj_id]
+
+        index = {key: tuple(ids) for key, ids in groups.items()}
+        self._object_index = index
+        return index
+
     def get_objects(
         self,
         *,
@@ -1401,15 +1664,20 @@ class FlatSchema(Schema):
     ) -> SchemaIterator[so.Object_T]:
         return SchemaIterator[so.Object_T](
             self,
-            self._id_to_type,
-            exclude_stdlib=exclude_stdlib,
-            exclude_global=exclude_global,
-            exclude_internal=exclude_internal,
-            included_modules=included_modules,
-            excluded_modules=excluded_modules,
+            _get_object_ids(
+                (self,),
+                exclude_stdlib=exclude_stdlib,
+                exclude_global=exclude_global,
+                exclude_internal=exclude_internal,
+                included_modules=included_modules,
+                excluded_modules=excluded_modules,
+                type=type,
+            ),
+            exclude_internal=False,
+            included_modules=None,
+            excluded_modules=None,
             included_items=included_items,
             excluded_items=excluded_items,
-            type=type,
             extra_filters=extra_filters,
         )
 
@@ -1428,6 +1696,69 @@ class FlatSchema(Schema):
             f'<{type(self).__name__} gen:{self._generation} at {id(self):#x}>')
 
 
+def _get_object_ids(
+    schemas: Iterable[FlatSchema],
+    *,
+    exclude_stdlib: bool,
+    exclude_global: bool,
+    exclude_internal: bool,
+    included_modules: Optional[Iterable[sn.Name]],
+    excluded_modules: Optional[Iterable[sn.Name]],
+    type: Optional[Type[so.Object]],
+) -> Tuple[uuid.UUID, ...]:
+    """Return the ids of objects passing the class and module filters.
+
+    The filters are applied to the groups of the object index of every
+    schema rather than to each object, so this only takes time
+    proportional to the number of returned ids.
+    """
+    incmod: Optional[FrozenSet[sn.Name]] = None
+    if included_modules:
+        incmod = frozenset(included_modules)
+
+    excmod: Set[sn.Name] = set()
+    if excluded_modules:
+        excmod.update(excluded_modules)
+    if exclude_stdlib:
+        excmod.update(STD_MODULES)
+
+    excluded_classes: List[Type[so.Object]] = []
+    if exclude_stdlib:
+        excluded_classes.append(s_pseudo.PseudoType)
+    if exclude_global:
+        excluded_classes.append(so.GlobalObject)
+    if exclude_internal:
+        excluded_classes.append(so.InternalObject)
+    excluded = tuple(excluded_classes)
+
+    matches: Dict[str, bool] = {}
+    groups = []
+    for schema in schemas:
+        for (sclass_name, module), ids in schema._get_object_index().items():
+            if module is None:
+                if incmod is not None:
+                    continue
+            elif (
+                (incmod is not None and module not in incmod)
+                or module in excmod
+            ):
+                continue
+
+            try:
+                match = matches[sclass_name]
+            except KeyError:
+                sclass = so.ObjectMeta.get_schema_class(sclass_name)
+                match = matches[sclass_name] = (
+                    (type is None or issubclass(sclass, type))
+                    and not issubclass(sclass, excluded)
+                )
+
+            if match:
+                groups.append(ids)
+
+    return tuple(itertools.chain.from_iterable(groups))
+
+
 class SchemaIterator(Generic[so.Object_T]):
     def __init__(
         self,
@@ -1915,19 +2246,24 @@ class ChainedSchema(Schema):
     ) -> SchemaIterator[so.Object_T]:
         return SchemaIterator[so.Object_T](
             self,
-            itertools.chain(
-                self._base_schema._id_to_type,
-                self._top_schema._id_to_type,
-                self._global_schema._id_to_type,
+            _get_object_ids(
+                (
+                    self._base_schema,
+                    self._top_schema,
+                    self._global_schema,
+                ),
+                exclude_stdlib=exclude_stdlib,
+                exclude_global=exclude_global,
+                exclude_internal=exclude_internal,
+                included_modules=included_modules,
+                excluded_modules=excluded_modules,
+                type=type,
             ),
-            exclude_global=exclude_global,
-            exclude_stdlib=exclude_stdlib,
-            exclude_internal=exclude_internal,
-            included_modules=included_modules,
-            excluded_modules=excluded_modules,
+            exclude_internal=False,
+            included_modules=None,
+            excluded_modules=None,
             included_items=included_items,
             excluded_items=excluded_items,
-            type=type,
             extra_filters=extra_filters,
         )
 
@@ -1944,38 +2280,96 @@ class ChainedSchema(Schema):
         return migration
 
 
-@functools.lru_cache()
+def _get_map_delta(
+    base: immu.Map[Any, Any],
+    new: immu.Map[Any, Any],
+) -> _MapDelta:
+    if base is new:
+        return ((), (), ())
+
+    sets = []
+    nested = []
+    for key, value in new.items():
+        base_value = base.get(key, so.NoDefault)
+        if base_value is value:
+            continue
+        if (
+            isinstance(value, immu.Map)
+            and isinstance(base_value, immu.Map)
+        ):
+            nested.append((key, _get_map_delta(base_value, value)))
+        else:
+            sets.append((key, value))
+
+    deletes = tuple(key for key in base.keys() if key not in new)
+
+    return tuple(sets), tuple(nested), deletes
+
+
+def _apply_map_delta(
+    base: immu.Map[Any, Any],
+    delta: _MapDelta,
+) -> immu.Map[Any, Any]:
+    sets, nested, deletes = delta
+    if not sets and not nested and not deletes:
+        return base
+
+    with base.mutate() as mm:
+        for key, value in sets:
+            mm[key] = value
+        for key, value_delta in nested:
+            mm[key] = _apply_map_delta(mm[key], value_delta)
+        for key in deletes:
+            del mm[key]
+        return mm.finish()
+
+
 def _get_functions(
     schema: FlatSchema,
     name: sn.Name,
 ) -> Optional[Tuple[s_func.Function, ...]]:
-    objids = schema._shortname_to_id.get((s_func.Function, name))
-    if objids is None:
-        return None
-    return cast(
-        Tuple[s_func.Function, ...],
-        tuple(schema.get_by_id(oid) for oid in objids),
-    )
+    result = schema._memo_get('functions', name)
+    if result is _MISSING:
+        objids = schema._shortname_to_id.get((s_func.Function, name))
+        if objids is None:
+            result = None
+        else:
+            result = tuple(schema.get_by_id(oid) for oid in objids)
+        schema._memo_set('functions', name, result)
+    return cast(Optional[Tuple[s_func.Function, ...]], result)
 
 
-@functools.lru_cache()
 def _get_operators(
     schema: FlatSchema,
     name: sn.Name,
 ) -> Optional[Tuple[s_oper.Operator, ...]]:
-    objids = schema._shortname_to_id.get((s_oper.Operator, name))
-    if objids is None:
-        return None
-    else:
-        return tuple(
-            schema.get_by_id(oid, type=s_oper.Operator) for oid in objids
-        )
+    result = schema._memo_get('operators', name)
+    if result is _MISSING:
+        objids = schema._shortname_to_id.get((s_oper.Operator, name))
+        if objids is None:
+            result = None
+        else:
+            result = tuple(
+                schema.get_by_id(oid, type=s_oper.Operator)
+                for oid in objids
+            )
+        schema._memo_set('operators', name, result)
+    return cast(Optional[Tuple[s_oper.Operator, ...]], result)
 
 
-@functools.lru_cache()
 def _get_last_migration(
     schema: FlatSchema,
 ) -> Optional[s_migrations.Migration]:
+    result = schema._memo_get('last_migration', None)
+    if result is _MISSING:
+        result = _find_last_migration(schema)
+        schema._memo_set('last_migration', None, result)
+    return cast(Optional[s_migrations.Migration], result)
+
+
+def _find_last_migration(
+    schema: FlatSchema,
+) -> Optional[s_migrations.Migration]:
 
     migrations = cast(
         List[s_migrations.Migration],
@@ -24,6 +24,9 @@ import uuid
 from . import delta as sd
 from . import objects as so
 
+if TYPE_CHECKING:
+    from . import schema as s_schema
+
 
 class BaseSchemaVersion(so.Object):
 
@@ -34,6 +37,13 @@ class SchemaVersion(BaseSchemaVersion, so.InternalObject):
     pass
 
 
+def get_schema_version(schema: s_schema.Schema) -> Optional[uuid.UUID]:
+    ver = schema.get_global(SchemaVersion, '__schema_version__', default=None)
+    if ver is None:
+        return None
+    return ver.get_version(schema)
+
+
 class SchemaVersionCommandContext(sd.ObjectCommandContext[SchemaVersion]):
     pass
 
@@ -24,6 +24,7 @@ import logging
 import os
 import pathlib
 import re
+import socket
 import warnings
 import tempfile
 
@@ -175,9 +176,13 @@ class ServerConfig(NamedTuple):
     daemon_group: str
     runstate_dir: pathlib.Path
     max_backend_connections: Optional[int]
+    backend_stream_row_limit: int
+    dump_parallelism: int
+    frontend_processes: int
     compiler_pool_size: int
     compiler_pool_mode: CompilerPoolMode
-    compiler_pool_addr: str
+    compiler_pool_addr: Optional[Tuple[str, int]]
+    compiler_pool_shared_schemas: bool
     echo_runtime_info: bool
     emit_server_status: str
     temp_dir: bool
@@ -205,6 +210,8 @@ class ServerConfig(NamedTuple):
 
     admin_ui: bool
 
+    compiled_query_cache_dir: Optional[pathlib.Path]
+
 
 class PathPath(click.Path):
     name = 'path'
@@ -581,6 +588,35 @@ _server_options = [
              f'Postgres or pg_settings.max_connections for remote Postgres, '
              f'minus the NUM of --reserved-pg-connections.',
         callback=_validate_max_backend_connections),
+    click.option(
+        '--backend-stream-row-limit', type=click.IntRange(min=0),
+        default=0, metavar='NUM',
+        envvar="EDGEDB_SERVER_BACKEND_STREAM_ROW_LIMIT",
+        help='Stream results of queries returning a set to clients in '
+             'batches of at most NUM rows, fetching the next batch from '
+             'the backend only when the client is ready to receive it.  '
+             'This bounds the memory used by queries with large results at '
+             'the cost of an extra backend round trip per query.  Results '
+             'are relayed in one pass when set to 0, which is the default.'),
+    click.option(
+        '--dump-parallelism', type=click.IntRange(min=1),
+        default=1, metavar='NUM',
+        envvar="EDGEDB_SERVER_DUMP_PARALLELISM",
+        help='Dump a database over at most NUM backend connections at '
+             'once, all of them reading the same snapshot of the data.  '
+             'The extra connections are taken from the regular connection '
+             'pool when available.  Defaults to 1.'),
+    click.option(
+        '--frontend-processes', type=click.IntRange(min=1),
+        default=1, metavar='NUM',
+        envvar="EDGEDB_SERVER_FRONTEND_PROCESSES",
+        help='Serve clients from NUM processes listening on the same '
+             'addresses with SO_REUSEPORT, so that protocol handling can '
+             'use several CPU cores.  The processes share one compiler '
+             'pool and split --max-backend-connections evenly.  Schema '
+             'and config changes reach the other processes through a '
+             'backend notification, until which they keep serving the '
+             'old schema and config.  Defaults to 1.'),
     click.option(
         '--compiler-pool-size', type=int,
         callback=_validate_compiler_pool_size),
@@ -603,6 +639,17 @@ _server_options = [
              f'only used if --compiler-pool-mode=remote. Default host is '
              f'localhost, port is {defines.EDGEDB_REMOTE_COMPILER_PORT}',
     ),
+    click.option(
+        '--compiler-pool-shared-schemas',
+        envvar="EDGEDB_SERVER_COMPILER_POOL_SHARED_SCHEMAS",
+        type=bool, default=False, is_flag=True,
+        help='Publish schemas to local compiler worker processes as '
+             'read-only snapshots in shared memory instead of sending each '
+             'worker its own copy.  Workers load the schema of a database '
+             'only when they first compile a query for it, which reduces '
+             'the memory used by the compiler pool on instances with many '
+             'databases.  Ignored if --compiler-pool-mode=remote.',
+    ),
     click.option(
         '--echo-runtime-info', type=bool, default=False, is_flag=True,
         help='[DEPREATED, use --emit-server-status] '
@@ -788,6 +835,14 @@ _server_options = [
         ),
         default='default',
         help='Enable admin UI.'),
+    click.option(
+        '--compiled-query-cache-dir',
+        envvar="EDGEDB_SERVER_COMPILED_QUERY_CACHE_DIR",
+        type=PathPath(), default=None, metavar='PATH',
+        help='Persist compiled queries in the PATH directory, so that '
+             'they survive server restarts.  The directory may be shared '
+             'by multiple servers of the same instance.  Compiled queries '
+             'are only kept in memory by default.'),
 ]
 
 
@@ -1020,6 +1075,13 @@ def parse_args(**kwargs: Any):
         abort('--compiler-pool-addr is only meaningful '
               'under --compiler-pool-mode=remote')
 
+    if kwargs['frontend_processes'] > 1:
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            abort('--frontend-processes is not supported on this platform')
+        if kwargs['auto_shutdown_after'] >= 0:
+            abort('--frontend-processes is incompatible with '
+                  '--auto-shutdown-after')
+
     if kwargs['temp_dir']:
         if kwargs['data_dir']:
             abort('--temp-dir is incompatible with --data-dir/-D')
@@ -565,6 +565,8 @@ class StdlibBits(NamedTuple):
     classlayout: Dict[Type[s_obj.Object], s_refl.SchemaTypeLayout]
     #: Schema introspection SQL query.
     local_intro_query: str
+    #: Schema introspection SQL query for the objects with the given ids.
+    local_intro_objects_query: str
     #: Global object introspection SQL query.
     global_intro_query: str
 
@@ -695,6 +697,7 @@ async def _make_stdlib(
     # that is much harder for Postgres to plan as opposed to a
     # straight flat UNION.
     sql_intro_local_parts = []
+    sql_intro_local_objects_parts = []
     sql_intro_global_parts = []
     for intropart in reflection.local_intro_parts:
         sql_intro_local_parts.append(
@@ -705,6 +708,15 @@ async def _make_stdlib(
             ),
         )
 
+    for intropart in reflection.local_intro_objects_parts:
+        sql_intro_local_objects_parts.append(
+            compile_single_query(
+                intropart,
+                compiler=compiler,
+                compilerctx=compilerctx,
+            ),
+        )
+
     for intropart in reflection.global_intro_parts:
         sql_intro_global_parts.append(
             compile_single_query(
@@ -720,6 +732,13 @@ async def _make_stdlib(
         SELECT json_agg(intro.c) FROM intro
     '''
 
+    local_intro_objects_sql = ' UNION ALL '.join(
+        sql_intro_local_objects_parts)
+    local_intro_objects_sql = f'''
+        WITH intro(c) AS ({local_intro_objects_sql})
+        SELECT json_agg(intro.c) FROM intro
+    '''
+
     global_intro_sql = ' UNION ALL '.join(sql_intro_global_parts)
     global_intro_sql = f'''
         WITH intro(c) AS ({global_intro_sql})
@@ -734,6 +753,7 @@ async def _make_stdlib(
         types=types,
         classlayout=reflection.class_layout,
         local_intro_query=local_intro_sql,
+        local_intro_objects_query=local_intro_objects_sql,
         global_intro_query=global_intro_sql,
     )
 
@@ -990,6 +1010,12 @@ async def _init_stdlib(
         stdlib.local_intro_query,
     )
 
+    await _store_static_text_cache(
+        ctx,
+        'local_intro_objects_query',
+        stdlib.local_intro_objects_query,
+    )
+
     await _store_static_text_cache(
         ctx,
         'global_intro_query',
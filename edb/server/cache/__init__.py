@@ -19,7 +19,11 @@
 
 from __future__ import annotations
 
-from .stmt_cache import StatementsCache
+from .stmt_cache import StatementsCache, SizedStatementsCache, HotStatements
+from .compiled import CompiledQueryStore
 
 
-__all__ = ('StatementsCache',)
+__all__ = (
+    'StatementsCache', 'SizedStatementsCache', 'HotStatements',
+    'CompiledQueryStore',
+)
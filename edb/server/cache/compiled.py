@@ -0,0 +1,189 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""On-disk store of compiled query unit groups.
+
+The store lets a restarted server serve cached query plans from its
+very first request instead of sending the whole hot query set back
+through the compiler pool.  Entries of a database are kept in a single
+file and are only considered valid if the schema fingerprint they were
+saved with matches the current one.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import hashlib
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+
+from edb import buildmeta
+from edb.schema import version as s_ver
+
+from edb.server import config
+
+
+logger = logging.getLogger('edb.server')
+
+# Bump whenever the layout of the persisted entries changes.
+FORMAT_VERSION = 2
+
+
+class CachedSource:
+    """A stand-in for edgeql.Source in query cache keys loaded from disk.
+
+    Cache keys only ever compare the source's cache key, so there is
+    no need to persist (and re-tokenize) the original query text.
+    """
+
+    __slots__ = ('_cache_key',)
+
+    def __init__(self, cache_key: bytes) -> None:
+        self._cache_key = cache_key
+
+    def cache_key(self) -> bytes:
+        return self._cache_key
+
+    def __repr__(self) -> str:
+        return f'<CachedSource {self._cache_key.hex()}>'
+
+
+def _get_schema_version(schema, objtype, name) -> str:
+    if schema is None:
+        return ''
+    ver = schema.get_global(objtype, name, default=None)
+    if ver is None:
+        return ''
+    return str(ver.get_version(schema))
+
+
+def _config_to_json(cfg) -> str:
+    if not cfg:
+        return '{}'
+    return config.to_json(config.get_settings(), cfg, include_source=False)
+
+
+def schema_fingerprint(
+    user_schema,
+    global_schema,
+    database_config,
+    system_config,
+) -> bytes:
+    """Compute a process-independent digest of the compilation inputs.
+
+    Schema versions are bumped on every DDL, so they are enough to tell
+    if a persisted query plan is still valid for the given schema.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(str(buildmeta.EDGEDB_CATALOG_VERSION).encode())
+    h.update(b'\x00')
+    h.update(_get_schema_version(
+        user_schema, s_ver.SchemaVersion, '__schema_version__').encode())
+    h.update(b'\x00')
+    h.update(_get_schema_version(
+        global_schema,
+        s_ver.GlobalSchemaVersion,
+        '__global_schema_version__',
+    ).encode())
+    h.update(b'\x00')
+    h.update(_config_to_json(database_config).encode())
+    h.update(b'\x00')
+    h.update(_config_to_json(system_config).encode())
+    return h.digest()
+
+
+class CompiledQueryStore:
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self._path = path
+
+    def _get_filename(self, dbname: str) -> pathlib.Path:
+        # Database names may contain characters not allowed in file
+        # names, so use a digest of the name instead.
+        digest = hashlib.blake2b(dbname.encode('utf-8'), digest_size=16)
+        return self._path / f'{digest.hexdigest()}.qcache'
+
+    def load(self, dbname: str, fingerprint: bytes) -> List[Any]:
+        """Load the persisted entries of *dbname*.
+
+        Returns an empty list if there is nothing stored for the
+        database, or if the entries are stale or unreadable.
+        """
+        filename = self._get_filename(dbname)
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        try:
+            version, stored_dbname, stored_fp, entries = pickle.loads(data)
+        except Exception:
+            logger.warning(
+                'could not load the compiled query cache of database %r; '
+                'ignoring', dbname, exc_info=True,
+            )
+            return []
+
+        if (
+            version != FORMAT_VERSION
+            or stored_dbname != dbname
+            or stored_fp != fingerprint
+        ):
+            return []
+
+        return entries
+
+    def save(
+        self,
+        dbname: str,
+        fingerprint: bytes,
+        entries: List[Any],
+    ) -> None:
+        data = pickle.dumps(
+            (FORMAT_VERSION, dbname, fingerprint, entries), -1)
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        filename = self._get_filename(dbname)
+        # Write to a temporary file first and then atomically replace
+        # the target, so that concurrent readers (possibly from other
+        # server processes sharing the directory) never observe a
+        # partially written file.
+        fd, tmpname = tempfile.mkstemp(
+            dir=self._path, prefix=filename.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmpname, filename)
+        except BaseException:
+            try:
+                os.unlink(tmpname)
+            except OSError:
+                pass
+            raise
+
+    def discard(self, dbname: str) -> None:
+        try:
+            os.unlink(self._get_filename(dbname))
+        except FileNotFoundError:
+            pass
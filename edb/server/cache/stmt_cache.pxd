@@ -17,6 +17,9 @@
 #
 
 
+from libc.stdint cimport uint64_t
+
+
 cdef class StatementsCache:
 
     cdef:
@@ -28,3 +31,25 @@ cdef class StatementsCache:
     cpdef get(self, key, default)
     cpdef needs_cleanup(self)
     cpdef cleanup_one(self)
+
+
+cdef class SizedStatementsCache:
+
+    cdef:
+        object _dict
+        uint64_t _maxsize
+        readonly uint64_t size
+
+    cpdef get(self, key, default)
+    cpdef int put(self, key, o, uint64_t size)
+    cpdef int clear(self)
+
+
+cdef class HotStatements:
+
+    cdef:
+        StatementsCache _stmts
+        readonly uint64_t generation
+
+    cpdef touch(self, stmt_name, sql, dbver)
+    cpdef get_statements(self, dbver)
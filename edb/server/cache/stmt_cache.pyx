@@ -90,3 +90,97 @@ cdef class StatementsCache:
 
     def __iter__(self):
         return iter(self._dict)
+
+
+cdef class SizedStatementsCache:
+
+    # An LRU cache like StatementsCache, but bounded by the total size
+    # of its entries in bytes, as estimated by the caller, rather than
+    # by their number.  Entries are stored as (entry, size) tuples.
+
+    def __init__(self, *, maxsize):
+        if maxsize <= 0:
+            raise ValueError(
+                f'maxsize is expected to be greater than 0, got {maxsize}')
+
+        self._dict = collections.OrderedDict()
+        self._maxsize = maxsize
+        self.size = 0
+
+    cpdef get(self, key, default):
+        o = self._dict.get(key, _LRU_MARKER)
+        if o is _LRU_MARKER:
+            return default
+        self._dict.move_to_end(key)  # last=True
+        return (<tuple>o)[0]
+
+    cpdef int put(self, key, o, uint64_t size):
+        # Returns the number of entries evicted to make room for `o`.
+        cdef int evicted = 0
+
+        old = self._dict.pop(key, None)
+        if old is not None:
+            self.size -= (<tuple>old)[1]
+
+        if size > self._maxsize:
+            # Would evict everything else and still not fit.
+            return 0
+
+        self._dict[key] = (o, size)
+        self.size += size
+
+        while self.size > self._maxsize:
+            _, old = self._dict.popitem(last=False)
+            self.size -= (<tuple>old)[1]
+            evicted += 1
+
+        return evicted
+
+    cpdef int clear(self):
+        # Returns the number of entries dropped.
+        cdef int n = len(self._dict)
+        self._dict.clear()
+        self.size = 0
+        return n
+
+    def __contains__(self, key):
+        return key in self._dict
+
+    def __len__(self):
+        return len(self._dict)
+
+
+cdef class HotStatements:
+
+    # Named statements recently used on any of the backend connections
+    # to a database, mapped to their SQL and the dbver they were
+    # prepared for.  Shared by all connections to the database, so that
+    # a connection can prepare the statements hot on the other ones
+    # before it is asked to run them.
+    #
+    # `generation` is bumped every time a statement is added or
+    # re-prepared for another dbver, so that connections can cheaply
+    # tell if they are up to date.
+
+    def __init__(self, *, maxsize):
+        self._stmts = StatementsCache(maxsize=maxsize)
+        self.generation = 0
+
+    cpdef touch(self, stmt_name, sql, dbver):
+        entry = (sql, dbver)
+        if self._stmts.get(stmt_name, None) != entry:
+            self._stmts[stmt_name] = entry
+            self.generation += 1
+            if self._stmts.needs_cleanup():
+                self._stmts.cleanup_one()
+
+    cpdef get_statements(self, dbver):
+        # The least recently used statements come first.
+        return [
+            (stmt_name, sql)
+            for stmt_name, (sql, stmt_dbver) in self._stmts._dict.items()
+            if stmt_dbver == dbver
+        ]
+
+    def __len__(self):
+        return len(self._stmts)
@@ -726,6 +726,7 @@ class Compiler:
             out_type_data=out_type_data,
             cacheable=cacheable,
             has_dml=ir.dml_exprs,
+            schema_deps=frozenset(obj.id for obj in ir.schema_refs),
         )
 
     def _extract_params(
@@ -1370,11 +1371,13 @@ class Compiler:
                 current_tx.commit_migration(mstate.initial_savepoint)
                 sql = ddl_query.sql
                 tx_action = None
+                changed_schema_objects = None
             else:
                 tx_cmd = qlast.CommitTransaction()
                 tx_query = self._compile_ql_transaction(ctx, tx_cmd)
                 sql = ddl_query.sql + tx_query.sql
                 tx_action = tx_query.action
+                changed_schema_objects = tx_query.changed_schema_objects
 
             query = dbstate.MigrationControlQuery(
                 sql=sql,
@@ -1385,7 +1388,9 @@ class Compiler:
                 modaliases=None,
                 single_unit=True,
                 user_schema=ctx.state.current_tx().get_user_schema(),
-                cached_reflection=current_tx.get_cached_reflection_if_updated()
+                cached_reflection=(
+                    current_tx.get_cached_reflection_if_updated()),
+                changed_schema_objects=changed_schema_objects,
             )
 
         elif isinstance(ql, qlast.AbortMigration):
@@ -1432,6 +1437,7 @@ class Compiler:
         final_user_schema: Optional[s_schema.Schema] = None
         final_cached_reflection = None
         final_global_schema: Optional[s_schema.Schema] = None
+        changed_schema_objects = None
         sp_name = None
         sp_id = None
 
@@ -1463,6 +1469,9 @@ class Compiler:
 
             cur_tx = ctx.state.current_tx()
             final_user_schema = cur_tx.get_user_schema_if_updated()
+            if final_user_schema is not None:
+                changed_schema_objects = cur_tx.get_changed_schema_objects(
+                    self._std_schema)
             final_cached_reflection = cur_tx.get_cached_reflection_if_updated()
             final_global_schema = cur_tx.get_global_schema_if_updated()
 
@@ -1527,6 +1536,7 @@ class Compiler:
             user_schema=final_user_schema,
             cached_reflection=final_cached_reflection,
             global_schema=final_global_schema,
+            changed_schema_objects=changed_schema_objects,
             sp_name=sp_name,
             sp_id=sp_id,
         )
@@ -1776,6 +1786,8 @@ class Compiler:
             raise errors.ProtocolError('nothing to compile')
 
         rv = dbstate.QueryUnitGroup()
+        tx0 = ctx.state.current_tx()
+        schema_units: List[Tuple[dbstate.QueryUnit, s_schema.Schema]] = []
 
         is_script = statements_len > 1
         script_info = None
@@ -1850,6 +1862,7 @@ class Compiler:
                 unit.in_type_id = comp.in_type_id
 
                 unit.cacheable = comp.cacheable
+                unit.schema_deps = comp.schema_deps
 
                 if is_trailing_stmt:
                     unit.cardinality = comp.cardinality
@@ -1866,7 +1879,7 @@ class Compiler:
                 unit.has_role_ddl = comp.has_role_ddl
                 unit.ddl_stmt_id = comp.ddl_stmt_id
                 if comp.user_schema is not None:
-                    unit.user_schema = pickle.dumps(comp.user_schema, -1)
+                    schema_units.append((unit, comp.user_schema))
                 if comp.cached_reflection is not None:
                     unit.cached_reflection = \
                         pickle.dumps(comp.cached_reflection, -1)
@@ -1878,7 +1891,12 @@ class Compiler:
             elif isinstance(comp, dbstate.TxControlQuery):
                 unit.sql = comp.sql
                 unit.cacheable = comp.cacheable
-                if comp.user_schema is not None:
+                changed = comp.changed_schema_objects
+                if changed is not None and changed.base_version is not None:
+                    # The schema of a committed transaction is sent as
+                    # a delta against the schema it has started with.
+                    unit.changed_schema_objects = changed
+                elif comp.user_schema is not None:
                     unit.user_schema = pickle.dumps(comp.user_schema, -1)
                 if comp.cached_reflection is not None:
                     unit.cached_reflection = \
@@ -1907,7 +1925,12 @@ class Compiler:
             elif isinstance(comp, dbstate.MigrationControlQuery):
                 unit.sql = comp.sql
                 unit.cacheable = comp.cacheable
-                if comp.user_schema is not None:
+                changed = comp.changed_schema_objects
+                if changed is not None and changed.base_version is not None:
+                    # The schema of a committed transaction is sent as
+                    # a delta against the schema it has started with.
+                    unit.changed_schema_objects = changed
+                elif comp.user_schema is not None:
                     unit.user_schema = pickle.dumps(comp.user_schema, -1)
                 if comp.cached_reflection is not None:
                     unit.cached_reflection = \
@@ -1967,6 +1990,25 @@ class Compiler:
 
             rv.append(unit)
 
+        if schema_units:
+            # Only the last schema of an implicit transaction is applied,
+            # on top of the schema the transaction has started with, so
+            # its unit only needs the delta, which is computed just once.
+            last_unit, last_schema = schema_units[-1]
+            current_tx = ctx.state.current_tx()
+            if (
+                current_tx is tx0
+                and current_tx.is_implicit()
+                and current_tx.get_user_schema() is last_schema
+            ):
+                changed = current_tx.get_changed_schema_objects(
+                    self._std_schema)
+                if changed.base_version is not None:
+                    schema_units.pop()
+                    last_unit.changed_schema_objects = changed
+            for unit, schema in schema_units:
+                unit.user_schema = pickle.dumps(schema, -1)
+
         if script_info:
             if ctx.state.current_tx().is_implicit():
                 if ctx.state.current_tx().get_migration_state() is not None:
@@ -2003,7 +2045,7 @@ class Compiler:
             )
             if unit.cacheable and (
                 unit.config_ops or unit.modaliases or unit.user_schema or
-                unit.cached_reflection
+                unit.changed_schema_objects or unit.cached_reflection
             ):
                 raise errors.InternalServerError(
                     f'QueryUnit {unit!r} is cacheable but has config/aliases')
@@ -33,9 +33,14 @@ from edb.edgeql import ast as qlast
 from edb.edgeql import qltypes
 
 from edb.schema import delta as s_delta
+from edb.schema import links as s_links
 from edb.schema import migrations as s_migrations
+from edb.schema import name as s_name
 from edb.schema import objects as s_obj
+from edb.schema import referencing as s_ref
 from edb.schema import schema as s_schema
+from edb.schema import types as s_types
+from edb.schema import version as s_ver
 
 from edb.server import config
 
@@ -64,6 +69,25 @@ class MigrationAction(enum.IntEnum):
     REJECT_PROPOSED = 6
 
 
+@dataclasses.dataclass(frozen=True)
+class ChangedSchemaObjects:
+
+    # Version of the user schema the changes were made against.
+    base_version: Optional[uuid.UUID]
+
+    # Ids of the created, altered and deleted schema objects, along
+    # with the objects whose compiled queries might be affected by
+    # those changes: their referrers, ancestors, the objects they
+    # might shadow and the types whose backlinks they might change.
+    ids: FrozenSet[uuid.UUID]
+
+    # The difference between the base and the new user schema.  Applying
+    # it to the base schema instead of unpickling the new one keeps the
+    # unchanged objects shared, which in turn lets the compiler pool only
+    # send the difference to its workers.
+    delta: s_schema.FlatSchemaDelta
+
+
 @dataclasses.dataclass(frozen=True)
 class BaseQuery:
 
@@ -98,6 +122,9 @@ class Query(BaseQuery):
     single_unit: bool = False
     cacheable: bool = True
 
+    # Ids of the schema objects the compiled query depends on.
+    schema_deps: FrozenSet[uuid.UUID] = frozenset()
+
 
 @dataclasses.dataclass(frozen=True)
 class SimpleQuery(BaseQuery):
@@ -152,6 +179,7 @@ class TxControlQuery(BaseQuery):
     user_schema: Optional[s_schema.FlatSchema] = None
     global_schema: Optional[s_schema.FlatSchema] = None
     cached_reflection: Any = None
+    changed_schema_objects: Optional[ChangedSchemaObjects] = None
 
     sp_name: Optional[str] = None
     sp_id: Optional[str] = None
@@ -171,6 +199,7 @@ class MigrationControlQuery(BaseQuery):
     user_schema: Optional[s_schema.FlatSchema] = None
     cached_reflection: Any = None
     ddl_stmt_id: Optional[str] = None
+    changed_schema_objects: Optional[ChangedSchemaObjects] = None
 
 
 @dataclasses.dataclass(frozen=True)
@@ -243,6 +272,10 @@ class QueryUnit:
     # True if it is safe to cache this unit.
     cacheable: bool = False
 
+    # Ids of the schema objects this unit depends on, if known.
+    # Cached units are only invalidated by DDL touching any of them.
+    schema_deps: Optional[FrozenSet[uuid.UUID]] = None
+
     # If non-None, contains a name of the DB that is about to be
     # created/deleted. If it's the former, the IO process needs to
     # introspect the new db. If it's the later, the server should
@@ -295,10 +328,22 @@ class QueryUnit:
     # after the command is run. The schema is pickled.
     global_schema: Optional[bytes] = None
 
+    # If present, represents the future schema state after the
+    # transaction is committed, as the changes made since the start
+    # of the transaction.  Sent instead of user_schema.
+    changed_schema_objects: Optional[ChangedSchemaObjects] = None
+
     @property
     def has_ddl(self) -> bool:
         return bool(self.capabilities & enums.Capability.DDL)
 
+    @property
+    def updates_user_schema(self) -> bool:
+        return (
+            self.user_schema is not None
+            or self.changed_schema_objects is not None
+        )
+
     @property
     def tx_control(self) -> bool:
         return (
@@ -319,6 +364,10 @@ class QueryUnitGroup:
     # True if it is safe to cache this unit.
     cacheable: bool = True
 
+    # Ids of the schema objects any of the query units depend on,
+    # or None if that is not known for some unit.
+    schema_deps: Optional[FrozenSet[uuid.UUID]] = frozenset()
+
     # True if any query unit has transaction control commands, like COMMIT,
     # ROLLBACK, START TRANSACTION or SAVEPOINT-related commands
     tx_control: bool = False
@@ -351,6 +400,11 @@ class QueryUnitGroup:
         if not query_unit.cacheable:
             self.cacheable = False
 
+        if query_unit.schema_deps is None:
+            self.schema_deps = None
+        elif self.schema_deps is not None:
+            self.schema_deps |= query_unit.schema_deps
+
         if query_unit.tx_control:
             self.tx_control = True
 
@@ -567,6 +621,86 @@ class Transaction:
         else:
             return self._current.user_schema
 
+    def get_changed_schema_objects(
+        self,
+        std_schema: s_schema.FlatSchema,
+    ) -> ChangedSchemaObjects:
+        """Return the user schema objects changed in this transaction."""
+        user_schema0 = self._state0.user_schema
+        old_schema = s_schema.ChainedSchema(
+            std_schema, user_schema0, self._state0.global_schema)
+        new_schema = s_schema.ChainedSchema(
+            std_schema, self._current.user_schema,
+            self._current.global_schema)
+
+        delta = self._current.user_schema.get_delta(user_schema0)
+        ids = set()
+
+        for obj_id in delta.get_changed_object_ids():
+            if new_schema.has_object(obj_id):
+                schema = new_schema
+                created = not old_schema.has_object(obj_id)
+            else:
+                schema = old_schema
+                created = False
+
+            # Backlinks are resolved by looking up the links targeting
+            # a type, so a changed link affects the queries on its
+            # target even though the target object itself is unchanged.
+            for s in (old_schema, new_schema):
+                link = s.get_by_id(obj_id, default=None)
+                if isinstance(link, s_links.Link):
+                    target = link.get_target(s)
+                    if target is not None:
+                        ids.update(_get_backlink_dependents(s, target))
+
+            obj: Optional[s_obj.Object] = schema.get_by_id(obj_id)
+            # Queries are compiled against the containing objects
+            # (e.g. the object type of an access policy) and cover the
+            # descendants of the referenced types, so also include the
+            # referrers and the ancestors of the changed object.
+            while obj is not None:
+                ids.add(obj.id)
+                if isinstance(obj, s_obj.InheritingObject):
+                    ids.update(obj.get_ancestors(schema).ids(schema))
+                if isinstance(obj, s_ref.ReferencedObject):
+                    obj = obj.get_referrer(schema)
+                else:
+                    obj = None
+
+            if not created:
+                continue
+
+            obj = schema.get_by_id(obj_id)
+            if isinstance(obj, s_ref.ReferencedObject):
+                continue
+            shortname = obj.get_shortname(schema)
+            if not isinstance(shortname, s_name.QualName):
+                continue
+            # A new object might shadow an object with the same name
+            # in std, or add an overload to an existing function.
+            for module in {shortname.module, 'std'}:
+                name = s_name.QualName(module, shortname.name)
+                other = old_schema.get(name, default=None)
+                if other is not None:
+                    ids.add(other.id)
+                ids.update(
+                    func.id
+                    for func in old_schema.get_functions(name, default=())
+                )
+
+        version = user_schema0.get_global(
+            s_ver.SchemaVersion, '__schema_version__', default=None)
+
+        return ChangedSchemaObjects(
+            base_version=(
+                version.get_version(user_schema0)
+                if version is not None else None
+            ),
+            ids=frozenset(ids),
+            delta=delta,
+        )
+
     def get_global_schema(self) -> s_schema.FlatSchema:
         return self._current.global_schema
 
@@ -766,3 +900,31 @@ class CompilerConnectionState:
         raise errors.InternalServerError(
             f'failed to lookup transaction or savepoint with id={txid}'
         )  # pragma: no cover
+
+
+def _get_backlink_dependents(
+    schema: s_schema.Schema,
+    target: s_types.Type,
+) -> Set[uuid.UUID]:
+    """Return ids of the types whose backlinks might resolve via *target*.
+
+    This mirrors ObjectType.getrptrs(), which looks up the links targeting
+    a type, its ancestors, its intersection components and the unions it
+    is a part of.
+    """
+    ids: Set[uuid.UUID] = set()
+    todo: List[s_obj.Object] = [target]
+    while todo:
+        t = todo.pop()
+        if t.id in ids:
+            continue
+        ids.add(t.id)
+        if isinstance(t, s_obj.InheritingObject):
+            todo.extend(t.descendants(schema))
+        if isinstance(t, s_types.Type):
+            union_of = t.get_union_of(schema)
+            if union_of:
+                todo.extend(union_of.objects(schema))
+        todo.extend(
+            schema.get_referrers(t, field_name='intersection_of'))
+    return ids
@@ -21,12 +21,15 @@ from __future__ import annotations
 from typing import *  # NoQA
 
 import asyncio
+import collections
 import functools
 import hmac
+import itertools
 import logging
 import os
 import os.path
 import pickle
+import re
 import signal
 import subprocess
 import sys
@@ -35,6 +38,8 @@ import time
 import immutables
 
 from edb.common import debug
+from edb.common import lru
+from edb.common import sampler
 from edb.common import taskgroup
 
 from edb.pgsql import params as pgparams
@@ -45,6 +50,7 @@ from edb.server import metrics
 
 from . import amsg
 from . import queue
+from . import snapshots
 from . import state
 
 
@@ -52,8 +58,24 @@ PROCESS_INITIAL_RESPONSE_TIMEOUT: float = 60.0
 KILL_TIMEOUT: float = 10.0
 ADAPTIVE_SCALE_UP_WAIT_TIME: float = 3.0
 ADAPTIVE_SCALE_DOWN_WAIT_TIME: float = 60.0
+# Send the full user schema instead of a delta to a worker that lags
+# behind by more than this fraction of the schema objects.
+SCHEMA_DELTA_MAX_RATIO: float = 0.5
 WORKER_PKG: str = __name__.rpartition('.')[0] + '.'
 
+# Queries starting with one of these keywords usually take much longer
+# to compile than regular queries, so they are queued in the heavy lane.
+HEAVY_QUERY_RE = re.compile(
+    r'''
+        ^(?:\s|\#[^\n]*)*
+        (?:
+            CREATE | ALTER | DROP | POPULATE | DESCRIBE | ADMINISTER
+            | (?:START | COMMIT | ABORT) \s+ MIGRATION
+        )\b
+    ''',
+    re.I | re.X,
+)
+
 
 logger = logging.getLogger("edb.server")
 log_metrics = logging.getLogger("edb.server.metrics")
@@ -65,11 +87,29 @@ _ENV = os.environ.copy()
 _ENV['PYTHONPATH'] = ':'.join(sys.path)
 
 
+def get_compile_lane(source) -> queue.Lane:
+    if HEAVY_QUERY_RE.match(source.text()):
+        return queue.Lane.Heavy
+    else:
+        return queue.Lane.Compile
+
+
 @functools.lru_cache()
 def _pickle_memoized(schema):
     return pickle.dumps(schema, -1)
 
 
+@functools.lru_cache(maxsize=16)
+def _pickle_schema_delta_memoized(base_schema, schema):
+    delta = schema.get_delta(base_schema)
+    if (
+        len(delta.get_changed_object_ids())
+        > schema.get_object_count() * SCHEMA_DELTA_MAX_RATIO
+    ):
+        return None
+    return pickle.dumps(delta, -1)
+
+
 class BaseWorker:
 
     _dbs: state.DatabasesState
@@ -93,6 +133,15 @@ class BaseWorker:
         self._system_config = system_config
         self._last_pickled_state = None
 
+        # handle -> seq of the transaction states the worker has,
+        # evicted in the same order as by the worker.
+        self._tx_states = lru.LRUMapping(
+            maxsize=defines.BACKEND_COMPILER_TX_STATES)
+        # dbname -> estimated size of the schema, from the least
+        # recently used database.
+        self._db_sizes: collections.OrderedDict[str, int] = (
+            collections.OrderedDict())
+
         self._con = None
         self._last_used = time.monotonic()
         self._closed = False
@@ -117,8 +166,12 @@ class BaseWorker:
             return data[0]
         elif status == 1:
             exc, tb = data
-            if (sync_state is not None and
-                    not isinstance(exc, state.FailedStateSync)):
+            if isinstance(exc, state.FailedStateSync):
+                # We don't know what state the worker ended up in,
+                # so send it everything on the next call.
+                self._dbs = immutables.Map()
+                self._db_sizes.clear()
+            elif sync_state is not None:
                 sync_state()
             exc.__formatted_error__ = tb
             raise exc
@@ -162,6 +215,7 @@ class Worker(BaseWorker):
         self._manager._stats_killed += 1
         self._manager._workers.pop(self._pid, None)
         self._manager._report_worker(self, action="kill")
+        metrics.compiler_process_database_states_size.remove(str(self._pid))
         try:
             os.kill(self._pid, signal.SIGTERM)
         except ProcessLookupError:
@@ -188,6 +242,8 @@ class AbstractPool:
         self._refl_schema = refl_schema
         self._schema_class_layout = schema_class_layout
 
+        self._tx_handles = itertools.count(1)
+
     @functools.lru_cache(maxsize=None)
     def _get_init_args(self):
         init_args = self._get_init_args_uncached()
@@ -231,6 +287,13 @@ class AbstractPool:
     def get_template_pid(self):
         return None
 
+    async def set_profiler_rate(self, rate: int) -> None:
+        # Only the workers of a local pool are sampled.
+        pass
+
+    async def collect_profile(self) -> Dict[str, int]:
+        return {}
+
     async def _compute_compile_preargs(
         self,
         worker,
@@ -295,11 +358,11 @@ class AbstractPool:
 
         if worker_db is None:
             preargs += (
-                _pickle_memoized(user_schema),
-                _pickle_memoized(reflection_cache),
-                _pickle_memoized(global_schema),
-                _pickle_memoized(database_config),
-                _pickle_memoized(system_config),
+                self._pickle_state(user_schema),
+                self._pickle_state(reflection_cache),
+                self._pickle_state(global_schema),
+                self._pickle_state(database_config),
+                self._pickle_state(system_config),
             )
             to_update = {
                 'user_schema': user_schema,
@@ -311,7 +374,8 @@ class AbstractPool:
         else:
             if worker_db.user_schema is not user_schema:
                 preargs += (
-                    _pickle_memoized(user_schema),
+                    self._pickle_user_schema_update(
+                        worker_db.user_schema, user_schema),
                 )
                 to_update['user_schema'] = user_schema
             else:
@@ -319,7 +383,7 @@ class AbstractPool:
 
             if worker_db.reflection_cache is not reflection_cache:
                 preargs += (
-                    _pickle_memoized(reflection_cache),
+                    self._pickle_state(reflection_cache),
                 )
                 to_update['reflection_cache'] = reflection_cache
             else:
@@ -327,7 +391,7 @@ class AbstractPool:
 
             if worker._global_schema is not global_schema:
                 preargs += (
-                    _pickle_memoized(global_schema),
+                    self._pickle_state(global_schema),
                 )
                 to_update['global_schema'] = global_schema
             else:
@@ -335,7 +399,7 @@ class AbstractPool:
 
             if worker_db.database_config is not database_config:
                 preargs += (
-                    _pickle_memoized(database_config),
+                    self._pickle_state(database_config),
                 )
                 to_update['database_config'] = database_config
             else:
@@ -343,7 +407,7 @@ class AbstractPool:
 
             if worker._system_config is not system_config:
                 preargs += (
-                    _pickle_memoized(system_config),
+                    self._pickle_state(system_config),
                 )
                 to_update['system_config'] = system_config
             else:
@@ -361,9 +425,42 @@ class AbstractPool:
 
         return preargs, callback
 
-    async def _acquire_worker(self, *, condition=None, weighter=None):
+    def _pickle_user_schema_update(self, base_schema, user_schema):
+        # Workers that already have a schema of the database get
+        # the difference from it, which is much smaller than the
+        # full schema after a typical DDL command.
+        pickled = _pickle_schema_delta_memoized(base_schema, user_schema)
+        if pickled is None:
+            pickled = self._pickle_state(user_schema)
+        return pickled
+
+    def _pickle_state(self, obj):
+        return _pickle_memoized(obj)
+
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        weighter=None,
+        lane=queue.Lane.Compile,
+        key=None,
+    ):
         raise NotImplementedError
 
+    def _get_affinity_weighter(self, dbname, user_schema):
+        # Prefer workers that already have the state of the database,
+        # and then ones that need the least of it to be sent over.
+        def weighter(worker):
+            worker_db = worker._dbs.get(dbname)
+            if worker_db is None:
+                return 0
+            elif worker_db.user_schema is not user_schema:
+                return 1
+            else:
+                return 2
+
+        return weighter
+
     def _release_worker(self, worker, *, put_in_front: bool = True):
         raise NotImplementedError
 
@@ -377,7 +474,11 @@ class AbstractPool:
         system_config,
         *compile_args
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(
+            weighter=self._get_affinity_weighter(dbname, user_schema),
+            lane=get_compile_lane(compile_args[0]),
+            key=dbname,
+        )
         try:
             preargs, sync_state = await self._compute_compile_preargs(
                 worker,
@@ -415,47 +516,114 @@ class AbstractPool:
         # to be passed to the next compiler compiling it.
         #
         # The compile state can be quite heavy and contain multiple versions
-        # of schema, configs, and other session-related data. So the compiler
-        # worker pickles it before sending it to the IO process, and the
-        # IO process doesn't need to ever unpickle it.
-        #
-        # There's one crucial optimization we do here though. We try to
-        # find the compiler process that we used before, that already has
-        # this state unpickled. If we can find it, it means that the
-        # compiler process won't have to waste time unpickling the state.
+        # of schema, configs, and other session-related data.  So instead
+        # of pickling it back and forth on every statement, the worker
+        # keeps it under a handle, and we route the next statements of the
+        # transaction to that worker.  What we get back and store in the
+        # edgecon is a state.TxState, which lets another worker rebuild
+        # the state if that one is busy or gone.
         #
-        # We use "is" in `w._last_pickled_state is pickled_state` deliberately,
-        # because `pickled_state` is saved on the Worker instance and
-        # stored in edgecon; we never modify it, so `is` is sufficient and
-        # is faster than `==`.
+        # compile() returns the state pickled at the start of the
+        # transaction, which we turn into a TxState on the first call.
+        if isinstance(pickled_state, state.TxState):
+            tx_state = pickled_state
+        else:
+            tx_state = state.TxState(
+                handle=next(self._tx_handles),
+                seq=0,
+                pickled_state=pickled_state,
+                replay=(),
+            )
+
         worker = await self._acquire_worker(
-            condition=lambda w: (w._last_pickled_state is pickled_state)
+            condition=lambda w: (
+                w._tx_states.get(tx_state.handle) == tx_state.seq
+                # The worker compiled the start of the transaction.
+                or w._last_pickled_state is tx_state.pickled_state
+            ),
+            lane=get_compile_lane(compile_args[0]),
         )
 
-        if worker._last_pickled_state is pickled_state:
-            # Since we know that this particular worker already has the
-            # state, we don't want to waste resources transferring the
-            # state over the network. So we replace the state with a marker,
-            # that the compiler process will recognize.
-            pickled_state = state.REUSE_LAST_STATE_MARKER
-
         try:
-            units, new_pickled_state = await worker.call(
-                'compile_in_tx',
-                pickled_state,
-                txid,
-                *compile_args
-            )
-            worker._last_pickled_state = new_pickled_state
-            return units, new_pickled_state, 0
+            if worker._tx_states.get(tx_state.handle) == tx_state.seq:
+                try:
+                    units, new_pickled_state, in_tx = await worker.call(
+                        'compile_in_tx',
+                        tx_state.handle,
+                        tx_state.seq,
+                        None,
+                        (),
+                        self._need_tx_checkpoint(tx_state),
+                        txid,
+                        *compile_args
+                    )
+                except state.StateNotFound:
+                    worker._tx_states.pop(tx_state.handle, None)
+                else:
+                    return self._on_compiled_in_tx(
+                        worker, tx_state, units, new_pickled_state, in_tx,
+                        txid, compile_args)
+
+            if worker._last_pickled_state is tx_state.pickled_state:
+                # Since we know that this particular worker already has the
+                # state, we don't want to waste resources transferring the
+                # state over the network. So we replace the state with a
+                # marker, that the compiler process will recognize.
+                sent_state = state.REUSE_LAST_STATE_MARKER
+                worker._last_pickled_state = None
+            else:
+                sent_state = tx_state.pickled_state
+
+            try:
+                units, new_pickled_state, in_tx = await worker.call(
+                    'compile_in_tx',
+                    tx_state.handle,
+                    tx_state.seq,
+                    sent_state,
+                    tx_state.replay,
+                    self._need_tx_checkpoint(tx_state),
+                    txid,
+                    *compile_args
+                )
+            except Exception:
+                # The worker keeps the state it rebuilt.
+                worker._tx_states[tx_state.handle] = tx_state.seq
+                raise
+            return self._on_compiled_in_tx(
+                worker, tx_state, units, new_pickled_state, in_tx,
+                txid, compile_args)
 
         finally:
             # Put the worker at the end of the queue so that the chance
-            # of reusing it later (and maximising the chance of
-            # the w._last_pickled_state is pickled_state` check returning
-            # `True` is higher.
+            # of it being free for the next statement of the transaction
+            # is higher.
             self._release_worker(worker, put_in_front=False)
 
+    def _need_tx_checkpoint(self, tx_state):
+        return len(tx_state.replay) >= defines.BACKEND_COMPILER_TX_REPLAY_MAX
+
+    def _on_compiled_in_tx(
+        self, worker, tx_state, units, new_pickled_state, in_tx,
+        txid, compile_args,
+    ):
+        if in_tx:
+            worker._tx_states[tx_state.handle] = tx_state.seq + 1
+        else:
+            worker._tx_states.pop(tx_state.handle, None)
+
+        if new_pickled_state is not None:
+            tx_state = tx_state._replace(
+                seq=tx_state.seq + 1,
+                pickled_state=new_pickled_state,
+                replay=(),
+            )
+        else:
+            tx_state = tx_state._replace(
+                seq=tx_state.seq + 1,
+                replay=tx_state.replay + ((txid, compile_args),),
+            )
+        return units, tx_state, 0
+
     async def compile_notebook(
         self,
         dbname,
@@ -466,7 +634,11 @@ class AbstractPool:
         system_config,
         *compile_args
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(
+            weighter=self._get_affinity_weighter(dbname, user_schema),
+            lane=queue.Lane.Heavy,
+            key=dbname,
+        )
         try:
             preargs, sync_state = await self._compute_compile_preargs(
                 worker,
@@ -513,7 +685,10 @@ class AbstractPool:
         system_config,
         *compile_args
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(
+            weighter=self._get_affinity_weighter(dbname, user_schema),
+            key=dbname,
+        )
         try:
             preargs, sync_state = await self._compute_compile_preargs(
                 worker,
@@ -540,7 +715,7 @@ class AbstractPool:
         *args,
         **kwargs
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(lane=queue.Lane.Heavy)
         try:
             return await worker.call(
                 'describe_database_dump',
@@ -556,7 +731,7 @@ class AbstractPool:
         *args,
         **kwargs
     ):
-        worker = await self._acquire_worker()
+        worker = await self._acquire_worker(lane=queue.Lane.Heavy)
         try:
             return await worker.call(
                 'describe_database_restore',
@@ -582,11 +757,14 @@ class BaseLocalPool(
         *,
         runstate_dir,
         pool_size,
+        shared_schemas=False,
         **kwargs,
     ):
         super().__init__(**kwargs)
 
         self._runstate_dir = runstate_dir
+        self._shared_schemas = shared_schemas
+        self._snapshots: Optional[snapshots.SnapshotStore] = None
 
         self._poolsock_name = os.path.join(self._runstate_dir, 'ipc')
         assert len(self._poolsock_name) <= (
@@ -607,9 +785,140 @@ class BaseLocalPool(
         self._stats_spawned = 0
         self._stats_killed = 0
 
+        self._profiler_rate = 0
+        # dbname -> estimated schema size of the databases in init args.
+        self._init_db_sizes: Dict[str, int] = {}
+
     def is_running(self):
         return bool(self._running)
 
+    def _pickle_state(self, obj):
+        if self._snapshots is not None:
+            ref = self._snapshots.publish(obj)
+            if ref is not None:
+                return ref
+        return super()._pickle_state(obj)
+
+    def _get_pickled_init_args(self, init_args):
+        if self._snapshots is None:
+            return super()._get_pickled_init_args(init_args)
+
+        (
+            dbs,
+            backend_runtime_params,
+            std_schema,
+            refl_schema,
+            schema_class_layout,
+            global_schema,
+            system_config,
+        ) = init_args
+        # Workers load the state of a database from its snapshots
+        # only when they are asked to compile something for it.
+        dbs = immutables.Map(
+            (
+                dbname,
+                db._replace(
+                    user_schema=self._publish(db.user_schema),
+                    reflection_cache=self._publish(db.reflection_cache),
+                    database_config=self._publish(db.database_config),
+                ),
+            )
+            for dbname, db in dbs.items()
+        )
+        return pickle.dumps(
+            (
+                dbs,
+                backend_runtime_params,
+                self._publish(std_schema),
+                self._publish(refl_schema),
+                schema_class_layout,
+                self._publish(global_schema),
+                system_config,
+            ),
+            -1,
+        )
+
+    def _get_init_args_uncached(self):
+        dbs, *rest = super()._get_init_args_uncached()
+        # New workers only get as many databases as fit in their budget,
+        # the others are sent along with the first compile request.
+        total = 0
+        for dbname, db in dbs.items():
+            size = self._estimate_schema_size(db.user_schema)
+            if total + size > defines.BACKEND_COMPILER_WORKER_DBS_SIZE:
+                dbs = dbs.delete(dbname)
+            else:
+                total += size
+                self._init_db_sizes[dbname] = size
+        return (dbs, *rest)
+
+    def _estimate_schema_size(
+        self,
+        user_schema,
+        base_schema=None,
+        base_size=0,
+    ):
+        # Both pickles are memoized, so this pickles nothing that was
+        # not just sent to the worker anyway.
+        if base_schema is not None:
+            delta = _pickle_schema_delta_memoized(base_schema, user_schema)
+            if delta is not None:
+                return base_size + len(delta)
+        pickled = self._pickle_state(user_schema)
+        if isinstance(pickled, snapshots.SnapshotRef):
+            return pickled.size
+        else:
+            return len(pickled)
+
+    async def _compute_compile_preargs(
+        self,
+        worker,
+        dbname,
+        user_schema,
+        *args,
+    ):
+        worker_db = worker._dbs.get(dbname)
+        preargs, callback = await super()._compute_compile_preargs(
+            worker, dbname, user_schema, *args)
+        if worker_db is None:
+            size = self._estimate_schema_size(user_schema)
+        elif worker_db.user_schema is not user_schema:
+            size = self._estimate_schema_size(
+                user_schema,
+                worker_db.user_schema,
+                worker._db_sizes.get(dbname, 0),
+            )
+        else:
+            size = worker._db_sizes.get(dbname, 0)
+        evicted = self._evict_worker_dbs(worker, dbname, size)
+        return (dbname, evicted, *preargs[1:]), callback
+
+    def _evict_worker_dbs(self, worker, dbname, size):
+        # The parent decides which databases a worker evicts, so that
+        # its view of the worker state stays exact: the schema of an
+        # evicted database is sent again in full when it is needed.
+        sizes = worker._db_sizes
+        sizes[dbname] = size
+        sizes.move_to_end(dbname)
+        total = sum(sizes.values())
+        evicted = []
+        while total > defines.BACKEND_COMPILER_WORKER_DBS_SIZE:
+            victim = next(iter(sizes))
+            if victim == dbname:
+                break
+            total -= sizes.pop(victim)
+            if victim in worker._dbs:
+                worker._dbs = worker._dbs.delete(victim)
+            evicted.append(victim)
+        metrics.compiler_process_database_states_size.set(
+            total, str(worker.get_pid()))
+        return tuple(evicted)
+
+    def _publish(self, obj):
+        assert self._snapshots is not None
+        ref = self._snapshots.publish(obj)
+        return obj if ref is None else ref
+
     async def _attach_worker(self, pid: int):
         if not self._running:
             return
@@ -622,6 +931,12 @@ class BaseLocalPool(
             *init_args,
         )
         await worker._attach(init_args_pickled)
+        if self._init_db_sizes:
+            worker._db_sizes.update(self._init_db_sizes)
+            metrics.compiler_process_database_states_size.set(
+                sum(self._init_db_sizes.values()), str(pid))
+        if self._profiler_rate:
+            await worker.call('set_profiler_rate', self._profiler_rate)
         self._report_worker(worker)
 
         self._workers[pid] = worker
@@ -644,6 +959,30 @@ class BaseLocalPool(
     def _worker_attached(self):
         pass
 
+    async def set_profiler_rate(self, rate: int) -> None:
+        self._profiler_rate = rate
+        await asyncio.gather(
+            *(
+                worker.call('set_profiler_rate', rate)
+                for worker in list(self._workers.values())
+            ),
+            return_exceptions=True,
+        )
+
+    async def collect_profile(self) -> Dict[str, int]:
+        results = await asyncio.gather(
+            *(
+                worker.call('collect_profile')
+                for worker in list(self._workers.values())
+            ),
+            return_exceptions=True,
+        )
+        stacks: Dict[str, int] = {}
+        for result in results:
+            if not isinstance(result, BaseException):
+                sampler.merge_collapsed(stacks, result)
+        return stacks
+
     def worker_connected(self, pid, version):
         logger.debug("Worker with PID %s connected.", pid)
         self._loop.create_task(self._attach_worker(pid))
@@ -654,6 +993,7 @@ class BaseLocalPool(
         logger.debug("Worker with PID %s disconnected.", pid)
         self._workers.pop(pid, None)
         metrics.current_compiler_processes.dec()
+        metrics.compiler_process_database_states_size.remove(str(pid))
 
     async def start(self):
         if self._running is not None:
@@ -665,6 +1005,10 @@ class BaseLocalPool(
         await self._server.start()
         self._running = True
 
+        if self._shared_schemas:
+            self._snapshots = snapshots.SnapshotStore.create(
+                self._runstate_dir)
+
         await self._start()
 
         await self._wait_ready()
@@ -698,6 +1042,13 @@ class BaseLocalPool(
             cmdline.extend([
                 '--numproc', str(numproc),
             ])
+        if self._snapshots is not None:
+            # Let the template process load the standard schemas before
+            # forking, so that the workers share them copy-on-write.
+            for schema in (self._std_schema, self._refl_schema):
+                ref = self._snapshots.publish(schema)
+                if ref is not None:
+                    cmdline.extend(['--preload-snapshot', ref.path])
 
         transport, _ = await self._loop.subprocess_exec(
             lambda: self,
@@ -725,6 +1076,10 @@ class BaseLocalPool(
 
         await self._stop()
 
+        if self._snapshots is not None:
+            self._snapshots.close()
+            self._snapshots = None
+
     async def _stop(self):
         raise NotImplementedError
 
@@ -743,10 +1098,17 @@ class BaseLocalPool(
             self._stats_killed,
         )
 
-    async def _acquire_worker(self, *, condition=None, weighter=None):
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        weighter=None,
+        lane=queue.Lane.Compile,
+        key=None,
+    ):
         while (
             worker := await self._workers_queue.acquire(
-                condition=condition, weighter=weighter
+                condition=condition, weighter=weighter, lane=lane, key=key
             )
         ).get_pid() not in self._workers:
             # The worker was disconnected; skip to the next one.
@@ -858,7 +1220,14 @@ class SimpleAdaptivePool(BaseLocalPool):
         for transport in transports.values():
             await transport._wait()
 
-    async def _acquire_worker(self, *, condition=None, weighter=None):
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        weighter=None,
+        lane=queue.Lane.Compile,
+        key=None,
+    ):
         if (
             self._running and
             self._scale_up_handle is None
@@ -878,7 +1247,7 @@ class SimpleAdaptivePool(BaseLocalPool):
             self._scale_down_handle.cancel()
             self._scale_down_handle = None
         return await super()._acquire_worker(
-            condition=condition, weighter=weighter
+            condition=condition, weighter=weighter, lane=lane, key=key
         )
 
     def _release_worker(self, worker, *, put_in_front: bool = True):
@@ -1083,10 +1452,22 @@ class RemotePool(AbstractPool):
             self._worker = self._loop.create_future()
             self._loop.create_task(self.start(retry=True))
 
-    async def _acquire_worker(self, *, condition=None, cmp=None):
+    async def _acquire_worker(
+        self,
+        *,
+        condition=None,
+        weighter=None,
+        lane=queue.Lane.Compile,
+        key=None,
+    ):
         await self._semaphore.acquire()
         return await self._worker
 
+    def _pickle_user_schema_update(self, base_schema, user_schema):
+        # The compiler server keeps the pickled schemas of its clients
+        # as is, so always send it the full schema.
+        return _pickle_memoized(user_schema)
+
     def _release_worker(self, worker, *, put_in_front: bool = True):
         if self._sync_lock.locked():
             self._sync_lock.release()
@@ -20,12 +20,38 @@ from __future__ import annotations
 
 import asyncio
 import collections
+import enum
+import time
 import typing
 
+from edb.server import metrics
+
 
 W = typing.TypeVar('W')
 W2 = typing.TypeVar('W2', contravariant=True)
 
+# A lane with waiters is passed over at most this many times in a row
+# in favor of higher priority lanes, so that it is never starved.
+MAX_LANE_SKIPS = 4
+
+
+class Lane(enum.IntEnum):
+    """Priority lanes of requests waiting for a worker.
+
+    Lower values are served first.
+    """
+
+    # Short requests, such as compilations of queries missing the
+    # compiled query cache.
+    Compile = 0
+
+    # Long running requests, such as DDL, migrations or describing
+    # a database dump.
+    Heavy = 1
+
+    def get_label(self) -> str:
+        return self.name.lower()
+
 
 class _AcquireCondition(typing.Protocol[W2]):
 
@@ -37,7 +63,16 @@ class WorkerQueue(typing.Generic[W]):
 
     loop: asyncio.AbstractEventLoop
 
-    _waiters: typing.Deque[asyncio.Future[None]]
+    # Waiters of every lane, grouped by key (usually the database name).
+    # Keys of a lane are served in round-robin order, so that a key with
+    # many waiters does not delay the others more than by one request.
+    _lanes: typing.List[
+        collections.OrderedDict[
+            typing.Hashable, typing.Deque[asyncio.Future[None]]
+        ]
+    ]
+    _lane_skips: typing.List[int]
+    _num_waiters: int
     _queue: typing.Deque[W]
 
     def __init__(
@@ -45,7 +80,9 @@ class WorkerQueue(typing.Generic[W]):
         loop: asyncio.AbstractEventLoop,
     ) -> None:
         self._loop = loop
-        self._waiters = collections.deque()
+        self._lanes = [collections.OrderedDict() for _ in Lane]
+        self._lane_skips = [0 for _ in Lane]
+        self._num_waiters = 0
         self._queue = collections.deque()
 
     async def acquire(
@@ -53,7 +90,11 @@ class WorkerQueue(typing.Generic[W]):
         *,
         condition: typing.Optional[_AcquireCondition[W]]=None,
         weighter=None,
+        lane: Lane=Lane.Compile,
+        key: typing.Hashable=None,
     ) -> W:
+        started_at = time.monotonic()
+
         # There can be a race between a waiter scheduled for to wake up
         # and a worker being stolen (due to quota being enforced,
         # for example).  In which case the waiter might get finally
@@ -63,33 +104,29 @@ class WorkerQueue(typing.Generic[W]):
             waiter = self._loop.create_future()
 
             attempts += 1
-            if attempts > 1:
-                # If the waiter was woken up only to discover that
-                # it needs to wait again, we don't want it to lose
-                # its place in the waiters queue.
-                self._waiters.appendleft(waiter)
-            else:
-                # On the first attempt the waiter goes to the end
-                # of the waiters queue.
-                self._waiters.append(waiter)
+            # If the waiter was woken up only to discover that it needs
+            # to wait again, we don't want it to lose its place in the
+            # waiters queue.  On the first attempt the waiter goes to the
+            # end of the waiters queue.
+            self._add_waiter(waiter, lane, key, first=attempts > 1)
 
             try:
                 await waiter
             except Exception:
                 if not waiter.done():
                     waiter.cancel()
-                try:
-                    self._waiters.remove(waiter)
-                except ValueError:
-                    # The waiter could be removed from self._waiters
-                    # by a previous release() call.
-                    pass
+                # The waiter could be removed already by a previous
+                # release() call.
+                self._remove_waiter(waiter, lane, key)
                 if self._queue and not waiter.cancelled():
                     # We were woken up by release(), but can't take
                     # the call.  Wake up the next in line.
                     self._wakeup_next_waiter()
                 raise
 
+        metrics.compiler_pool_queue_wait_duration.observe(
+            time.monotonic() - started_at, lane.get_label())
+
         if len(self._queue) > 1:
             if condition is not None:
                 for w in self._queue:
@@ -122,11 +159,82 @@ class WorkerQueue(typing.Generic[W]):
         return len(self._queue)
 
     def count_waiters(self) -> int:
-        return len(self._waiters)
+        return self._num_waiters
+
+    def _add_waiter(
+        self,
+        waiter: asyncio.Future[None],
+        lane: Lane,
+        key: typing.Hashable,
+        *,
+        first: bool,
+    ) -> None:
+        waiters = self._lanes[lane]
+        try:
+            key_waiters = waiters[key]
+        except KeyError:
+            key_waiters = waiters[key] = collections.deque()
+        if first:
+            key_waiters.appendleft(waiter)
+            waiters.move_to_end(key, last=False)
+        else:
+            key_waiters.append(waiter)
+        self._num_waiters += 1
+        metrics.compiler_pool_queue_depth.inc(1.0, lane.get_label())
+
+    def _remove_waiter(
+        self,
+        waiter: asyncio.Future[None],
+        lane: Lane,
+        key: typing.Hashable,
+    ) -> None:
+        waiters = self._lanes[lane]
+        key_waiters = waiters.get(key)
+        if key_waiters is None:
+            return
+        try:
+            key_waiters.remove(waiter)
+        except ValueError:
+            return
+        if not key_waiters:
+            del waiters[key]
+        self._num_waiters -= 1
+        metrics.compiler_pool_queue_depth.dec(1.0, lane.get_label())
+
+    def _pop_waiter(self) -> asyncio.Future[None]:
+        # Serve the highest priority lane with waiters, unless a lower
+        # priority lane has been passed over too many times already.
+        chosen = None
+        for lane in Lane:
+            if not self._lanes[lane]:
+                continue
+            if chosen is None:
+                chosen = lane
+            elif self._lane_skips[lane] >= MAX_LANE_SKIPS:
+                chosen = lane
+                break
+        assert chosen is not None
+
+        for lane in Lane:
+            if lane == chosen:
+                self._lane_skips[lane] = 0
+            elif self._lanes[lane]:
+                self._lane_skips[lane] += 1
+
+        waiters = self._lanes[chosen]
+        key, key_waiters = next(iter(waiters.items()))
+        waiter = key_waiters.popleft()
+        if key_waiters:
+            waiters.move_to_end(key)
+        else:
+            del waiters[key]
+        self._num_waiters -= 1
+        metrics.compiler_pool_queue_depth.dec(1.0, chosen.get_label())
+        return waiter
 
     def _wakeup_next_waiter(self) -> None:
-        while self._waiters:
-            waiter = self._waiters.popleft()
+        while self._num_waiters:
+            waiter = self._pop_waiter()
             if not waiter.done():
                 waiter.set_result(None)
                 break
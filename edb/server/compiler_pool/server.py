@@ -41,6 +41,7 @@ from .. import args as srvargs
 from .. import defines
 from . import amsg
 from . import pool as pool_mod
+from . import queue
 from . import worker_proc
 from . import state as state_mod
 
@@ -345,8 +346,16 @@ class MultiSchemaPool(pool_mod.FixedPool):
                 f"failed to sync compiler server state: "
                 f"{type(ex).__name__}({ex})"
             ) from ex
+        if method_name == "compile":
+            lane = pool_mod.get_compile_lane(args[6])
+        elif method_name == "compile_notebook":
+            lane = queue.Lane.Heavy
+        else:
+            lane = queue.Lane.Compile
         worker = await self._acquire_worker(
-            weighter=functools.partial(self._weighter, client_id)
+            weighter=functools.partial(self._weighter, client_id),
+            lane=lane,
+            key=client_id,
         )
         try:
             diff = client_schema = self._clients[client_id]
@@ -403,15 +412,17 @@ class MultiSchemaPool(pool_mod.FixedPool):
     async def compile_in_tx(
         self, pickled_state, state_id, txid, *compile_args, msg=None
     ):
+        lane = pool_mod.get_compile_lane(compile_args[0])
         if pickled_state == state_mod.REUSE_LAST_STATE_MARKER:
             worker = await self._acquire_worker(
-                condition=lambda w: (w._last_pickled_state == state_id)
+                condition=lambda w: (w._last_pickled_state == state_id),
+                lane=lane,
             )
             if worker._last_pickled_state != state_id:
                 self._release_worker(worker)
                 raise state_mod.StateNotFound()
         else:
-            worker = await self._acquire_worker()
+            worker = await self._acquire_worker(lane=lane)
         try:
             resp = await worker.call(
                 "compile_in_tx", pickled_state, txid, *compile_args, msg=msg
@@ -425,7 +436,14 @@ class MultiSchemaPool(pool_mod.FixedPool):
             self._release_worker(worker, put_in_front=False)
 
     async def _request(self, method_name, msg):
-        worker = await self._acquire_worker()
+        if method_name in {
+            "describe_database_dump",
+            "describe_database_restore",
+        }:
+            lane = queue.Lane.Heavy
+        else:
+            lane = queue.Lane.Compile
+        worker = await self._acquire_worker(lane=lane)
         try:
             return await worker.call(method_name, msg=msg)
         finally:
@@ -529,6 +547,7 @@ async def server_main(
     pool_size,
     client_schema_cache_size,
     runstate_dir,
+    sock=None,
 ):
     if listen_port is None:
         listen_port = defines.EDGEDB_REMOTE_COMPILER_PORT
@@ -558,12 +577,21 @@ async def server_main(
         )
         await pool.start()
         try:
-            server = await loop.create_server(
-                lambda: CompilerServerProtocol(pool, loop),
-                listen_addresses,
-                listen_port,
-                start_serving=False,
-            )
+            if sock is not None:
+                # Already bound and listening, e.g. by the primary
+                # process of a server with --frontend-processes.
+                server = await loop.create_server(
+                    lambda: CompilerServerProtocol(pool, loop),
+                    sock=sock,
+                    start_serving=False,
+                )
+            else:
+                server = await loop.create_server(
+                    lambda: CompilerServerProtocol(pool, loop),
+                    listen_addresses,
+                    listen_port,
+                    start_serving=False,
+                )
             if len(listen_addresses) == 1:
                 logger.info(
                     "Listening on %s:%s", listen_addresses[0], listen_port
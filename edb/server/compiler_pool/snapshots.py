@@ -0,0 +1,130 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""Schema snapshots shared by the local compiler pool and its workers.
+
+Instead of sending every worker its own pickled copy of a schema over
+the IPC socket, the pool writes the pickle once into a file on a shared
+memory file system and sends the workers a reference to it.  Workers
+map the file read-only and unpickle straight from the mapping, and only
+when they actually need the object.
+
+A snapshot file lives as long as the object it was made of is alive in
+the pool process.
+"""
+
+
+from __future__ import annotations
+from typing import *
+
+import mmap
+import os
+import os.path
+import pickle
+import shutil
+import tempfile
+import weakref
+
+
+SHM_DIR = '/dev/shm'
+
+# Objects preloaded by the worker template process before it forks
+# the actual workers, keyed by snapshot path.
+_preloaded: Dict[str, Any] = {}
+
+
+class SnapshotRef(NamedTuple):
+
+    path: str
+    size: int
+
+
+class SnapshotStore:
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._refs: Dict[int, SnapshotRef] = {}
+        self._counter = 0
+
+    @classmethod
+    def create(cls, runstate_dir: str) -> SnapshotStore:
+        # Prefer a tmpfs mount, so that the snapshots are backed by
+        # shared memory rather than by disk.
+        if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+            base_dir = SHM_DIR
+        else:
+            base_dir = runstate_dir
+        return cls(tempfile.mkdtemp(prefix='edgedb-schema-', dir=base_dir))
+
+    def publish(self, obj: Any) -> Optional[SnapshotRef]:
+        """Return a reference to a snapshot of *obj*, making it if needed.
+
+        Returns None if the object cannot be tracked, in which case it
+        should be sent to the workers as is.
+        """
+        key = id(obj)
+        ref = self._refs.get(key)
+        if ref is not None:
+            return ref
+
+        self._counter += 1
+        path = os.path.join(self._path, f'{self._counter}.pickle')
+        try:
+            finalizer = weakref.finalize(obj, self._discard, key, path)
+        except TypeError:
+            return None
+        finalizer.atexit = False
+
+        data = pickle.dumps(obj, -1)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        ref = SnapshotRef(path, len(data))
+        self._refs[key] = ref
+        return ref
+
+    def _discard(self, key: int, path: str) -> None:
+        self._refs.pop(key, None)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        self._refs.clear()
+        shutil.rmtree(self._path, ignore_errors=True)
+
+
+def load(ref: SnapshotRef) -> Any:
+    obj = _preloaded.get(ref.path)
+    if obj is not None:
+        return obj
+    with open(ref.path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            with memoryview(buf) as view:
+                return pickle.loads(view)
+
+
+def preload(path: str) -> None:
+    """Load a snapshot ahead of time in the worker template process.
+
+    The workers forked afterwards share the loaded object with the
+    template process (and with each other) copy-on-write.
+    """
+    _preloaded[path] = load(SnapshotRef(path, 0))
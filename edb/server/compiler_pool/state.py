@@ -38,6 +38,24 @@ class DatabaseState(typing.NamedTuple):
 DatabasesState = immutables.Map[str, DatabaseState]
 
 
+class TxState(typing.NamedTuple):
+    """The compiler state of a transaction, kept by a compiler worker.
+
+    The server only has the state as pickled after the last statement
+    that cannot be recompiled to the same result (e.g. DDL, which makes
+    new object ids), and the arguments of the statements compiled since.
+    That is enough to rebuild the state in another worker when the one
+    that has it is busy or lost.
+    """
+
+    handle: int
+    # The number of statements compiled in the transaction so far.
+    seq: int
+    pickled_state: bytes
+    # (txid, compile_args) of the statements compiled after pickled_state.
+    replay: typing.Tuple[typing.Tuple[int, typing.Tuple[typing.Any, ...]], ...]
+
+
 class FailedStateSync(Exception):
     pass
 
@@ -26,12 +26,15 @@ import immutables
 
 from edb import edgeql
 from edb import graphql
+from edb.common import lru
+from edb.common import sampler
 from edb.pgsql import params as pgparams
 from edb.schema import schema as s_schema
 from edb.server import compiler
 from edb.server import config
 from edb.server import defines
 
+from . import snapshots
 from . import state
 from . import worker_proc
 
@@ -42,9 +45,14 @@ BACKEND_RUNTIME_PARAMS: pgparams.BackendRuntimeParams = \
     pgparams.get_default_runtime_params()
 COMPILER: compiler.Compiler
 LAST_STATE: Optional[compiler.dbstate.CompilerConnectionState] = None
+# handle -> (seq, state) of the transactions compiled by this worker,
+# see state.TxState.
+TX_STATES: lru.LRUMapping = lru.LRUMapping(
+    maxsize=defines.BACKEND_COMPILER_TX_STATES)
 STD_SCHEMA: s_schema.FlatSchema
 GLOBAL_SCHEMA: s_schema.FlatSchema
 INSTANCE_CONFIG: immutables.Map[str, config.SettingValue]
+SAMPLER = sampler.StackSampler('compiler_worker')
 
 
 def __init_worker__(
@@ -68,6 +76,13 @@ def __init_worker__(
         system_config,
     ) = pickle.loads(init_args_pickled)
 
+    if isinstance(std_schema, snapshots.SnapshotRef):
+        std_schema = snapshots.load(std_schema)
+    if isinstance(refl_schema, snapshots.SnapshotRef):
+        refl_schema = snapshots.load(refl_schema)
+    if isinstance(global_schema, snapshots.SnapshotRef):
+        global_schema = snapshots.load(global_schema)
+
     INITED = True
     DBS = dbs
     BACKEND_RUNTIME_PARAMS = backend_runtime_params
@@ -83,8 +98,29 @@ def __init_worker__(
     )
 
 
+def _unpickle(data: Any) -> Any:
+    if isinstance(data, snapshots.SnapshotRef):
+        return snapshots.load(data)
+    else:
+        return pickle.loads(data)
+
+
+def _load_snapshots(db: state.DatabaseState) -> state.DatabaseState:
+    # The state of databases passed in the init args may refer to
+    # shared snapshots, which are only loaded on first use.
+    updates = {}
+    for field in ('user_schema', 'reflection_cache', 'database_config'):
+        value = getattr(db, field)
+        if isinstance(value, snapshots.SnapshotRef):
+            updates[field] = snapshots.load(value)
+    if updates:
+        db = db._replace(**updates)
+    return db
+
+
 def __sync__(
     dbname: str,
+    evicted_dbs: Tuple[str, ...],
     user_schema: Optional[bytes],
     reflection_cache: Optional[bytes],
     global_schema: Optional[bytes],
@@ -96,14 +132,18 @@ def __sync__(
     global INSTANCE_CONFIG
 
     try:
+        for evicted in evicted_dbs:
+            if evicted in DBS:
+                DBS = DBS.delete(evicted)
+
         db = DBS.get(dbname)
         if db is None:
             assert user_schema is not None
             assert reflection_cache is not None
             assert database_config is not None
-            user_schema_unpacked = pickle.loads(user_schema)
-            reflection_cache_unpacked = pickle.loads(reflection_cache)
-            database_config_unpacked = pickle.loads(database_config)
+            user_schema_unpacked = _unpickle(user_schema)
+            reflection_cache_unpacked = _unpickle(reflection_cache)
+            database_config_unpacked = _unpickle(database_config)
             db = state.DatabaseState(
                 dbname,
                 user_schema_unpacked,
@@ -112,24 +152,29 @@ def __sync__(
             )
             DBS = DBS.set(dbname, db)
         else:
+            loaded_db = _load_snapshots(db)
             updates = {}
 
             if user_schema is not None:
-                updates['user_schema'] = pickle.loads(user_schema)
+                user_schema_unpacked = _unpickle(user_schema)
+                if isinstance(user_schema_unpacked, s_schema.FlatSchemaDelta):
+                    user_schema_unpacked = loaded_db.user_schema.apply_delta(
+                        user_schema_unpacked)
+                updates['user_schema'] = user_schema_unpacked
             if reflection_cache is not None:
-                updates['reflection_cache'] = pickle.loads(reflection_cache)
+                updates['reflection_cache'] = _unpickle(reflection_cache)
             if database_config is not None:
-                updates['database_config'] = pickle.loads(database_config)
+                updates['database_config'] = _unpickle(database_config)
 
-            if updates:
-                db = db._replace(**updates)
+            if updates or loaded_db is not db:
+                db = loaded_db._replace(**updates)
                 DBS = DBS.set(dbname, db)
 
         if global_schema is not None:
-            GLOBAL_SCHEMA = pickle.loads(global_schema)
+            GLOBAL_SCHEMA = _unpickle(global_schema)
 
         if system_config is not None:
-            INSTANCE_CONFIG = pickle.loads(system_config)
+            INSTANCE_CONFIG = _unpickle(system_config)
 
     except Exception as ex:
         raise state.FailedStateSync(
@@ -140,6 +185,7 @@ def __sync__(
 
 def compile(
     dbname: str,
+    evicted_dbs: Tuple[str, ...],
     user_schema: Optional[bytes],
     reflection_cache: Optional[bytes],
     global_schema: Optional[bytes],
@@ -150,6 +196,7 @@ def compile(
 ):
     db = __sync__(
         dbname,
+        evicted_dbs,
         user_schema,
         reflection_cache,
         global_schema,
@@ -176,19 +223,63 @@ def compile(
     return units, pickled_state
 
 
-def compile_in_tx(cstate, *args, **kwargs):
+# Statements that cannot be recompiled to the same compiler state.
+_NOT_REPLAYABLE = (
+    compiler.Capability.DDL | compiler.Capability.PERSISTENT_CONFIG
+)
+
+
+def compile_in_tx(
+    handle: int,
+    seq: int,
+    pickled_state: Optional[bytes],
+    replay: Tuple[Tuple[int, Tuple[Any, ...]], ...],
+    checkpoint: bool,
+    txid: int,
+    *compile_args: Any,
+):
     global LAST_STATE
-    if cstate == state.REUSE_LAST_STATE_MARKER:
-        cstate = LAST_STATE
+    if pickled_state is None:
+        try:
+            state_seq, cstate = TX_STATES.pop(handle)
+        except KeyError:
+            raise state.StateNotFound() from None
+        if state_seq != seq:
+            # A later statement of the transaction was compiled elsewhere.
+            raise state.StateNotFound()
     else:
-        cstate = pickle.loads(cstate)
-    units, cstate = COMPILER.compile_in_tx(cstate, *args, **kwargs)
-    LAST_STATE = cstate
-    return units, pickle.dumps(cstate, -1)
+        if pickled_state == state.REUSE_LAST_STATE_MARKER:
+            # We compiled the start of the transaction, the state is
+            # ours from now on.
+            cstate = LAST_STATE
+            LAST_STATE = None
+        else:
+            cstate = pickle.loads(pickled_state)
+        for replay_txid, replay_args in replay:
+            _, cstate = COMPILER.compile_in_tx(
+                cstate, replay_txid, *replay_args)
+
+    try:
+        units, cstate = COMPILER.compile_in_tx(cstate, txid, *compile_args)
+    except Exception:
+        TX_STATES[handle] = (seq, cstate)
+        raise
+
+    if cstate.current_tx().is_implicit():
+        # The transaction is over; the next statement will be compiled
+        # by compile() with a fresh state.
+        return units, None, False
+
+    TX_STATES[handle] = (seq + 1, cstate)
+    pickled_state = None
+    if checkpoint or units.capabilities & _NOT_REPLAYABLE:
+        pickled_state = pickle.dumps(cstate, -1)
+    return units, pickled_state, True
 
 
 def compile_notebook(
     dbname: str,
+    evicted_dbs: Tuple[str, ...],
     user_schema: Optional[bytes],
     reflection_cache: Optional[bytes],
     global_schema: Optional[bytes],
@@ -199,6 +290,7 @@ def compile_notebook(
 ):
     db = __sync__(
         dbname,
+        evicted_dbs,
         user_schema,
         reflection_cache,
         global_schema,
@@ -226,6 +318,7 @@ def try_compile_rollback(
 
 def compile_graphql(
     dbname: str,
+    evicted_dbs: Tuple[str, ...],
     user_schema: Optional[bytes],
     reflection_cache: Optional[bytes],
     global_schema: Optional[bytes],
@@ -236,6 +329,7 @@ def compile_graphql(
 ) -> tuple[compiler.QueryUnitGroup, graphql.TranspiledOperation]:
     db = __sync__(
         dbname,
+        evicted_dbs,
         user_schema,
         reflection_cache,
         global_schema,
@@ -280,6 +374,14 @@ def compile_graphql(
     return unit_group, gql_op
 
 
+def set_profiler_rate(rate: int) -> None:
+    SAMPLER.start(rate)
+
+
+def collect_profile() -> Dict[str, int]:
+    return SAMPLER.collect()
+
+
 def get_handler(methname):
     if methname == "__init_worker__":
         meth = __init_worker__
@@ -298,6 +400,10 @@ def get_handler(methname):
             meth = compile_graphql
         elif methname == "try_compile_rollback":
             meth = try_compile_rollback
+        elif methname == "set_profiler_rate":
+            meth = set_profiler_rate
+        elif methname == "collect_profile":
+            meth = collect_profile
         else:
             meth = getattr(COMPILER, methname)
     return meth
@@ -31,6 +31,7 @@ from edb.common import markup
 from edb.edgeql import parser as ql_parser
 
 from . import amsg
+from . import snapshots
 
 
 # "created continuously" means the interval between two consecutive spawns
@@ -107,9 +108,12 @@ def main(get_handler):
     parser.add_argument("--sockname")
     parser.add_argument("--numproc")
     parser.add_argument("--version-serial", type=int)
+    parser.add_argument("--preload-snapshot", action="append", default=[])
     args = parser.parse_args()
 
     ql_parser.preload(allow_rebuild=False)
+    for path in args.preload_snapshot:
+        snapshots.preload(path)
     gc.freeze()
 
     if args.numproc is None:
@@ -24,6 +24,7 @@ import typing
 import asyncio
 import collections
 import dataclasses
+import math
 import time
 
 from . import rolavg
@@ -34,6 +35,9 @@ MIN_QUERY_TIME_THRESHOLD = 0.001
 MIN_LOG_TIME_THRESHOLD = 1
 CONNECT_FAILURE_RETRIES = 3
 MIN_IDLE_TIME_BEFORE_GC = 120
+SPARE_CONNS = 2
+MIN_FORECAST_SAMPLES = 3
+WARM_TARGET_DECAY = 0.8
 
 logger = logging.getLogger("edb.server")
 
@@ -96,6 +100,9 @@ class ConnectionState:
     in_use_since: float = 0
     in_use: bool = False
     in_stack_since: float = 0
+    # An opaque key of the state the connection was left in by its last
+    # user (e.g. the session state applied on it), see Block.acquire().
+    affinity: typing.Hashable = None
 
 
 class Block(typing.Generic[C]):
@@ -117,6 +124,11 @@ class Block(typing.Generic[C]):
     # in a waiters' queue (conn_waiters), if the demand cannot be fulfilled
     # immediately without blocking/awaiting. When connections are ready in the
     # stack, the next task in the queue will be woken up to continue.
+    #
+    # Acquisitions may also ask for a connection with a specific "affinity",
+    # in which case an idle connection last released with the same affinity
+    # is preferred over the top of the stack.  This lets connections that
+    # carry some state keep serving the users with the same state.
 
     loop: asyncio.AbstractEventLoop
     dbname: str
@@ -130,10 +142,17 @@ class Block(typing.Generic[C]):
     conn_waiters: typing.Deque[asyncio.Future[None]]
     conn_stack: typing.Deque[C]
     connect_failures_num: int
+    idle_affinities: typing.Dict[typing.Hashable, int]
 
     querytime_avg: rolavg.RollingAverage
     nwaiters_avg: rolavg.RollingAverage
 
+    peak_demand: int  # max acquired connections since the last tick
+    contended: bool  # whether an acquire had to wait since the last tick
+    demand_forecast: rolavg.DemandForecast
+    warm_target: int  # connections to keep ready ahead of demand
+    warm_target_timestamp: float
+
     _cached_calibrated_demand: float
 
     _is_log_batching: bool
@@ -158,10 +177,18 @@ class Block(typing.Generic[C]):
         self.conn_waiters = collections.deque()
         self.conn_stack = collections.deque()
         self.connect_failures_num = 0
+        # Number of connections in the stack per affinity
+        self.idle_affinities = {}
 
         self.querytime_avg = rolavg.RollingAverage(history_size=20)
         self.nwaiters_avg = rolavg.RollingAverage(history_size=3)
 
+        self.peak_demand = 0
+        self.contended = False
+        self.demand_forecast = rolavg.DemandForecast(alpha=0.5, beta=0.3)
+        self.warm_target = 0
+        self.warm_target_timestamp = 0
+
         self._is_log_batching = False
         self._last_log_timestamp = 0
         self._log_events = {}
@@ -224,9 +251,11 @@ class Block(typing.Generic[C]):
             if self.conns[oldest_conn].in_stack_since > only_older_than:
                 return None
 
-        return self.conn_stack.popleft()
+        conn = self.conn_stack.popleft()
+        self._untrack_idle(conn)
+        return conn
 
-    async def acquire(self) -> C:
+    async def acquire(self, affinity: typing.Hashable = None) -> C:
         # There can be a race between a waiter scheduled for to wake up
         # and a connection being stolen (due to quota being enforced,
         # for example).  In which case the waiter might get finally
@@ -241,6 +270,7 @@ class Block(typing.Generic[C]):
             # without blocking the main loop, so we are fine here. (This is
             # also how asyncio.Queue is implemented.)
             while not self.conn_stack:
+                self.contended = True
                 waiter = self.loop.create_future()
 
                 attempts += 1
@@ -271,16 +301,50 @@ class Block(typing.Generic[C]):
                         self._wakeup_next_waiter()
                     raise
 
-            # Yield the most recently used connection from the top of the stack
-            return self.conn_stack.pop()
+            if affinity is not None and self.idle_affinities.get(affinity):
+                # Yield the most recently used connection with the requested
+                # affinity,
+                conn = self._pop_with_affinity(affinity)
+            else:
+                # or the most recently used connection from the top of the
+                # stack.
+                conn = self.conn_stack.pop()
+                self._untrack_idle(conn)
+            return conn
         finally:
             self.conn_waiters_num -= 1
 
-    def release(self, conn: C) -> None:
+    def _pop_with_affinity(self, affinity: typing.Hashable) -> C:
+        stack = self.conn_stack
+        for i in range(len(stack) - 1, -1, -1):
+            conn = stack[i]
+            if self.conns[conn].affinity == affinity:
+                del stack[i]
+                self._untrack_idle(conn)
+                return conn
+        conn = stack.pop()
+        self._untrack_idle(conn)
+        return conn
+
+    def _untrack_idle(self, conn: C) -> None:
+        affinity = self.conns[conn].affinity
+        if affinity is not None:
+            n = self.idle_affinities[affinity] - 1
+            if n:
+                self.idle_affinities[affinity] = n
+            else:
+                del self.idle_affinities[affinity]
+
+    def release(self, conn: C, affinity: typing.Hashable = None) -> None:
+        conn_state = self.conns[conn]
         # Put the connection (back) to the top of the stack,
         self.conn_stack.append(conn)
-        # refresh the timestamp,
-        self.conns[conn].in_stack_since = time.monotonic()
+        # refresh the timestamp and the affinity,
+        conn_state.in_stack_since = time.monotonic()
+        conn_state.affinity = affinity
+        if affinity is not None:
+            self.idle_affinities[affinity] = (
+                self.idle_affinities.get(affinity, 0) + 1)
         # and call the queue.
         self._wakeup_next_waiter()
 
@@ -663,6 +727,7 @@ class Pool(BasePool[C]):
     _to_drop: typing.List[Block[C]]
     _gc_interval: float  # minimum seconds between GC runs
     _gc_requests: int  # number of GC requests
+    _spare_conns: int  # warm spare connections per hot block, 0 disables
 
     def __init__(
         self,
@@ -672,6 +737,7 @@ class Pool(BasePool[C]):
         max_capacity: int,
         stats_collector: typing.Optional[StatsCollector]=None,
         min_idle_time_before_gc: float = MIN_IDLE_TIME_BEFORE_GC,
+        spare_conns: int = SPARE_CONNS,
     ) -> None:
         super().__init__(
             connect=connect,
@@ -690,6 +756,7 @@ class Pool(BasePool[C]):
         self._to_drop = []
         self._gc_interval = min_idle_time_before_gc
         self._gc_requests = 0
+        self._spare_conns = spare_conns
 
     def _maybe_schedule_tick(self) -> None:
         if self._first_tick:
@@ -717,6 +784,8 @@ class Pool(BasePool[C]):
         self._report_snapshot()
         self._capture_snapshot(now=now)
 
+        self._forecast_demand(now)
+
         # If we're managing connections to only one PostgreSQL DB (Mode A),
         # bail out early. Just give the one and only block we have the max
         # possible quota (which is needed only for logging purposes.)
@@ -727,6 +796,7 @@ class Pool(BasePool[C]):
                 first_block = next(iter(self._blocks.values()))
                 first_block.quota = self._max_capacity
                 first_block.nwaiters_avg.add(first_block.count_waiters())
+                self._maybe_prewarm(first_block)
             return
 
         # Go over all the blocks and calculate:
@@ -792,8 +862,10 @@ class Pool(BasePool[C]):
                 # If we still have space for more connections (Mode B), don't
                 # actively rebalance the pool just yet - rebalance will kick in
                 # when the max capacity is hit; or we'll depend on the garbage
-                # collection to shrink the over-quota blocks.
-                pass
+                # collection to shrink the over-quota blocks. Meanwhile,
+                # the spare capacity goes to the warm spares of hot blocks.
+                for block in self._blocks.values():
+                    self._maybe_prewarm(block)
 
             return
 
@@ -868,6 +940,60 @@ class Pool(BasePool[C]):
 
             self._maybe_rebalance()
 
+    def _forecast_demand(self, now: float) -> None:
+        # Predict the peak demand of each block one tick ahead - ticks are
+        # about as far apart as it takes to connect - to know how many
+        # connections the block should be opening by now. Hot blocks also get
+        # a few spare connections on top of that, to absorb spikes without
+        # waiting for a whole connect round trip. The target goes up as soon
+        # as the demand does, but only decays slowly as the load falls, so
+        # that recurring spikes find their connections still warm. Only
+        # blocks where acquires had to wait are hot, so that long-held
+        # connections alone don't get spares. GC gets to discard the
+        # connections above the target.
+        if not self._spare_conns:
+            return
+
+        for block in self._blocks.values():
+            demand = block.count_waiters() + block.conn_acquired_num
+            block.demand_forecast.add(max(block.peak_demand, demand))
+            block.peak_demand = demand
+            contended = block.contended or block.count_waiters() > 0
+            block.contended = False
+
+            expected = block.demand_forecast.forecast(1)
+            if (
+                not contended or
+                expected < 1 or
+                block.demand_forecast.count_samples() < MIN_FORECAST_SAMPLES
+            ):
+                # Not (yet) a hot block.
+                target = 0
+            else:
+                target = math.ceil(expected) + self._spare_conns
+            block.warm_target = max(
+                target, int(block.warm_target * WARM_TARGET_DECAY))
+            block.warm_target_timestamp = now
+
+    def _maybe_prewarm(self, block: Block[C]) -> None:
+        # Only ever called below max capacity (Mode A/B). Blocks failing to
+        # connect are left to the regular retry logic.
+        if block.connect_failures_num:
+            return
+
+        nconns = block.count_conns()
+        nprewarmed = 0
+        while (
+            nconns + nprewarmed < block.warm_target and
+            self._cur_capacity < self._max_capacity
+        ):
+            self._schedule_new_conn(block, 'prewarmed')
+            nprewarmed += 1
+
+        if nprewarmed:
+            self._log_to_snapshot(
+                dbname=block.dbname, event='prewarm', value=nprewarmed)
+
     def _maybe_rebalance(self) -> None:
         if self._is_starving:
             return
@@ -1048,7 +1174,9 @@ class Pool(BasePool[C]):
 
         return None, None
 
-    async def _acquire(self, dbname: str) -> C:
+    async def _acquire(
+        self, dbname: str, affinity: typing.Hashable
+    ) -> C:
         block = self._get_block(dbname)
 
         room_for_new_conns = self._cur_capacity < self._max_capacity
@@ -1076,7 +1204,7 @@ class Pool(BasePool[C]):
                 # Block has no connections at all, or not enough connections.
                 self._schedule_new_conn(block)
 
-            return await block.acquire()
+            return await block.acquire(affinity)
 
         if not block_nconns:
             # This is a block without any connections.
@@ -1084,15 +1212,15 @@ class Pool(BasePool[C]):
             # reallocated for this block.
             if not self._try_steal_conn(block):
                 self._new_blocks_waitlist[block] = True
-            return await block.acquire()
+            return await block.acquire(affinity)
 
         if block_nconns < block.quota:
             # Let's see if we can steal a connection from some block
             # that's over quota and open a new one.
             self._try_steal_conn(block)
-            return await block.acquire()
+            return await block.acquire(affinity)
 
-        return await block.acquire()
+        return await block.acquire(affinity)
 
     def _run_gc(self) -> None:
         loop = self._get_loop()
@@ -1114,28 +1242,59 @@ class Pool(BasePool[C]):
         # Make sure the unused connections stay in the pool for at least one
         # GC interval. So theoretically unused connections are usually GC-ed
         # within 1-2 GC intervals.
-        only_older_than = time.monotonic() - self._gc_interval
+        now = time.monotonic()
+        only_older_than = now - self._gc_interval
+        kept_warm = False
         for block in self._blocks.values():
-            while (conn := block.try_steal(only_older_than)) is not None:
+            # Keep the warm spares of the blocks that are still hot.
+            if now - block.warm_target_timestamp < self._gc_interval:
+                excess = block.count_conns() - block.warm_target
+                kept_warm = kept_warm or block.warm_target > 0
+            else:
+                excess = block.count_conns()
+            while (
+                excess > 0 and
+                (conn := block.try_steal(only_older_than)) is not None
+            ):
                 loop.create_task(self._discard_conn(block, conn))
+                excess -= 1
 
-    async def acquire(self, dbname: str) -> C:
+        if kept_warm and not self._gc_requests:
+            # Come back for the warm spares once they go stale, as no
+            # more ticks may happen to decay them if the load is gone.
+            self._gc_requests = 1
+            loop.call_later(self._gc_interval, self._run_gc)
+
+    async def acquire(
+        self, dbname: str, *, affinity: typing.Hashable = None
+    ) -> C:
+        # If affinity is given, prefer an idle connection that was last
+        # released with the same affinity.
         self._nacquires += 1
         self._maybe_schedule_tick()
         try:
-            conn = await self._acquire(dbname)
+            conn = await self._acquire(dbname, affinity)
         finally:
             self._nacquires -= 1
 
         block = self._blocks[dbname]
         assert not block.conns[conn].in_use
         block.inc_acquire_counter()
+        if block.conn_acquired_num > block.peak_demand:
+            block.peak_demand = block.conn_acquired_num
         block.conns[conn].in_use = True
         block.conns[conn].in_use_since = time.monotonic()
 
         return conn
 
-    def release(self, dbname: str, conn: C, *, discard: bool=False) -> None:
+    def release(
+        self,
+        dbname: str,
+        conn: C,
+        *,
+        discard: bool=False,
+        affinity: typing.Hashable=None,
+    ) -> None:
         try:
             block = self._blocks[dbname]
         except KeyError:
@@ -1175,7 +1334,7 @@ class Pool(BasePool[C]):
                 self._schedule_new_conn(block)
                 return
 
-            block.release(conn)
+            block.release(conn, affinity)
 
             # Only request for GC if the connection is released unused
             self._gc_requests += 1
@@ -1205,6 +1364,7 @@ class Pool(BasePool[C]):
         coros = []
         for block in self._blocks.values():
             block.conn_stack.clear()
+            block.idle_affinities.clear()
             for conn in block.conns:
                 coros.append(self._disconnect(conn, block))
             block.conns.clear()
@@ -49,3 +49,47 @@ class RollingAverage:
         )
 
         return self._cached_avg
+
+
+class DemandForecast:
+    # Double exponential smoothing (Holt's linear trend method) of a series
+    # of samples taken at roughly regular intervals: tracks both the level
+    # and the trend of the series, so that the forecast follows a rising or
+    # a falling demand instead of lagging behind it like a plain average.
+
+    __slots__ = ('_alpha', '_beta', '_level', '_trend', '_nsamples')
+
+    _alpha: float
+    _beta: float
+    _level: float
+    _trend: float
+    _nsamples: int
+
+    def __init__(self, *, alpha: float, beta: float):
+        self._alpha = alpha
+        self._beta = beta
+        self._level = 0
+        self._trend = 0
+        self._nsamples = 0
+
+    def add(self, n: float) -> None:
+        if not self._nsamples:
+            self._level = n
+        else:
+            last_level = self._level
+            self._level = (
+                self._alpha * n +
+                (1 - self._alpha) * (last_level + self._trend)
+            )
+            self._trend = (
+                self._beta * (self._level - last_level) +
+                (1 - self._beta) * self._trend
+            )
+        self._nsamples += 1
+
+    def count_samples(self) -> int:
+        return self._nsamples
+
+    def forecast(self, steps: float) -> float:
+        # The expected value `steps` samples ahead.
+        return max(self._level + self._trend * steps, 0)
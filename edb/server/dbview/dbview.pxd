@@ -72,8 +72,12 @@ cdef class Database:
 
     cdef:
         object _eql_to_compiled
+        dict _inflight_compiles
+        object _graphql_cache
+        object _graphql_persisted
         DatabaseIndex _index
         object _views
+        list _pooled_views
         object _introspection_lock
         object _state_serializers
 
@@ -84,20 +88,35 @@ cdef class Database:
         readonly object reflection_cache
         readonly object backend_ids
         readonly object extensions
+        # (base_version, version, changed object ids) of the last DDL
+        # applied by this server, or None.
+        readonly object last_schema_change
 
     cdef schedule_config_update(self)
 
     cdef _invalidate_caches(self)
+    cdef _invalidate_graphql_cache(self)
+    cdef _invalidate_dependent_caches(self, old_dbver, changed_ids)
     cdef _cache_compiled_query(self, key, query_unit)
     cdef _new_view(self, query_cache, protocol_version)
     cdef _remove_view(self, view)
+    cdef _acquire_pooled_view(self, protocol_version)
+    cdef _release_pooled_view(self, view)
     cdef _update_backend_ids(self, new_types)
+    cdef _update_user_schema(
+        self,
+        pickled_schema,
+        pickled_reflection,
+        changed_schema_objects,
+    )
+    cdef _load_user_schema(self, pickled_schema, changed_schema_objects)
     cdef _set_and_signal_new_user_schema(
         self,
         new_schema,
         reflection_cache=?,
         backend_ids=?,
         db_config=?,
+        changed_schema_objects=?,
     )
     cdef get_state_serializer(self, protocol_version)
 
@@ -158,6 +177,7 @@ cdef class DatabaseConnectionView:
 
     cdef _invalidate_local_cache(self)
     cdef _reset_tx_state(self)
+    cdef _reset_session_state(self)
 
     cdef clear_tx_error(self)
     cdef rollback_tx_to_savepoint(self, name)
@@ -180,7 +200,8 @@ cdef class DatabaseConnectionView:
     cdef on_error(self)
     cdef on_success(self, query_unit, new_types)
     cdef commit_implicit_tx(
-        self, user_schema, global_schema, cached_reflection
+        self, user_schema, global_schema, cached_reflection,
+        changed_schema_objects,
     )
 
     cpdef get_session_config(self)
@@ -38,7 +38,10 @@ from edb import edgeql
 from edb.edgeql import qltypes
 from edb.schema import extensions as s_ext
 from edb.schema import schema as s_schema
+from edb.schema import version as s_ver
 from edb.server import compiler, defines, config, metrics
+from edb.server.cache import compiled as compiled_cache
+from edb.server.cache import stmt_cache
 from edb.server.compiler import dbstate, sertypes
 from edb.pgsql import dbops
 
@@ -158,6 +161,8 @@ cdef class Database:
 
         self._index = index
         self._views = weakref.WeakSet()
+        # Idle stateless views reused by the HTTP endpoints.
+        self._pooled_views = []
         self._state_serializers = {}
 
         self._introspection_lock = asyncio.Lock()
@@ -165,8 +170,22 @@ cdef class Database:
         self._eql_to_compiled = lru.LRUMapping(
             maxsize=defines._MAX_QUERIES_CACHE)
 
+        # Compilations currently running in the compiler pool, used to
+        # coalesce concurrent requests for the same query.
+        self._inflight_compiles = {}
+
+        # Compiled GraphQL queries for the current schema version.
+        self._graphql_cache = stmt_cache.SizedStatementsCache(
+            maxsize=defines.HTTP_PORT_QUERY_CACHE_BYTES)
+
+        # GraphQL persisted queries by hash.  These don't depend on
+        # the schema and survive its changes.
+        self._graphql_persisted = lru.LRUMapping(
+            maxsize=defines.HTTP_PORT_PERSISTED_QUERY_CACHE_SIZE)
+
         self.db_config = db_config
         self.user_schema = user_schema
+        self.last_schema_change = None
         self.reflection_cache = reflection_cache
         self.backend_ids = backend_ids
         if user_schema is not None:
@@ -190,12 +209,40 @@ cdef class Database:
         reflection_cache=None,
         backend_ids=None,
         db_config=None,
+        changed_schema_objects=None,
     ):
         if new_schema is None:
             raise AssertionError('new_schema is not supposed to be None')
 
+        old_dbver = self.dbver
+        # Only evict the dependent compiled queries if the changes
+        # were made on top of the schema we have; otherwise we might
+        # have missed some other DDL.
+        incremental = (
+            changed_schema_objects is not None
+            and db_config is None
+            and self.user_schema is not None
+            and changed_schema_objects.base_version is not None
+            and changed_schema_objects.base_version
+                == s_ver.get_schema_version(self.user_schema)
+        )
+
         self.dbver = next_dbver()
 
+        # Other servers only need to introspect the changed objects if
+        # they have the schema the changes were made against.
+        if (
+            changed_schema_objects is not None
+            and changed_schema_objects.base_version is not None
+        ):
+            self.last_schema_change = (
+                changed_schema_objects.base_version,
+                s_ver.get_schema_version(new_schema),
+                changed_schema_objects.delta.get_changed_object_ids(),
+            )
+        else:
+            self.last_schema_change = None
+
         self.user_schema = new_schema
 
         self.extensions = {
@@ -209,14 +256,100 @@ cdef class Database:
             self.reflection_cache = reflection_cache
         if db_config is not None:
             self.db_config = db_config
-        self._invalidate_caches()
+        if incremental:
+            self._invalidate_dependent_caches(
+                old_dbver, changed_schema_objects.ids)
+        else:
+            self._invalidate_caches()
 
     cdef _update_backend_ids(self, new_types):
         self.backend_ids.update(new_types)
 
+    cdef _update_user_schema(
+        self,
+        pickled_schema,
+        pickled_reflection,
+        changed_schema_objects,
+    ):
+        new_schema = self._load_user_schema(
+            pickled_schema, changed_schema_objects)
+        if new_schema is None:
+            # The changes were made against a schema other than ours,
+            # which can only happen if we have concurrently introspected
+            # an even newer one.  The backend has the schema we need.
+            self.last_schema_change = None
+            self._invalidate_caches()
+            server = self._index._server
+            if server is not None:
+                server._on_remote_ddl(self.name)
+            return
+
+        self._set_and_signal_new_user_schema(
+            new_schema,
+            pickle.loads(pickled_reflection)
+                if pickled_reflection is not None
+                else None,
+            None,
+            None,
+            changed_schema_objects,
+        )
+
+    cdef _load_user_schema(self, pickled_schema, changed_schema_objects):
+        if pickled_schema is not None:
+            return pickle.loads(pickled_schema)
+
+        # Deriving the new schema from the current one, rather than
+        # unpickling it, keeps the unchanged objects shared between
+        # the two, which lets the compiler pool only send the changes
+        # to its workers.
+        if (
+            self.user_schema is not None
+            and changed_schema_objects.base_version
+                == s_ver.get_schema_version(self.user_schema)
+        ):
+            try:
+                return self.user_schema.apply_delta(
+                    changed_schema_objects.delta)
+            except ValueError:
+                pass
+        return None
+
     cdef _invalidate_caches(self):
         self._eql_to_compiled.clear()
         self._state_serializers.clear()
+        self._invalidate_graphql_cache()
+
+    cdef _invalidate_graphql_cache(self):
+        purged = self._graphql_cache.clear()
+        if purged:
+            metrics.graphql_query_cache_evictions.inc(
+                purged, self.name, 'outdated')
+        metrics.graphql_query_cache_size.set(0, self.name)
+
+    cdef _invalidate_dependent_caches(self, old_dbver, changed_ids):
+        self._state_serializers.clear()
+        # GraphQL queries don't track their schema dependencies.
+        self._invalidate_graphql_cache()
+
+        retained = 0
+        # Iterating from the least recently used key and re-inserting
+        # the retained entries preserves the LRU order.
+        for key in list(self._eql_to_compiled):
+            query_unit_group, qu_dbver = self._eql_to_compiled[key]
+            deps = query_unit_group.schema_deps
+            if (
+                qu_dbver == old_dbver
+                and deps is not None
+                and deps.isdisjoint(changed_ids)
+            ):
+                self._eql_to_compiled[key] = query_unit_group, self.dbver
+                retained += 1
+            else:
+                del self._eql_to_compiled[key]
+
+        server = self._index._server
+        if retained and server is not None:
+            server.on_compiled_query_cached(self.name)
 
     cdef _cache_compiled_query(self, key, compiled: dbstate.QueryUnitGroup):
         assert compiled.cacheable
@@ -228,6 +361,10 @@ cdef class Database:
 
         self._eql_to_compiled[key] = compiled, self.dbver
 
+        server = self._index._server
+        if server is not None:
+            server.on_compiled_query_cached(self.name)
+
     cdef _new_view(self, query_cache, protocol_version):
         view = DatabaseConnectionView(
             self, query_cache=query_cache, protocol_version=protocol_version
@@ -238,6 +375,31 @@ cdef class Database:
     cdef _remove_view(self, view):
         self._views.remove(view)
 
+    cdef _acquire_pooled_view(self, protocol_version):
+        cdef DatabaseConnectionView view
+
+        while self._pooled_views:
+            view = self._pooled_views.pop()
+            if view._protocol_version == protocol_version:
+                return view
+            self._remove_view(view)
+
+        return self._new_view(True, protocol_version)
+
+    cdef _release_pooled_view(self, view):
+        cdef DatabaseConnectionView dbv = <DatabaseConnectionView>view
+
+        if (
+            dbv._in_tx
+            or not dbv._query_cache_enabled
+            or len(self._pooled_views) >= defines.HTTP_PORT_DBVIEW_POOL_SIZE
+        ):
+            self._remove_view(dbv)
+            return
+
+        dbv._reset_session_state()
+        self._pooled_views.append(dbv)
+
     cdef get_state_serializer(self, protocol_version):
         if protocol_version not in self._state_serializers:
             self._state_serializers[protocol_version] = self._index._factory.make(
@@ -250,9 +412,107 @@ cdef class Database:
     def iter_views(self):
         yield from self._views
 
+    def lookup_graphql_query(self, key):
+        return self._graphql_cache.get(key, None)
+
+    def cache_graphql_query(self, key, entry, size, dbver):
+        if dbver != self.dbver:
+            # Compiled against an outdated schema.
+            return
+        evicted = self._graphql_cache.put(key, entry, size)
+        if evicted:
+            metrics.graphql_query_cache_evictions.inc(
+                evicted, self.name, 'lru')
+        metrics.graphql_query_cache_size.set(
+            self._graphql_cache.size, self.name)
+
+    def lookup_persisted_graphql_query(self, query_hash):
+        return self._graphql_persisted.get(query_hash)
+
+    def cache_persisted_graphql_query(self, query_hash, entry):
+        self._graphql_persisted[query_hash] = entry
+
+    def get_graphql_cache_size(self):
+        return len(self._graphql_cache)
+
     def get_query_cache_size(self):
         return len(self._eql_to_compiled)
 
+    def get_compiled_query_entries(self):
+        """Return cached queries compiled for the current schema version.
+
+        Entries are ordered from the least to the most recently used one
+        and only contain picklable, process-independent data, so that
+        they can be persisted and later passed to
+        restore_compiled_queries().
+        """
+        cdef QueryRequestInfo query_req
+
+        entries = []
+        # Iterating from the least recently used key and promoting
+        # every visited one preserves the LRU order.
+        for key in list(self._eql_to_compiled):
+            query_unit_group, qu_dbver = self._eql_to_compiled[key]
+            if qu_dbver != self.dbver:
+                continue
+            query_req, modaliases, session_config = key
+            entries.append((
+                query_req.source.cache_key(),
+                query_req.protocol_version,
+                query_req.output_format,
+                query_req.input_format,
+                query_req.expect_one,
+                query_req.implicit_limit,
+                query_req.inline_typeids,
+                query_req.inline_typenames,
+                query_req.inline_objectids,
+                modaliases,
+                session_config,
+                query_unit_group,
+            ))
+        return entries
+
+    def restore_compiled_queries(self, entries):
+        """Populate the query cache with persisted entries.
+
+        The caller is responsible for ensuring that *entries* were
+        obtained for the current schema.  Queries compiled since the
+        database was introspected take precedence over restored ones.
+        """
+        cdef QueryRequestInfo query_req
+
+        restored = 0
+        for (
+            cache_key,
+            protocol_version,
+            output_format,
+            input_format,
+            expect_one,
+            implicit_limit,
+            inline_typeids,
+            inline_typenames,
+            inline_objectids,
+            modaliases,
+            session_config,
+            query_unit_group,
+        ) in entries:
+            query_req = QueryRequestInfo(
+                compiled_cache.CachedSource(cache_key),
+                protocol_version,
+                output_format=output_format,
+                input_format=input_format,
+                expect_one=expect_one,
+                implicit_limit=implicit_limit,
+                inline_typeids=inline_typeids,
+                inline_typenames=inline_typenames,
+                inline_objectids=inline_objectids,
+            )
+            key = (query_req, modaliases, session_config)
+            if key not in self._eql_to_compiled:
+                self._eql_to_compiled[key] = query_unit_group, self.dbver
+                restored += 1
+        return restored
+
     async def introspection(self):
         if self.user_schema is None:
             async with self._introspection_lock:
@@ -325,6 +585,12 @@ cdef class DatabaseConnectionView:
         self._in_tx_dbver = 0
         self._invalidate_local_cache()
 
+    cdef _reset_session_state(self):
+        self._modaliases = DEFAULT_MODALIASES
+        self._config = DEFAULT_CONFIG
+        self._globals = DEFAULT_GLOBALS
+        self._tx_error = False
+
     cdef clear_tx_error(self):
         self._tx_error = False
 
@@ -690,6 +956,10 @@ cdef class DatabaseConnectionView:
         def __get__(self):
             return self._db.reflection_cache
 
+    property last_schema_change:
+        def __get__(self):
+            return self._db.last_schema_change
+
     property dbver:
         def __get__(self):
             if self._in_tx and self._in_tx_dbver:
@@ -804,14 +1074,13 @@ cdef class DatabaseConnectionView:
         if not self._in_tx:
             if new_types:
                 self._db._update_backend_ids(new_types)
-            if query_unit.user_schema is not None:
+            if query_unit.updates_user_schema:
                 self._in_tx_dbver = next_dbver()
                 self._state_serializer = None
-                self._db._set_and_signal_new_user_schema(
-                    pickle.loads(query_unit.user_schema),
-                    pickle.loads(query_unit.cached_reflection)
-                        if query_unit.cached_reflection is not None
-                        else None
+                self._db._update_user_schema(
+                    query_unit.user_schema,
+                    query_unit.cached_reflection,
+                    query_unit.changed_schema_objects,
                 )
                 side_effects |= SideEffects.SchemaChanges
             if query_unit.system_config:
@@ -849,13 +1118,12 @@ cdef class DatabaseConnectionView:
 
             if self._in_tx_new_types:
                 self._db._update_backend_ids(self._in_tx_new_types)
-            if query_unit.user_schema is not None:
+            if query_unit.updates_user_schema:
                 self._state_serializer = None
-                self._db._set_and_signal_new_user_schema(
-                    pickle.loads(query_unit.user_schema),
-                    pickle.loads(query_unit.cached_reflection)
-                        if query_unit.cached_reflection is not None
-                        else None
+                self._db._update_user_schema(
+                    query_unit.user_schema,
+                    query_unit.cached_reflection,
+                    query_unit.changed_schema_objects,
                 )
                 side_effects |= SideEffects.SchemaChanges
             if self._in_tx_with_sysconfig:
@@ -883,7 +1151,8 @@ cdef class DatabaseConnectionView:
         return side_effects
 
     cdef commit_implicit_tx(
-        self, user_schema, global_schema, cached_reflection
+        self, user_schema, global_schema, cached_reflection,
+        changed_schema_objects,
     ):
         assert self._in_tx
         side_effects = 0
@@ -894,14 +1163,10 @@ cdef class DatabaseConnectionView:
 
         if self._in_tx_new_types:
             self._db._update_backend_ids(self._in_tx_new_types)
-        if user_schema is not None:
+        if user_schema is not None or changed_schema_objects is not None:
             self._state_serializer = None
-            self._db._set_and_signal_new_user_schema(
-                pickle.loads(user_schema),
-                pickle.loads(cached_reflection)
-                    if cached_reflection is not None
-                    else None
-            )
+            self._db._update_user_schema(
+                user_schema, cached_reflection, changed_schema_objects)
             side_effects |= SideEffects.SchemaChanges
         if self._in_tx_with_sysconfig:
             side_effects |= SideEffects.InstanceConfigChanges
@@ -957,7 +1222,8 @@ cdef class DatabaseConnectionView:
             cached = False
 
             try:
-                query_unit_group = await self._compile(query_req)
+                query_unit_group = await self._compile_single_flight(
+                    query_req)
             except (errors.EdgeQLSyntaxError, errors.InternalServerError):
                 raise
             except errors.EdgeDBError:
@@ -1008,6 +1274,59 @@ cdef class DatabaseConnectionView:
             extra_blobs=source.extra_blobs(),
         )
 
+    async def _compile_single_flight(
+        self,
+        query_req: QueryRequestInfo,
+    ) -> dbstate.QueryUnitGroup:
+        # When many clients send the same query to a cold cache, only
+        # one of them should occupy a compiler worker; everybody else
+        # waits for it and reuses the result.  Transactions are excluded,
+        # because compilation there depends on per-session compiler state.
+        if self.in_tx():
+            return await self._compile(query_req)
+
+        key = (
+            query_req,
+            self.get_modaliases(),
+            self.get_session_config(),
+            self._db.dbver,
+        )
+        inflight = self._db._inflight_compiles
+        waiter = inflight.get(key)
+        if waiter is not None:
+            query_unit_group, exc = await asyncio.shield(waiter)
+            if exc is not None:
+                metrics.edgeql_query_compilations_deduplicated.inc()
+                raise exc
+            if query_unit_group is not None:
+                metrics.edgeql_query_compilations_deduplicated.inc()
+                return query_unit_group
+            # The result is not shareable (e.g. it is not cacheable and
+            # so may depend on this very session), or the compilation
+            # was interrupted; compile it on our own.
+            return await self._compile(query_req)
+
+        waiter = asyncio.get_running_loop().create_future()
+        inflight[key] = waiter
+        try:
+            query_unit_group = await self._compile(query_req)
+        except errors.EdgeDBError as ex:
+            waiter.set_result((None, ex))
+            raise
+        except BaseException:
+            waiter.set_result((None, None))
+            raise
+        else:
+            if query_unit_group.cacheable:
+                waiter.set_result((query_unit_group, None))
+            else:
+                waiter.set_result((None, None))
+        finally:
+            if inflight.get(key) is waiter:
+                del inflight[key]
+
+        return query_unit_group
+
     async def _compile(
         self,
         query_req: QueryRequestInfo,
@@ -1154,6 +1473,9 @@ cdef class DatabaseIndex:
 
     def unregister_db(self, dbname):
         self._dbs.pop(dbname)
+        metrics.graphql_query_cache_lookups.remove_matching(dbname)
+        metrics.graphql_query_cache_evictions.remove_matching(dbname)
+        metrics.graphql_query_cache_size.remove(dbname)
 
     def iter_dbs(self):
         return iter(self._dbs.values())
@@ -1230,3 +1552,12 @@ cdef class DatabaseIndex:
     def remove_view(self, view: DatabaseConnectionView):
         db = self.get_db(view.dbname)
         return (<Database>db)._remove_view(view)
+
+    def acquire_pooled_view(self, dbname: str, *, protocol_version):
+        db = self.get_db(dbname)
+        return (<Database>db)._acquire_pooled_view(protocol_version)
+
+    def release_pooled_view(self, view: DatabaseConnectionView):
+        # The database might have been dropped or recreated since the
+        # view was acquired, so go through the view's own database.
+        return (<DatabaseConnectionView>view)._db._release_pooled_view(view)
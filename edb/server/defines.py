@@ -51,8 +51,35 @@ BACKEND_COMPILER_POOL_SIZE_MIN = 1
 # after it exits unexpectedly.
 BACKEND_COMPILER_TEMPLATE_PROC_RESTART_INTERVAL = 1
 
+# The estimated size in bytes of the database schemas a compiler worker
+# keeps; the least recently used ones are evicted beyond that.  Schemas
+# are estimated by the size of their pickle.
+BACKEND_COMPILER_WORKER_DBS_SIZE = 256 * 1024 * 1024
+
+# The number of transactions whose compiler state a compiler worker keeps
+# between their statements.
+BACKEND_COMPILER_TX_STATES = 32
+
+# The maximum number of statements whose compilation is replayed to
+# rebuild the compiler state of a transaction in another compiler worker;
+# the state is pickled back to the server more often than that.
+BACKEND_COMPILER_TX_REPLAY_MAX = 64
+
+# The time in seconds to wait before restarting a frontend process
+# after it exits unexpectedly.
+FRONTEND_PROC_RESTART_INTERVAL = 1
+
+# The time in seconds a frontend process is given to shut down
+# gracefully before it is killed.
+FRONTEND_PROC_STOP_TIMEOUT = 30
+
 _MAX_QUERIES_CACHE = 1000
 
+# The time in seconds to wait after a query is added to the compiled
+# query cache before the cache is written to the persistent store.
+# Bursts of cache misses are thus coalesced into a single write.
+COMPILED_QUERY_CACHE_FLUSH_DELAY = 10
+
 _QUERY_ROLLING_AVG_LEN = 10
 _QUERIES_ROLLING_AVG_LEN = 300
 
@@ -67,13 +94,40 @@ MAX_UNIX_SOCKET_PATH_LENGTH = 21
 # Linux is constrained to 108.
 MAX_RUNSTATE_DIR_PATH = 104 - MAX_UNIX_SOCKET_PATH_LENGTH - 1
 
-HTTP_PORT_QUERY_CACHE_SIZE = 1000
+# The number of most recently used prepared statements per database
+# that backend connections are pre-warmed with.
+BACKEND_PREWARM_STMTS = 64
+
+# The minimum time in seconds between two pre-warms of the same
+# backend connection.
+BACKEND_PREWARM_INTERVAL = 10
+
+# The maximum total size in bytes of the compiled GraphQL queries
+# cached per database.
+HTTP_PORT_QUERY_CACHE_BYTES = 8 * 1024 * 1024
 HTTP_PORT_MAX_CONCURRENCY = 250  # XXX
+# The maximum number of GraphQL persisted queries per database kept
+# in memory; the rest are loaded from the database on demand.
+HTTP_PORT_PERSISTED_QUERY_CACHE_SIZE = 1000
+# The maximum number of pipelined requests per HTTP connection that are
+# read ahead and handled before their responses are sent.
+HTTP_PORT_MAX_PIPELINE_DEPTH = 16
+# The maximum number of idle database views per database kept around
+# for reuse by the HTTP endpoints.
+HTTP_PORT_DBVIEW_POOL_SIZE = 64
+# The number of rows fetched from the backend at a time for streamed
+# HTTP responses, unless --backend-stream-row-limit says otherwise.
+HTTP_PORT_STREAM_ROW_LIMIT = 1000
 
 # The time in seconds the EdgeDB server shall wait between retries to connect
 # to the system database after the connection was broken during runtime.
 SYSTEM_DB_RECONNECT_INTERVAL = 1
 
+# The maximum number of changed schema objects listed in the notification
+# of a DDL sent to the other servers, which then only introspect those
+# objects.  Postgres limits the size of a notification to 8000 bytes.
+SYSEVENT_SCHEMA_CHANGES_MAX_OBJECTS = 150
+
 MIN_PROTOCOL = (1, 0)
 CURRENT_PROTOCOL = (1, 0)
 
@@ -0,0 +1,342 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2022-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Serving clients from several processes (--frontend-processes).
+
+The server process started by the user (the primary) bootstraps the
+instance as usual, and then starts more processes running their own
+Server.  All of them listen on the same addresses with SO_REUSEPORT, so
+that the kernel spreads the incoming connections across the processes
+and the protocol handling of the clients runs on several cores.
+
+The frontend processes share no memory.  Instead:
+
+* they all use the same compiler server (see compiler_pool/server.py),
+  started by the primary, through the "remote" compiler pool mode;
+* the backend connection budget is split evenly between them;
+* schema and config changes are signaled over the __edgedb_sysevent__
+  channel of the backend, like between separate instances sharing it.
+  Until the notification arrives, the other processes keep serving the
+  old schema and config, so a client connecting to a different process
+  right after a DDL command may not see its effects yet.
+
+Frontend processes exit once their standard input is closed, which
+happens when the primary process exits, however abruptly.
+"""
+
+from __future__ import annotations
+from typing import *
+
+import asyncio
+import logging
+import os
+import pathlib
+import pickle
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+
+from . import logsetup
+logsetup.early_setup()
+
+from edb.common import signalctl
+
+from . import defines
+
+
+logger = logging.getLogger('edb.server')
+
+
+class FrontendConfig(NamedTuple):
+
+    cluster_addr: Tuple[str, int]
+    cluster_params: Any  # pgconnparams.ConnectionParameters
+    instance_params: Any  # pgparams.BackendInstanceParams
+    # DSN of an HA backend cluster; the process watches it on its own.
+    ha_backend_dsn: Optional[str]
+
+    server_args: Dict[str, Any]
+
+    tls_cert_file: pathlib.Path
+    tls_key_file: pathlib.Path
+    jws_key_file: pathlib.Path
+    jwe_key_file: pathlib.Path
+
+    log_level: str
+    log_to: str
+    devmode: bool
+    proc_title: Optional[str]
+
+    async def serve(self) -> None:
+        await _run_frontend(self)
+
+
+class CompilerServerConfig(NamedTuple):
+
+    listen_address: str
+    listen_port: int
+    # The listening socket, bound by the primary and inherited.
+    listen_fd: int
+    pool_size: int
+    runstate_dir: str
+
+    log_level: str
+    log_to: str
+    devmode: bool
+
+    async def serve(self) -> None:
+        await _run_compiler_server(self)
+
+
+def split_backend_connections(total: int, nprocs: int) -> List[int]:
+    share, extra = divmod(total, nprocs)
+    return [share + (i < extra) for i in range(nprocs)]
+
+
+class FrontendGroup:
+    """Starts and supervises the processes serving alongside the primary."""
+
+    def __init__(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        self._frontends: List[asyncio.Task[None]] = []
+        self._compiler_server: Optional[asyncio.Task[None]] = None
+        self._compiler_server_sock: Optional[socket.socket] = None
+
+    async def start_compiler_server(
+        self,
+        *,
+        pool_size: int,
+        runstate_dir: str,
+        log_level: str,
+        log_to: str,
+        devmode: bool,
+    ) -> Tuple[str, int]:
+        # Returns the address the compiler pools of all frontend processes
+        # shall connect to.
+        if not os.environ.get("_EDGEDB_SERVER_COMPILER_POOL_SECRET"):
+            os.environ["_EDGEDB_SERVER_COMPILER_POOL_SECRET"] = (
+                secrets.token_urlsafe())
+
+        # The socket is bound and listening before the compiler server
+        # starts, so that no other process can take the port, and the
+        # connections made before it's ready wait in the backlog.  It is
+        # kept open here, for the restarted compiler servers to use too.
+        host = '127.0.0.1'
+        sock = socket.socket()
+        try:
+            sock.bind((host, 0))
+            sock.listen()
+        except BaseException:
+            sock.close()
+            raise
+        self._compiler_server_sock = sock
+        port = sock.getsockname()[1]
+
+        config = CompilerServerConfig(
+            listen_address=host,
+            listen_port=port,
+            listen_fd=sock.fileno(),
+            pool_size=pool_size,
+            runstate_dir=runstate_dir,
+            log_level=log_level,
+            log_to=log_to,
+            devmode=devmode,
+        )
+        self._compiler_server = self._loop.create_task(
+            self._supervise(
+                'compiler server', config, pass_fds=(sock.fileno(),)))
+        return host, port
+
+    def start(self, configs: Sequence[FrontendConfig]) -> None:
+        for i, config in enumerate(configs, start=1):
+            self._frontends.append(self._loop.create_task(
+                self._supervise(f'frontend {i}', config)))
+
+    async def stop(self) -> None:
+        # Stop the frontend processes, but not the compiler server, which
+        # the primary may still be using until it is stopped itself.
+        await self._stop_tasks(self._frontends)
+        self._frontends = []
+
+    async def stop_compiler_server(self) -> None:
+        if self._compiler_server is not None:
+            await self._stop_tasks([self._compiler_server])
+            self._compiler_server = None
+        if self._compiler_server_sock is not None:
+            self._compiler_server_sock.close()
+            self._compiler_server_sock = None
+
+    async def _stop_tasks(self, tasks: List[asyncio.Task[None]]) -> None:
+        self._running = False
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _supervise(
+        self,
+        name: str,
+        config: Union[FrontendConfig, CompilerServerConfig],
+        *,
+        pass_fds: Sequence[int] = (),
+    ) -> None:
+        cmdline = [sys.executable]
+        if sys.flags.isolated:  # type: ignore  # missing in the stubs
+            cmdline.append('-I')
+        cmdline.extend(['-m', __name__])
+
+        env = os.environ.copy()
+        # Inherit sys.path so that the import system can find edb
+        env['PYTHONPATH'] = ':'.join(sys.path)
+
+        while True:
+            proc = await asyncio.create_subprocess_exec(
+                *cmdline,
+                env=env,
+                stdin=subprocess.PIPE,
+                pass_fds=pass_fds,
+                # Don't share the terminal's Ctrl+C with the primary, which
+                # decides by itself when to stop the other processes.
+                start_new_session=True,
+            )
+            try:
+                assert proc.stdin is not None
+                # The pipe is kept open for as long as the process runs.
+                proc.stdin.write(pickle.dumps(config))
+                try:
+                    await proc.stdin.drain()
+                except ConnectionError:
+                    # Exited before reading its config; reported below.
+                    pass
+                returncode = await proc.wait()
+            except asyncio.CancelledError:
+                await self._terminate(proc)
+                raise
+
+            if not self._running:
+                return
+            t = defines.FRONTEND_PROC_RESTART_INTERVAL
+            logger.error(
+                f'{name} process (PID {proc.pid}) exited unexpectedly '
+                f'with exit code {returncode}; restarting in {t} '
+                f'second{"s" if t > 1 else ""}.'
+            )
+            await asyncio.sleep(t)
+
+    async def _terminate(self, proc: asyncio.subprocess.Process) -> None:
+        if proc.returncode is not None:
+            return
+        proc.terminate()
+        try:
+            await asyncio.wait_for(
+                proc.wait(), defines.FRONTEND_PROC_STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f'process {proc.pid} did not stop in time; killing it')
+            proc.kill()
+            await proc.wait()
+
+
+class _ParentWatcher(asyncio.Protocol):
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        # The primary process is gone, shut down like on SIGTERM.
+        os.kill(os.getpid(), signal.SIGTERM)
+
+
+async def _run_frontend(config: FrontendConfig) -> None:
+    from edb.server import pgcluster
+    from edb.server import server
+
+    if config.ha_backend_dsn is not None:
+        cluster = await pgcluster.get_remote_pg_cluster(
+            config.ha_backend_dsn,
+            tenant_id=config.instance_params.tenant_id,
+        )
+        cluster.overwrite_capabilities(config.instance_params.capabilities)
+    else:
+        cluster = pgcluster.RemoteCluster(
+            config.cluster_addr,
+            config.cluster_params,
+            instance_params=config.instance_params,
+        )
+    cluster.set_connection_params(config.cluster_params)
+
+    with signalctl.SignalController(signal.SIGINT, signal.SIGTERM) as sc:
+        ss = server.Server(cluster=cluster, **config.server_args)
+        await sc.wait_for(ss.init())
+        ss.init_tls(config.tls_cert_file, config.tls_key_file, False)
+        ss.init_jwcrypto(
+            config.jws_key_file, config.jwe_key_file, False, False)
+
+        try:
+            await sc.wait_for(ss.start())
+            if config.proc_title:
+                import setproctitle
+                setproctitle.setproctitle(config.proc_title)
+            try:
+                await sc.wait_for(ss.serve_forever())
+            except signalctl.SignalError as e:
+                logger.info('Received signal: %s.', e.signo)
+        finally:
+            logger.info('Shutting down.')
+            await sc.wait_for(ss.stop())
+
+
+async def _run_compiler_server(config: CompilerServerConfig) -> None:
+    from edb.server.compiler_pool import server as compiler_server
+
+    with signalctl.SignalController(signal.SIGINT, signal.SIGTERM) as sc:
+        try:
+            await sc.wait_for(compiler_server.server_main(
+                listen_addresses=(config.listen_address,),
+                listen_port=config.listen_port,
+                pool_size=config.pool_size,
+                client_schema_cache_size=100,
+                runstate_dir=config.runstate_dir,
+                sock=socket.socket(fileno=config.listen_fd),
+            ))
+        except signalctl.SignalError:
+            pass
+
+
+async def _run(config: Union[FrontendConfig, CompilerServerConfig]) -> None:
+    loop = asyncio.get_running_loop()
+    await loop.connect_read_pipe(_ParentWatcher, sys.stdin)
+    # The config classes are unpickled from edb.server.frontends, not from
+    # this module if it is __main__, so let them pick what to run.
+    await config.serve()
+
+
+def main() -> None:
+    import uvloop
+    from edb.common import devmode
+
+    config = pickle.load(sys.stdin.buffer)
+    logsetup.setup_logging(config.log_level, config.log_to)
+    if config.devmode:
+        devmode.enable_dev_mode()
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(_run(config))
+
+
+if __name__ == '__main__':
+    main()
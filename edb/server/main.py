@@ -32,6 +32,7 @@ import resource
 import signal
 import sys
 import tempfile
+import urllib.parse
 import uuid
 
 import click
@@ -50,6 +51,7 @@ from edb.common import signalctl
 from . import args as srvargs
 from . import daemon
 from . import defines
+from . import frontends
 from . import pgconnparams
 from . import pgcluster
 from . import service_manager
@@ -180,91 +182,216 @@ async def _run_server(
         else:
             os.set_inheritable(fd, False)
 
-    with signalctl.SignalController(signal.SIGINT, signal.SIGTERM) as sc:
-        ss = server.Server(
-            cluster=cluster,
+    nprocs = 1 if args.bootstrap_only else args.frontend_processes
+    if nprocs > 1 and sockets:
+        abort('--frontend-processes cannot be used with socket activation')
+    # Resolved by _get_local_pgcluster() or _get_remote_pgcluster().
+    assert args.max_backend_connections is not None
+    backend_conns = frontends.split_backend_connections(
+        args.max_backend_connections, nprocs)
+    if backend_conns[-1] < defines.BACKEND_CONNECTIONS_MIN:
+        abort(f'--frontend-processes={nprocs} needs at least '
+              f'{defines.BACKEND_CONNECTIONS_MIN * nprocs} backend '
+              f'connections, got {args.max_backend_connections}')
+
+    compiler_pool_mode = args.compiler_pool_mode
+    compiler_pool_addr = args.compiler_pool_addr
+    frontend_group = None
+    if nprocs > 1:
+        frontend_group = frontends.FrontendGroup()
+
+    try:
+        if (
+            frontend_group is not None
+            and compiler_pool_mode is not srvargs.CompilerPoolMode.Remote
+        ):
+            # All frontend processes share a compiler server instead of
+            # each running a compiler pool of their own.
+            compiler_pool_addr = await frontend_group.start_compiler_server(
+                pool_size=args.compiler_pool_size,
+                runstate_dir=internal_runstate_dir,
+                log_level=args.log_level,
+                log_to=args.log_to,
+                devmode=devmode.is_in_dev_mode(),
+            )
+            compiler_pool_mode = srvargs.CompilerPoolMode.Remote
+
+        with signalctl.SignalController(signal.SIGINT, signal.SIGTERM) as sc:
+            ss = server.Server(
+                cluster=cluster,
+                runstate_dir=runstate_dir,
+                internal_runstate_dir=internal_runstate_dir,
+                max_backend_connections=backend_conns[0],
+                backend_stream_row_limit=args.backend_stream_row_limit,
+                dump_parallelism=args.dump_parallelism,
+                compiler_pool_size=args.compiler_pool_size,
+                compiler_pool_mode=compiler_pool_mode,
+                compiler_pool_addr=compiler_pool_addr,
+                compiler_pool_shared_schemas=args.compiler_pool_shared_schemas,
+                nethosts=args.bind_addresses,
+                netport=args.port,
+                listen_sockets=tuple(s for ss in sockets.values() for s in ss),
+                reuse_port=frontend_group is not None,
+                auto_shutdown_after=args.auto_shutdown_after,
+                echo_runtime_info=args.echo_runtime_info,
+                status_sinks=args.status_sinks,
+                startup_script=args.startup_script,
+                binary_endpoint_security=args.binary_endpoint_security,
+                http_endpoint_security=args.http_endpoint_security,
+                backend_adaptive_ha=args.backend_adaptive_ha,
+                default_auth_method=args.default_auth_method,
+                testmode=args.testmode,
+                new_instance=new_instance,
+                admin_ui=args.admin_ui,
+                instance_name=args.instance_name,
+                compiled_query_cache_dir=args.compiled_query_cache_dir,
+            )
+            await sc.wait_for(ss.init())
+
+            tls_cert_newly_generated = False
+            if args.tls_cert_mode is srvargs.ServerTlsCertMode.SelfSigned:
+                assert args.tls_cert_file is not None
+                if not args.tls_cert_file.exists():
+                    assert args.tls_key_file is not None
+                    generate_tls_cert(
+                        args.tls_cert_file,
+                        args.tls_key_file,
+                        ss.get_listen_hosts(),
+                    )
+                    tls_cert_newly_generated = True
+
+            jws_keys_newly_generated = False
+            jwe_keys_newly_generated = False
+            if args.jose_key_mode is srvargs.JOSEKeyMode.Generate:
+                assert args.jws_key_file is not None
+                assert args.jwe_key_file is not None
+                if not args.jws_key_file.exists():
+                    generate_jwk(args.jws_key_file)
+                    jws_keys_newly_generated = True
+                if not args.jwe_key_file.exists():
+                    generate_jwk(args.jwe_key_file)
+                    jwe_keys_newly_generated = True
+
+            if args.bootstrap_only:
+                if args.startup_script and new_instance:
+                    await sc.wait_for(ss.run_startup_script_and_exit())
+                return
+
+            ss.init_tls(
+                args.tls_cert_file,
+                args.tls_key_file,
+                tls_cert_newly_generated,
+            )
+
+            ss.init_jwcrypto(
+                args.jws_key_file,
+                args.jwe_key_file,
+                jws_keys_newly_generated,
+                jwe_keys_newly_generated,
+            )
+
+            try:
+                await sc.wait_for(ss.start())
+
+                if frontend_group is not None:
+                    frontend_group.start(_get_frontend_configs(
+                        cluster,
+                        args,
+                        ss,
+                        runstate_dir,
+                        internal_runstate_dir,
+                        backend_conns[1:],
+                        compiler_pool_addr,
+                        do_setproctitle=do_setproctitle,
+                    ))
+
+                if do_setproctitle:
+                    setproctitle.setproctitle(
+                        f"edgedb-server-{ss.get_listen_port()}"
+                    )
+
+                # Notify systemd that we've started up.
+                service_manager.sd_notify('READY=1')
+
+                try:
+                    await sc.wait_for(ss.serve_forever())
+                except signalctl.SignalError as e:
+                    logger.info('Received signal: %s.', e.signo)
+            finally:
+                service_manager.sd_notify('STOPPING=1')
+                logger.info('Shutting down.')
+                if frontend_group is not None:
+                    await sc.wait_for(frontend_group.stop())
+                await sc.wait_for(ss.stop())
+    finally:
+        if frontend_group is not None:
+            await frontend_group.stop_compiler_server()
+
+
+def _get_frontend_configs(
+    cluster,
+    args: srvargs.ServerConfig,
+    ss,
+    runstate_dir,
+    internal_runstate_dir,
+    backend_conns: List[int],
+    compiler_pool_addr,
+    *,
+    do_setproctitle: bool,
+) -> List[frontends.FrontendConfig]:
+    ha_backend_dsn = None
+    if (
+        args.backend_dsn
+        and urllib.parse.urlparse(args.backend_dsn).scheme
+        not in {'postgresql', 'postgres'}
+    ):
+        ha_backend_dsn = args.backend_dsn
+
+    configs = []
+    for i, max_backend_connections in enumerate(backend_conns, start=1):
+        server_args = dict(
             runstate_dir=runstate_dir,
             internal_runstate_dir=internal_runstate_dir,
-            max_backend_connections=args.max_backend_connections,
+            max_backend_connections=max_backend_connections,
+            backend_stream_row_limit=args.backend_stream_row_limit,
+            dump_parallelism=args.dump_parallelism,
             compiler_pool_size=args.compiler_pool_size,
-            compiler_pool_mode=args.compiler_pool_mode,
-            compiler_pool_addr=args.compiler_pool_addr,
-            nethosts=args.bind_addresses,
-            netport=args.port,
-            listen_sockets=tuple(s for ss in sockets.values() for s in ss),
-            auto_shutdown_after=args.auto_shutdown_after,
-            echo_runtime_info=args.echo_runtime_info,
-            status_sinks=args.status_sinks,
-            startup_script=args.startup_script,
+            compiler_pool_mode=srvargs.CompilerPoolMode.Remote,
+            compiler_pool_addr=compiler_pool_addr,
+            # Bind exactly what the primary process ended up listening on.
+            nethosts=tuple(addr[0] for addr in ss.get_listen_hosts()),
+            netport=ss.get_listen_port(),
+            reuse_port=True,
+            admin_socket=False,
             binary_endpoint_security=args.binary_endpoint_security,
             http_endpoint_security=args.http_endpoint_security,
             backend_adaptive_ha=args.backend_adaptive_ha,
             default_auth_method=args.default_auth_method,
             testmode=args.testmode,
-            new_instance=new_instance,
+            new_instance=False,
             admin_ui=args.admin_ui,
             instance_name=args.instance_name,
+            compiled_query_cache_dir=args.compiled_query_cache_dir,
         )
-        await sc.wait_for(ss.init())
-
-        tls_cert_newly_generated = False
-        if args.tls_cert_mode is srvargs.ServerTlsCertMode.SelfSigned:
-            assert args.tls_cert_file is not None
-            if not args.tls_cert_file.exists():
-                assert args.tls_key_file is not None
-                generate_tls_cert(
-                    args.tls_cert_file,
-                    args.tls_key_file,
-                    ss.get_listen_hosts(),
-                )
-                tls_cert_newly_generated = True
-
-        jws_keys_newly_generated = False
-        jwe_keys_newly_generated = False
-        if args.jose_key_mode is srvargs.JOSEKeyMode.Generate:
-            assert args.jws_key_file is not None
-            assert args.jwe_key_file is not None
-            if not args.jws_key_file.exists():
-                generate_jwk(args.jws_key_file)
-                jws_keys_newly_generated = True
-            if not args.jwe_key_file.exists():
-                generate_jwk(args.jwe_key_file)
-                jwe_keys_newly_generated = True
-
-        if args.bootstrap_only:
-            if args.startup_script and new_instance:
-                await sc.wait_for(ss.run_startup_script_and_exit())
-            return
-
-        ss.init_tls(
-            args.tls_cert_file, args.tls_key_file, tls_cert_newly_generated)
-
-        ss.init_jwcrypto(
-            args.jws_key_file,
-            args.jwe_key_file,
-            jws_keys_newly_generated,
-            jwe_keys_newly_generated,
-        )
-
-        try:
-            await sc.wait_for(ss.start())
-
-            if do_setproctitle:
-                setproctitle.setproctitle(
-                    f"edgedb-server-{ss.get_listen_port()}"
-                )
-
-            # Notify systemd that we've started up.
-            service_manager.sd_notify('READY=1')
-
-            try:
-                await sc.wait_for(ss.serve_forever())
-            except signalctl.SignalError as e:
-                logger.info('Received signal: %s.', e.signo)
-        finally:
-            service_manager.sd_notify('STOPPING=1')
-            logger.info('Shutting down.')
-            await sc.wait_for(ss.stop())
+        configs.append(frontends.FrontendConfig(
+            cluster_addr=cluster.get_connection_addr(),
+            cluster_params=cluster.get_connection_params(),
+            instance_params=cluster.get_runtime_params().instance_params,
+            ha_backend_dsn=ha_backend_dsn,
+            server_args=server_args,
+            tls_cert_file=args.tls_cert_file,
+            tls_key_file=args.tls_key_file,
+            jws_key_file=args.jws_key_file,
+            jwe_key_file=args.jwe_key_file,
+            log_level=args.log_level,
+            log_to=args.log_to,
+            devmode=devmode.is_in_dev_mode(),
+            proc_title=(
+                f'edgedb-server-{ss.get_listen_port()}-frontend-{i}'
+                if do_setproctitle else None
+            ),
+        ))
+    return configs
 
 
 def generate_tls_cert(
@@ -32,6 +32,25 @@ current_compiler_processes = registry.new_gauge(
     'Current number of active compiler processes.'
 )
 
+compiler_pool_queue_depth = registry.new_labeled_gauge(
+    'compiler_pool_queue_depth',
+    'Number of requests waiting for a compiler process.',
+    labels=('lane',),
+)
+
+compiler_pool_queue_wait_duration = registry.new_labeled_histogram(
+    'compiler_pool_queue_wait_duration',
+    'Time a request waits for a compiler process.',
+    unit=prom.Unit.SECONDS,
+    labels=('lane',),
+)
+
+compiler_process_database_states_size = registry.new_labeled_gauge(
+    'compiler_process_database_states_size_bytes',
+    'Estimated size of the database states held by a compiler process.',
+    labels=('pid',),
+)
+
 total_backend_connections = registry.new_counter(
     'backend_connections_total',
     'Total number of backend connections established.'
@@ -65,6 +84,23 @@ backend_query_duration = registry.new_histogram(
     unit=prom.Unit.SECONDS,
 )
 
+backend_prepared_statements = registry.new_labeled_counter(
+    'backend_prepared_statements_total',
+    'Number of named prepared statement lookups on backend connections.',
+    labels=('result',)
+)
+
+backend_prepared_statements_prewarmed = registry.new_counter(
+    'backend_prepared_statements_prewarmed_total',
+    'Number of statements prepared ahead of time on backend connections.'
+)
+
+backend_state_restores = registry.new_labeled_counter(
+    'backend_state_restores_total',
+    'Number of session state restores on backend connections.',
+    labels=('result',)
+)
+
 total_client_connections = registry.new_counter(
     'client_connections_total',
     'Total number of clients.'
@@ -86,12 +122,48 @@ edgeql_query_compilations = registry.new_labeled_counter(
     labels=('path',)
 )
 
+edgeql_query_compilations_deduplicated = registry.new_counter(
+    'edgeql_query_compilations_deduplicated_total',
+    'Number of query compilations saved by sharing the result of '
+    'a concurrent compilation of the same query.'
+)
+
 edgeql_query_compilation_duration = registry.new_histogram(
     'edgeql_query_compilation_duration',
     'Time it takes to compile an EdgeQL query or script.',
     unit=prom.Unit.SECONDS,
 )
 
+graphql_query_cache_lookups = registry.new_labeled_counter(
+    'graphql_query_cache_lookups_total',
+    'Number of GraphQL query cache lookups.',
+    labels=('database', 'result'),
+)
+
+graphql_query_cache_evictions = registry.new_labeled_counter(
+    'graphql_query_cache_evictions_total',
+    'Number of compiled GraphQL queries evicted from the cache.',
+    labels=('database', 'reason'),
+)
+
+graphql_query_cache_size = registry.new_labeled_gauge(
+    'graphql_query_cache_size_bytes',
+    'Estimated size of the compiled GraphQL queries in the cache.',
+    labels=('database',),
+)
+
+http_edgeql_query_duration = registry.new_histogram(
+    'http_edgeql_query_duration',
+    'Time it takes to run an EdgeQL query over HTTP.',
+    unit=prom.Unit.SECONDS,
+)
+
+schema_introspections = registry.new_labeled_counter(
+    'schema_introspections_total',
+    'Number of database schema introspections.',
+    labels=('mode',)
+)
+
 background_errors = registry.new_labeled_counter(
     'background_errors_total',
     'Number of unhandled errors in background server routines.',
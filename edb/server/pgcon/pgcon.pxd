@@ -102,9 +102,14 @@ cdef class PGConnection:
 
         public object pinned_by
 
-        object last_state
+        readonly object last_state
+
+        stmt_cache.HotStatements hot_stmts
+        uint64_t prewarm_generation
+        double last_prewarm
 
     cdef before_command(self)
+    cdef bint has_state(self, bytes state)
 
     cdef write(self, buf)
 
@@ -116,8 +121,9 @@ cdef class PGConnection:
     cdef fallthrough(self)
     cdef fallthrough_idle(self)
 
-    cdef before_prepare(self, stmt_name, dbver, WriteBuffer outbuf)
+    cdef before_prepare(self, stmt_name, sql, dbver, WriteBuffer outbuf)
     cdef write_sync(self, WriteBuffer outbuf)
+    cdef make_execute_message(self, int32_t row_limit)
 
     cdef make_clean_stmt_message(self, bytes stmt_name)
     cdef make_auth_password_md5_message(self, bytes salt)
@@ -95,6 +95,7 @@ DEF COPY_SIGNATURE = b"PGCOPY\n\377\r\n\0"
 
 
 cdef object CARD_NO_RESULT = compiler.Cardinality.NO_RESULT
+cdef object CARD_MANY = compiler.Cardinality.MANY
 cdef object FMT_NONE = compiler.OutputFormat.NONE
 cdef dict POSTGRES_SHUTDOWN_ERR_CODES = {
     '57P01': 'admin_shutdown',
@@ -440,6 +441,9 @@ cdef class PGConnection:
 
         self.pgaddr = addr
         self.server = None
+        self.hot_stmts = None
+        self.prewarm_generation = 0
+        self.last_prewarm = 0
         self.is_system_db = False
         self.close_requested = False
 
@@ -521,6 +525,9 @@ cdef class PGConnection:
     def set_server(self, server):
         self.server = server
 
+    def set_hot_stmts(self, stmt_cache.HotStatements hot_stmts):
+        self.hot_stmts = hot_stmts
+
     def mark_as_system_db(self):
         if self.server.get_backend_runtime_params().has_create_database:
             assert defines.EDGEDB_SYSTEM_DB in self.dbname
@@ -605,7 +612,7 @@ cdef class PGConnection:
                 # serialization conflicts.
                 raise error
 
-    cdef before_prepare(self, stmt_name, dbver, WriteBuffer outbuf):
+    cdef before_prepare(self, stmt_name, sql, dbver, WriteBuffer outbuf):
         parse = 1
 
         while self.prep_stmts.needs_cleanup():
@@ -624,16 +631,41 @@ cdef class PGConnection:
         else:
             store_stmt = 1
 
+        if parse:
+            metrics.backend_prepared_statements.inc(1.0, 'miss')
+        else:
+            metrics.backend_prepared_statements.inc(1.0, 'hit')
+        if self.hot_stmts is not None:
+            self.hot_stmts.touch(stmt_name, sql, dbver)
+
         return parse, store_stmt
 
     cdef write_sync(self, WriteBuffer outbuf):
         outbuf.write_bytes(_SYNC_MESSAGE)
         self.waiting_for_sync += 1
 
+    cdef make_execute_message(self, int32_t row_limit):
+        cdef WriteBuffer buf
+
+        buf = WriteBuffer.new_message(b'E')
+        buf.write_bytestring(b'')  # portal name
+        buf.write_int32(row_limit)  # limit: 0 - return all rows
+        return buf.end_message()
+
+    cdef bint has_state(self, bytes state):
+        # Whether the session state is applied on the connection already,
+        # in which case restoring it can be skipped.
+        if state is not None and self.last_state == state:
+            metrics.backend_state_restores.inc(1.0, 'avoided')
+            return True
+        return False
+
     def _build_apply_state_req(self, bytes serstate, WriteBuffer out):
         cdef:
             WriteBuffer buf
 
+        metrics.backend_state_restores.inc(1.0, 'performed')
+
         buf = WriteBuffer.new_message(b'B')
         buf.write_bytestring(b'')  # portal name
         buf.write_bytestring(b'_clear_state')  # statement name
@@ -864,6 +896,7 @@ cdef class PGConnection:
         bint use_prep_stmt,
         bytes state,
         int dbver,
+        int32_t row_limit,
     ):
         cdef:
             WriteBuffer out
@@ -880,6 +913,17 @@ cdef class PGConnection:
             bint discard_result = (
                 fe_conn is not None and query.output_format == FMT_NONE)
 
+            # In the streaming mode, the result is fetched from the portal
+            # in batches of at most `row_limit` rows, and the next batch is
+            # only requested once the client has taken the previous one.
+            bint stream = (
+                row_limit > 0
+                and fe_conn is not None
+                and not discard_result
+                and query.cardinality is CARD_MANY
+            )
+            bint suspended = 0
+
             uint64_t msgs_num = <uint64_t>(len(query.sql))
             uint64_t msgs_executed = 0
             uint64_t i
@@ -899,7 +943,7 @@ cdef class PGConnection:
         if use_prep_stmt:
             stmt_name = query.sql_hash
             parse, store_stmt = self.before_prepare(
-                stmt_name, dbver, out)
+                stmt_name, query.sql[0], dbver, out)
         else:
             stmt_name = b''
 
@@ -946,6 +990,7 @@ cdef class PGConnection:
                 buf.write_bytestring(b'')  # portal name
                 buf.write_int32(0)  # limit: 0 - return all rows
                 out.write_buffer(buf.end_message())
+            stream = 0
         else:
             buf = WriteBuffer.new_message(b'B')
             buf.write_bytestring(b'')  # portal name
@@ -953,12 +998,17 @@ cdef class PGConnection:
             buf.write_buffer(bind_data)
             out.write_buffer(buf.end_message())
 
-            buf = WriteBuffer.new_message(b'E')
-            buf.write_bytestring(b'')  # portal name
-            buf.write_int32(0)  # limit: 0 - return all rows
-            out.write_buffer(buf.end_message())
+            if stream:
+                out.write_buffer(self.make_execute_message(row_limit))
+            else:
+                out.write_buffer(self.make_execute_message(0))
 
-        self.write_sync(out)
+        if stream:
+            # Sync would close the portal at the end of the implicit
+            # transaction, so only flush until the result is consumed.
+            out.write_bytes(FLUSH_MESSAGE)
+        else:
+            self.write_sync(out)
         self.write(out)
 
         result = None
@@ -1035,7 +1085,9 @@ cdef class PGConnection:
                     elif mtype == b's':  ## result
                         # PortalSuspended
                         self.buffer.discard_message()
-                        break
+                        if not stream:
+                            break
+                        suspended = 1
 
                     elif mtype == b'2':
                         # BindComplete
@@ -1055,7 +1107,27 @@ cdef class PGConnection:
 
                 finally:
                     self.buffer.finish_message()
+
+                if suspended:
+                    suspended = 0
+                    if buf is not None:
+                        fe_conn.write(buf)
+                        buf = None
+                    fe_conn.flush()
+                    # Don't fetch more rows while the client transport
+                    # is paused; Postgres holds them in the meantime.
+                    waiter = fe_conn.get_write_waiter()
+                    if waiter is not None:
+                        await waiter
+                    out = WriteBuffer.new()
+                    out.write_buffer(self.make_execute_message(row_limit))
+                    out.write_bytes(FLUSH_MESSAGE)
+                    self.write(out)
         finally:
+            if stream:
+                out = WriteBuffer.new()
+                self.write_sync(out)
+                self.write(out)
             await self.wait_for_sync()
 
         return result
@@ -1069,6 +1141,7 @@ cdef class PGConnection:
         bint use_prep_stmt = False,
         bytes state = None,
         int dbver = 0,
+        int32_t row_limit = 0,
     ):
         self.before_command()
         started_at = time.monotonic()
@@ -1080,11 +1153,338 @@ cdef class PGConnection:
                 use_prep_stmt,
                 state,
                 dbver,
+                row_limit,
+            )
+        finally:
+            metrics.backend_query_duration.observe(time.monotonic() - started_at)
+            await self.after_command()
+
+    async def _parse_execute_pipeline(
+        self,
+        list queries,
+        frontend.FrontendConnection fe_conn,
+        object on_complete,
+        bytes state,
+        int dbver,
+        bint atomic,
+    ):
+        cdef:
+            WriteBuffer out
+            WriteBuffer buf
+            WriteBuffer bind_data
+            bytes stmt_name
+            set parsed = set()
+            list stored = []
+            list results = []
+            ssize_t i
+            ssize_t nqueries = len(queries)
+            bint parse
+            bint store_stmt
+
+        out = WriteBuffer.new()
+
+        if state is not None:
+            # Every query runs in its own implicit transaction, so the
+            # state must be restored in a separate one: it would be
+            # rolled back together with the first query otherwise.
+            self._build_apply_state_req(state, out)
+            self.write_sync(out)
+
+        if len(self.last_parse_prep_stmts):
+            for stmt_name_to_clean in self.last_parse_prep_stmts:
+                out.write_buffer(
+                    self.make_clean_stmt_message(stmt_name_to_clean))
+            self.last_parse_prep_stmts.clear()
+
+        for query, bind_data in queries:
+            store_stmt = 0
+            if query.sql_hash:
+                stmt_name = query.sql_hash
+                if stmt_name in parsed:
+                    parse = 0
+                else:
+                    parse, store_stmt = self.before_prepare(
+                        stmt_name, query.sql[0], dbver, out)
+                    parsed.add(stmt_name)
+            else:
+                stmt_name = b''
+                parse = 1
+            stored.append(stmt_name if store_stmt else None)
+
+            if parse:
+                buf = WriteBuffer.new_message(b'P')
+                buf.write_bytestring(stmt_name)
+                buf.write_bytestring(query.sql[0])
+                buf.write_int16(0)
+                out.write_buffer(buf.end_message())
+
+            buf = WriteBuffer.new_message(b'B')
+            buf.write_bytestring(b'')  # portal name
+            buf.write_bytestring(stmt_name)  # statement name
+            buf.write_buffer(bind_data)
+            out.write_buffer(buf.end_message())
+
+            out.write_buffer(self.make_execute_message(0))
+            if not atomic:
+                self.write_sync(out)
+
+        if atomic:
+            # A single Sync makes all the queries one implicit
+            # transaction: Postgres skips everything after a failed
+            # query and rolls the whole batch back.
+            self.write_sync(out)
+
+        self.write(out)
+
+        try:
+            if state is not None:
+                await self.wait_for_state_resp(state, 1)
+                self.last_state = state
+
+            for i in range(nqueries):
+                error = None
+                data = None
+                try:
+                    data = await self._wait_for_pipelined_result(
+                        queries[i][0], fe_conn, stored[i], dbver)
+                except pgerror.BackendError as ex:
+                    error = ex
+                finally:
+                    if not atomic or error is not None or i == nqueries - 1:
+                        try:
+                            await self.wait_for_sync()
+                        except pgerror.BackendError as ex:
+                            if error is None:
+                                error = ex
+
+                if atomic:
+                    if error is not None:
+                        raise error
+                else:
+                    if on_complete is not None:
+                        on_complete(i, error)
+                results.append(data)
+
+            if atomic and on_complete is not None:
+                # Only report the queries as done once they are
+                # committed together.
+                for i in range(nqueries):
+                    on_complete(i, None)
+
+            return results
+        finally:
+            # Don't leave the replies to the rest of the pipeline
+            # in the socket if we bailed out early.
+            while self.waiting_for_sync:
+                await self.wait_for_sync()
+
+    async def _wait_for_pipelined_result(
+        self,
+        query,
+        frontend.FrontendConnection fe_conn,
+        bytes stmt_name,
+        int dbver,
+    ):
+        cdef:
+            WriteBuffer buf = None
+            bint discard_result = query.output_format == FMT_NONE
+            list result = None
+
+        while True:
+            if not self.buffer.take_message():
+                await self.wait_for_message()
+            mtype = self.buffer.get_message_type()
+
+            try:
+                if mtype == b'D':
+                    # DataRow
+                    if discard_result:
+                        self.buffer.discard_message()
+                        continue
+                    if fe_conn is None:
+                        ncol = self.buffer.read_int16()
+                        row = []
+                        for i in range(ncol):
+                            dat_len = self.buffer.read_int32()
+                            if dat_len == -1:
+                                row.append(None)
+                            else:
+                                row.append(self.buffer.read_bytes(dat_len))
+                        if result is None:
+                            result = []
+                        result.append(row)
+                        continue
+                    if buf is None:
+                        buf = WriteBuffer.new()
+                    self.buffer.redirect_messages(buf, b'D', 0)
+                    if buf.len() >= DATA_BUFFER_SIZE:
+                        fe_conn.write(buf)
+                        buf = None
+
+                elif mtype == b'C':
+                    # CommandComplete
+                    self.buffer.discard_message()
+                    if buf is not None:
+                        fe_conn.write(buf)
+                    return result
+
+                elif mtype == b'1':
+                    # ParseComplete
+                    self.buffer.discard_message()
+                    if stmt_name is not None:
+                        self.prep_stmts[stmt_name] = dbver
+
+                elif mtype == b'E':
+                    # ErrorResponse
+                    er_cls, er_fields = self.parse_error_message()
+                    raise er_cls(fields=er_fields)
+
+                elif mtype == b'I':
+                    # EmptyQueryResponse
+                    self.buffer.discard_message()
+                    return result
+
+                elif (
+                    mtype == b'2'  # BindComplete
+                    or mtype == b'3'  # CloseComplete
+                    or mtype == b'n'  # NoData
+                ):
+                    self.buffer.discard_message()
+
+                else:
+                    self.fallthrough()
+
+            finally:
+                self.buffer.finish_message()
+
+    async def parse_execute_pipeline(
+        self,
+        *,
+        list queries,
+        frontend.FrontendConnection fe_conn,
+        object on_complete,
+        bytes state = None,
+        int dbver = 0,
+        bint atomic = False,
+    ):
+        """Execute a batch of independent queries in a single round-trip.
+
+        *queries* is a list of ``(query_unit, bind_data)`` pairs.  Each
+        query runs in its own implicit transaction, so that a failure
+        of one of them does not affect the rest.  The results are
+        redirected to *fe_conn*, and *on_complete* is called after
+        each query with its index and the error it failed with, if any.
+
+        If *atomic* is true, all queries run in one transaction instead,
+        and the first error is raised after the batch is rolled back.
+
+        Returns a list with the rows of each query if *fe_conn* is None.
+        """
+        self.before_command()
+        started_at = time.monotonic()
+        try:
+            return await self._parse_execute_pipeline(
+                queries,
+                fe_conn,
+                on_complete,
+                state,
+                dbver,
+                atomic,
             )
         finally:
             metrics.backend_query_duration.observe(time.monotonic() - started_at)
             await self.after_command()
 
+    def get_prewarm_stmts(self, int dbver):
+        """Return the hot statements not yet prepared on this connection.
+
+        Returns None if the connection is up to date or has been
+        pre-warmed recently.
+        """
+        if (
+            self.hot_stmts is None
+            or self.hot_stmts.generation == self.prewarm_generation
+        ):
+            return None
+
+        now = time.monotonic()
+        if now - self.last_prewarm < defines.BACKEND_PREWARM_INTERVAL:
+            return None
+
+        self.prewarm_generation = self.hot_stmts.generation
+        stmts = [
+            (stmt_name, sql)
+            for stmt_name, sql in self.hot_stmts.get_statements(dbver)
+            if self.prep_stmts.get(stmt_name, None) != dbver
+        ]
+        if stmts:
+            self.last_prewarm = now
+        return stmts
+
+    async def prewarm(self, list stmts, int dbver):
+        """Prepare the given (name, sql) statements in a single round-trip."""
+        cdef:
+            WriteBuffer out
+            WriteBuffer buf
+            list parsed = []
+            ssize_t done = 0
+
+        self.before_command()
+        try:
+            out = WriteBuffer.new()
+            for stmt_name, sql in stmts:
+                if stmt_name in self.prep_stmts:
+                    if self.prep_stmts[stmt_name] == dbver:
+                        continue
+                    out.write_buffer(self.make_clean_stmt_message(stmt_name))
+                    del self.prep_stmts[stmt_name]
+
+                buf = WriteBuffer.new_message(b'P')
+                buf.write_bytestring(stmt_name)
+                buf.write_bytestring(sql)
+                buf.write_int16(0)
+                out.write_buffer(buf.end_message())
+                parsed.append(stmt_name)
+
+            if not parsed:
+                return
+
+            self.write_sync(out)
+            self.write(out)
+
+            try:
+                while done < len(parsed):
+                    if not self.buffer.take_message():
+                        await self.wait_for_message()
+                    mtype = self.buffer.get_message_type()
+
+                    try:
+                        if mtype == b'1':
+                            # ParseComplete
+                            self.buffer.discard_message()
+                            self.prep_stmts[parsed[done]] = dbver
+                            done += 1
+
+                        elif mtype == b'3':
+                            # CloseComplete
+                            self.buffer.discard_message()
+
+                        elif mtype == b'E':
+                            # ErrorResponse
+                            er_cls, er_fields = self.parse_error_message()
+                            raise er_cls(fields=er_fields)
+
+                        else:
+                            self.fallthrough()
+
+                    finally:
+                        self.buffer.finish_message()
+            finally:
+                metrics.backend_prepared_statements_prewarmed.inc(done)
+                await self.wait_for_sync()
+        finally:
+            await self.after_command()
+
     async def sql_fetch(
         self,
         sql: bytes | tuple[bytes, ...],
@@ -1945,7 +2345,12 @@ cdef class PGConnection:
                 event_payload = event_data.get('args')
                 if event == 'schema-changes':
                     dbname = event_payload['dbname']
-                    self.server._on_remote_ddl(dbname)
+                    self.server._on_remote_ddl(
+                        dbname,
+                        base_version=event_payload.get('base_version'),
+                        version=event_payload.get('version'),
+                        object_ids=event_payload.get('object_ids'),
+                    )
                 elif event == 'database-config-changes':
                     dbname = event_payload['dbname']
                     self.server._on_remote_database_config_change(dbname)
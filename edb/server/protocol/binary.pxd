@@ -113,12 +113,20 @@ cdef class EdgeConnection(frontend.FrontendConnection):
     cdef interpret_backend_error(self, exc)
 
     cdef dbview.QueryRequestInfo parse_execute_request(self)
+    cdef lookup_pipelined_query(
+        self,
+        dbview.QueryRequestInfo query_req,
+        bytes in_tid,
+        bytes out_tid,
+    )
+    cdef WriteBuffer make_pipelined_complete_msg(self, compiled)
     cdef parse_output_format(self, bytes mode)
     cdef parse_cardinality(self, bytes card)
     cdef char render_cardinality(self, query_unit) except -1
 
     cdef write(self, WriteBuffer buf)
     cdef flush(self)
+    cdef get_write_waiter(self)
 
     cdef abort_pinned_pgcon(self)
 
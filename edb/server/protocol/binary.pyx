@@ -68,6 +68,7 @@ from edb.server.compiler import errormech
 from edb.server.compiler import enums
 from edb.server.compiler import sertypes
 from edb.server.protocol import execute
+from edb.server.protocol cimport args_ser
 from edb.server.protocol cimport frontend
 from edb.server.pgcon cimport pgcon
 from edb.server.pgcon import errors as pgerror
@@ -89,6 +90,7 @@ include "./consts.pxi"
 
 
 DEF FLUSH_BUFFER_AFTER = 100_000
+DEF MAX_PIPELINE_DEPTH = 64
 cdef bytes EMPTY_TUPLE_UUID = s_obj.get_known_type_id('empty-tuple').bytes
 
 cdef object CARD_NO_RESULT = compiler.Cardinality.NO_RESULT
@@ -249,7 +251,8 @@ cdef class EdgeConnection(frontend.FrontendConnection):
                 return self._pinned_pgcon
             if self._pinned_pgcon is not None:
                 raise RuntimeError('there is already a pinned pgcon')
-            conn = await self.server.acquire_pgcon(self.dbname)
+            conn = await self.server.acquire_pgcon(
+                self.dbname, state=_dbview.serialize_state())
             self._pinned_pgcon = conn
             conn.pinned_by = self
             return conn
@@ -1196,6 +1199,23 @@ cdef class EdgeConnection(frontend.FrontendConnection):
 
         self.buffer.finish_message()
 
+        compiled = self.lookup_pipelined_query(query_req, in_tid, out_tid)
+        if compiled is not None and self.buffer.take_message_type(b'S'):
+            # The client didn't wait for the result before sending its
+            # Sync, so there might be more queries queued behind it.
+            try:
+                bind_data = args_ser.recode_bind_args(
+                    self.get_dbview(), compiled, args)
+            except Exception:
+                self.buffer.put_message()
+                raise
+            if self.debug:
+                self.debug_print('EXECUTE /PIPELINED', query_req.source.text())
+            request = await self._execute_pipeline(compiled, bind_data)
+            if request is None:
+                return
+            query_req, in_tid, out_tid, args = request
+
         _dbview = self.get_dbview()
 
         if (
@@ -1280,6 +1300,181 @@ cdef class EdgeConnection(frontend.FrontendConnection):
         )
         self.flush()
 
+    cdef lookup_pipelined_query(
+        self,
+        dbview.QueryRequestInfo query_req,
+        bytes in_tid,
+        bytes out_tid,
+    ):
+        cdef:
+            dbview.DatabaseConnectionView _dbview = self.get_dbview()
+
+        # Only cached read-only queries outside of a transaction can be
+        # pipelined: they don't change the session, so each of them can
+        # run in its own implicit transaction, and the result of one
+        # cannot affect the others.
+        if _dbview.in_tx() or _dbview.in_tx_error():
+            return None
+
+        query_unit_group = _dbview.lookup_compiled_query(query_req)
+        if (
+            query_unit_group is None
+            or len(query_unit_group) != 1
+            or query_unit_group.capabilities != 0
+            or query_unit_group.in_type_id != in_tid
+            or query_unit_group.out_type_id != out_tid
+            or len(query_unit_group[0].sql) != 1
+        ):
+            return None
+
+        return dbview.CompiledQuery(
+            query_unit_group=query_unit_group,
+            first_extra=query_req.source.first_extra(),
+            extra_counts=query_req.source.extra_counts(),
+            extra_blobs=query_req.source.extra_blobs(),
+        )
+
+    cdef WriteBuffer make_pipelined_complete_msg(self, compiled):
+        cdef:
+            WriteBuffer buf = WriteBuffer.new()
+
+        # Pipelined queries don't change the state, so the completion
+        # can be rendered before the query is executed (and before the
+        # state of the next request is decoded).
+        if self.get_dbview().is_state_desc_changed():
+            buf.write_buffer(self.make_state_data_description_msg())
+        buf.write_buffer(
+            self.make_command_complete_msg(
+                compiled.query_unit_group.capabilities,
+                compiled.query_unit_group[-1].status,
+            )
+        )
+        return buf
+
+    async def _execute_pipeline(self, compiled, WriteBuffer bind_data):
+        """Execute the current query together with the ones queued behind it.
+
+        Called when the Sync following the current Execute is already
+        in the read buffer.  Picks up the Execute/Sync pairs after it
+        for as long as they can be pipelined and runs all of them in a
+        single round-trip to the backend.  Returns the request that
+        stopped the pipeline (already read off the buffer), if any.
+        """
+        cdef:
+            dbview.DatabaseConnectionView _dbview = self.get_dbview()
+            dbview.QueryRequestInfo query_req
+            bytes in_tid
+            bytes out_tid
+            bytes args
+            bytes state = _dbview.serialize_state()
+            list pipeline = []
+            list completions = []
+            bint synced = True
+
+        self._last_anon_compiled = None
+        request = None
+
+        try:
+            while True:
+                metrics.edgeql_query_compilations.inc(1.0, 'cache')
+
+                pipeline.append((compiled, bind_data))
+                completions.append(self.make_pipelined_complete_msg(compiled))
+
+                if not self.buffer.take_message_type(b'S'):
+                    synced = False
+                    break
+                self.buffer.consume_message()
+
+                if (
+                    len(pipeline) >= MAX_PIPELINE_DEPTH
+                    or not self.buffer.take_message_type(b'O')
+                ):
+                    break
+
+                self.ignore_headers()
+                query_req = self.parse_execute_request()
+                in_tid = self.buffer.read_bytes(16)
+                out_tid = self.buffer.read_bytes(16)
+                args = self.buffer.read_len_prefixed_bytes()
+                self.buffer.finish_message()
+
+                compiled = self.lookup_pipelined_query(
+                    query_req, in_tid, out_tid)
+                if compiled is None or _dbview.serialize_state() != state:
+                    request = (query_req, in_tid, out_tid, args)
+                    break
+                bind_data = args_ser.recode_bind_args(_dbview, compiled, args)
+                if self.debug:
+                    self.debug_print(
+                        'EXECUTE /PIPELINED', query_req.source.text())
+        except Exception:
+            # The broken request is reported after the results of the
+            # queries preceding it.
+            await self._run_pipeline(pipeline, completions, state, True)
+            raise
+
+        await self._run_pipeline(pipeline, completions, state, synced)
+
+        if self._cancelled:
+            raise ConnectionAbortedError
+
+        return request
+
+    async def _run_pipeline(
+        self,
+        list pipeline,
+        list completions,
+        bytes state,
+        bint synced,
+    ):
+        cdef:
+            pgcon.PGConnection conn
+
+        done = 0
+        last_error = None
+
+        def on_complete(i, error):
+            nonlocal done, last_error
+
+            done = i + 1
+            if error is None:
+                self.write(completions[i])
+            elif synced or done < len(pipeline):
+                self.write_error(error)
+            else:
+                # The Sync of the last query hasn't arrived yet, so its
+                # error goes through the regular error handling.
+                last_error = error
+                return
+            if synced or done < len(pipeline):
+                self.write(self.sync_status())
+            self.flush()
+
+        try:
+            conn = await self.get_pgcon()
+            try:
+                await execute.execute_pipeline(
+                    conn,
+                    self.get_dbview(),
+                    pipeline,
+                    state,
+                    fe_conn=self,
+                    on_complete=on_complete,
+                )
+            finally:
+                self.maybe_release_pgcon(conn)
+        except ConnectionError:
+            raise
+        except Exception as ex:
+            if self._cancelled:
+                raise
+            for i in range(done, len(pipeline)):
+                on_complete(i, ex)
+
+        if last_error is not None:
+            raise last_error
+
     async def sync(self):
         self.buffer.consume_message()
         self.write(self.sync_status())
@@ -1709,6 +1904,11 @@ cdef class EdgeConnection(frontend.FrontendConnection):
             # We're parsing the protocol. We can abort that.
             self._msg_take_waiter.cancel()
 
+        if self._write_waiter is not None and not self._write_waiter.done():
+            # Don't leave a streamed query result waiting for the lost
+            # client forever; the query will be cancelled below.
+            self._write_waiter.set_result(False)
+
         if (
             self._main_task is not None
             and not self._main_task.done()
@@ -1776,6 +1976,11 @@ cdef class EdgeConnection(frontend.FrontendConnection):
             self._msg_take_waiter.set_result(True)
             self._msg_take_waiter = None
 
+    cdef get_write_waiter(self):
+        if self._write_waiter is not None and not self._write_waiter.done():
+            return self._write_waiter
+        return None
+
     def eof_received(self):
         pass
 
@@ -1893,47 +2098,94 @@ cdef class EdgeConnection(frontend.FrontendConnection):
             self.flush()
 
             blocks_queue = collections.deque(blocks)
-            output_queue = asyncio.Queue(maxsize=2)
-
-            async with taskgroup.TaskGroup() as g:
-                g.create_task(pgcon.dump(
-                    blocks_queue,
-                    output_queue,
-                    DUMP_BLOCK_SIZE,
-                ))
-
-                nstops = 0
-                while True:
-                    if self._cancelled:
-                        raise ConnectionAbortedError
-
-                    out = await output_queue.get()
-                    if out is None:
-                        nstops += 1
-                        if nstops == 1:
-                            # we only have one worker right now
-                            break
-                    else:
-                        block, block_num, data = out
-
-                        msg_buf = WriteBuffer.new_message(b'=')
-                        msg_buf.write_int16(4)  # number of headers
-
-                        msg_buf.write_int16(DUMP_HEADER_BLOCK_TYPE)
-                        msg_buf.write_len_prefixed_bytes(
-                            DUMP_HEADER_BLOCK_TYPE_DATA)
-                        msg_buf.write_int16(DUMP_HEADER_BLOCK_ID)
-                        msg_buf.write_len_prefixed_bytes(
-                            block.schema_object_id.bytes)
-                        msg_buf.write_int16(DUMP_HEADER_BLOCK_NUM)
-                        msg_buf.write_len_prefixed_bytes(
-                            str(block_num).encode())
-                        msg_buf.write_int16(DUMP_HEADER_BLOCK_DATA)
-                        msg_buf.write_len_prefixed_buffer(data)
-
-                        self._transport.write(memoryview(msg_buf.end_message()))
-                        if self._write_waiter:
-                            await self._write_waiter
+            nworkers = min(server.get_dump_parallelism(), len(blocks))
+            output_queue = asyncio.Queue(maxsize=2 * nworkers)
+
+            if nworkers > 1:
+                # The extra workers dump from the same snapshot of the
+                # data, exported from our transaction.
+                snapshot_id = await pgcon.sql_fetch_val(
+                    b'SELECT pg_export_snapshot()')
+                helpers = [
+                    self.loop.create_task(server.acquire_pgcon(dbname))
+                    for _ in range(nworkers - 1)
+                ]
+            else:
+                snapshot_id = None
+                helpers = []
+
+            # The connections that are actually dumping, and the ones
+            # obtained by the helpers.
+            workers = [pgcon]
+            acquired = []
+
+            try:
+                async with taskgroup.TaskGroup() as g:
+                    g.create_task(pgcon.dump(
+                        blocks_queue,
+                        output_queue,
+                        DUMP_BLOCK_SIZE,
+                    ))
+                    for helper in helpers:
+                        g.create_task(self._dump_in_snapshot(
+                            helper,
+                            snapshot_id,
+                            blocks_queue,
+                            output_queue,
+                            acquired,
+                            workers,
+                        ))
+
+                    nstops = 0
+                    while True:
+                        if self._cancelled:
+                            raise ConnectionAbortedError
+
+                        out = await output_queue.get()
+                        if out is None:
+                            nstops += 1
+                            if nstops == len(workers):
+                                # All blocks are dumped; the workers that
+                                # are still waiting for a connection are
+                                # not needed anymore.
+                                for helper in helpers:
+                                    helper.cancel()
+                                break
+                        else:
+                            block, block_num, data = out
+
+                            msg_buf = WriteBuffer.new_message(b'=')
+                            msg_buf.write_int16(4)  # number of headers
+
+                            msg_buf.write_int16(DUMP_HEADER_BLOCK_TYPE)
+                            msg_buf.write_len_prefixed_bytes(
+                                DUMP_HEADER_BLOCK_TYPE_DATA)
+                            msg_buf.write_int16(DUMP_HEADER_BLOCK_ID)
+                            msg_buf.write_len_prefixed_bytes(
+                                block.schema_object_id.bytes)
+                            msg_buf.write_int16(DUMP_HEADER_BLOCK_NUM)
+                            msg_buf.write_len_prefixed_bytes(
+                                str(block_num).encode())
+                            msg_buf.write_int16(DUMP_HEADER_BLOCK_DATA)
+                            msg_buf.write_len_prefixed_buffer(data)
+
+                            self._transport.write(
+                                memoryview(msg_buf.end_message()))
+                            if self._write_waiter:
+                                await self._write_waiter
+
+            finally:
+                for helper in helpers:
+                    if not helper.done():
+                        helper.cancel()
+                    elif (
+                        not helper.cancelled()
+                        and helper.exception() is None
+                        and helper.result() not in acquired
+                    ):
+                        # The helper was cancelled before it could
+                        # pick up its connection.
+                        server.release_pgcon(dbname, helper.result())
 
             await pgcon.sql_execute(b"ROLLBACK;")
 
@@ -1950,6 +2202,56 @@ cdef class EdgeConnection(frontend.FrontendConnection):
         self.write(msg_buf.end_message())
         self.flush()
 
+    async def _dump_in_snapshot(
+        self,
+        acquire,
+        bytes snapshot_id,
+        blocks_queue,
+        output_queue,
+        list acquired,
+        list workers,
+    ):
+        # An extra DUMP worker: dumps blocks over another backend
+        # connection in a transaction that uses the snapshot exported
+        # by the main one, so that all workers see the same data.
+        server = self.server
+        dbname = self.get_dbview().dbname
+
+        try:
+            pgcon = await acquire
+        except Exception:
+            # Carry on with fewer workers.
+            logger.debug(
+                'could not acquire an extra connection for dump',
+                exc_info=True)
+            return
+
+        acquired.append(pgcon)
+        try:
+            if not blocks_queue:
+                # Other workers have already picked up all the blocks.
+                return
+
+            workers.append(pgcon)
+            await pgcon.sql_execute(
+                b'''START TRANSACTION
+                        ISOLATION LEVEL SERIALIZABLE
+                        READ ONLY;
+                    SET TRANSACTION SNAPSHOT '%s';
+
+                    SET idle_in_transaction_session_timeout = 0;
+                    SET statement_timeout = 0;
+                ''' % snapshot_id,
+            )
+            await pgcon.dump(
+                blocks_queue,
+                output_queue,
+                DUMP_BLOCK_SIZE,
+            )
+            await pgcon.sql_execute(b"ROLLBACK;")
+        finally:
+            server.release_pgcon(dbname, pgcon)
+
     async def _execute_utility_stmt(self, eql: str, pgcon):
         cdef dbview.DatabaseConnectionView _dbview
 
@@ -2290,6 +2592,35 @@ async def eval_buffer(
     return data
 
 
+async def authenticate(
+    server,
+    user: str,
+    auth_data: bytes,
+    transport: srvargs.ServerConnTransport,
+):
+    # Authenticates requests not going through the binary protocol,
+    # such as the ones to the HTTP system API, like the tunnelled ones.
+    cdef EdgeConnection proto
+
+    proto = new_edge_connection(
+        server,
+        passive=True,
+        auth_data=auth_data,
+        transport=transport,
+    )
+
+    authmethod = await server.get_auth_method(user, transport)
+    authmethod_name = type(authmethod).__name__
+    if authmethod_name == 'JWT':
+        proto._auth_jwt(user)
+    elif authmethod_name == 'Trust':
+        proto._auth_trust(user)
+    else:
+        raise errors.AuthenticationError(
+            f'authentication failed: {authmethod_name} authentication '
+            f'is not supported for this request')
+
+
 include "binary_v0.pyx"
 
 
@@ -1170,7 +1170,7 @@ cdef class EdgeConnectionBackwardsCompatible(EdgeConnection):
 
         conn = await self.get_pgcon()
         try:
-            if conn.last_state == state:
+            if conn.has_state(state):
                 # the current status in conn is in sync with dbview, skip the
                 # state restoring
                 state = None
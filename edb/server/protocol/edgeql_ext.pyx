@@ -17,9 +17,16 @@
 #
 
 
+cimport cython
+cimport cpython
+
+from libc.stdint cimport int32_t
+
 import decimal
+import functools
 import http
 import json
+import time
 import urllib.parse
 
 import immutables
@@ -36,11 +43,17 @@ from edb.edgeql import qltypes
 
 from edb.server import compiler
 from edb.server import config
+from edb.server import metrics
 from edb.server.compiler import enums
 from edb.server.dbview cimport dbview
+from edb.server.protocol cimport frontend
+from edb.server.pgproto cimport hton
 from edb.server.pgproto.pgproto cimport WriteBuffer
 
 
+JSON_LINES_MIME = b'application/x-ndjson'
+
+
 async def handle_request(
     object request,
     object response,
@@ -57,17 +70,22 @@ async def handle_request(
     variables = None
     globals_ = None
     query = None
+    batch = None
 
     try:
         if request.method == b'POST':
             if request.content_type and b'json' in request.content_type:
                 body = json.loads(request.body)
-                if not isinstance(body, dict):
+                if isinstance(body, list):
+                    batch = _parse_batch(body)
+                elif not isinstance(body, dict):
                     raise TypeError(
-                        'the body of the request must be a JSON object')
-                query = body.get('query')
-                variables = body.get('variables')
-                globals_ = body.get('globals')
+                        'the body of the request must be a JSON object '
+                        'or an array of JSON objects')
+                else:
+                    query = body.get('query')
+                    variables = body.get('variables')
+                    globals_ = body.get('globals')
             else:
                 raise TypeError(
                     'unable to interpret EdgeQL POST request')
@@ -100,7 +118,7 @@ async def handle_request(
         else:
             raise TypeError('expected a GET or a POST request')
 
-        if not query:
+        if batch is None and not query:
             raise TypeError('invalid EdgeQL request: query is missing')
 
         if variables is not None and not isinstance(variables, dict):
@@ -120,28 +138,198 @@ async def handle_request(
 
     response.status = http.HTTPStatus.OK
     response.content_type = b'application/json'
+
+    if batch is not None:
+        await _handle_batch_request(request, response, db, batch)
+        return
+
+    if request.accept and JSON_LINES_MIME in request.accept:
+        # The result is sent as it arrives from the backend, one
+        # element per line, once the response headers are written.
+        response.content_type = JSON_LINES_MIME
+        response.stream = functools.partial(
+            _stream_result, db, query, variables or {}, globals_ or {},
+            request.turn)
+        return
+
+    started_at = time.monotonic()
     try:
         result = await execute.parse_execute_json(
             db,
             query,
             variables=variables or {},
             globals_=globals_ or {},
+            turn=request.turn,
         )
     except Exception as ex:
         if debug.flags.server:
             markup.dump(ex)
 
-        ex_type = type(ex)
-        if not issubclass(ex_type, errors.EdgeDBError):
-            # XXX Fix this when LSP "location" objects are implemented
-            ex_type = errors.InternalServerError
+        response.body = json.dumps({'error': _error_to_dict(ex)}).encode()
+    else:
+        response.body = b'{"data":' + result + b'}'
+    finally:
+        metrics.http_edgeql_query_duration.observe(
+            time.monotonic() - started_at)
+
+
+def _parse_batch(list body):
+    batch = []
+    for item in body:
+        if not isinstance(item, dict):
+            raise TypeError('batch items must be JSON objects')
+
+        query = item.get('query')
+        if not query:
+            raise TypeError('invalid EdgeQL request: query is missing')
 
-        err_dct = {
-            'message': str(ex),
-            'type': str(ex_type.__name__),
-            'code': ex_type.get_code(),
-        }
+        variables = item.get('variables')
+        if variables is not None and not isinstance(variables, dict):
+            raise TypeError('"variables" must be a JSON object')
+
+        globals_ = item.get('globals')
+        if globals_ is not None and not isinstance(globals_, dict):
+            raise TypeError('"globals" must be a JSON object')
+
+        batch.append((query, variables or {}, globals_ or {}))
+
+    if not batch:
+        raise TypeError('invalid EdgeQL request: the batch is empty')
+
+    return batch
+
+
+async def _handle_batch_request(
+    object request,
+    object response,
+    object db,
+    list batch,
+):
+    transaction = False
+    if request.url.query:
+        qs = urllib.parse.parse_qs(request.url.query.decode('ascii'))
+        transaction = qs.get('transaction', [''])[0] in ('true', '1')
+
+    started_at = time.monotonic()
+    try:
+        results = await execute.parse_execute_json_batch(
+            db,
+            batch,
+            transaction=transaction,
+            turn=request.turn,
+        )
+    except Exception as ex:
+        if debug.flags.server:
+            markup.dump(ex)
 
-        response.body = json.dumps({'error': err_dct}).encode()
+        response.body = json.dumps({'error': _error_to_dict(ex)}).encode()
     else:
-        response.body = b'{"data":' + result + b'}'
+        out = []
+        for result in results:
+            if isinstance(result, Exception):
+                if debug.flags.server:
+                    markup.dump(result)
+                out.append(
+                    json.dumps({'error': _error_to_dict(result)}).encode())
+            else:
+                out.append(b'{"data":' + result + b'}')
+        response.body = b'[' + b','.join(out) + b']'
+    finally:
+        metrics.http_edgeql_query_duration.observe(
+            time.monotonic() - started_at)
+
+
+def _error_to_dict(ex):
+    ex_type = type(ex)
+    if not issubclass(ex_type, errors.EdgeDBError):
+        # XXX Fix this when LSP "location" objects are implemented
+        ex_type = errors.InternalServerError
+
+    return {
+        'message': str(ex),
+        'type': str(ex_type.__name__),
+        'code': ex_type.get_code(),
+    }
+
+
+async def _stream_result(
+    object db,
+    str query,
+    dict variables,
+    dict globals_,
+    object turn,
+    object writer,
+):
+    cdef JSONLinesConnection conn = JSONLinesConnection(writer)
+
+    row_limit = (
+        db.server.get_backend_stream_row_limit()
+        or edbdef.HTTP_PORT_STREAM_ROW_LIMIT
+    )
+
+    started_at = time.monotonic()
+    try:
+        await execute.parse_execute_json(
+            db,
+            query,
+            variables=variables,
+            globals_=globals_,
+            output_format=compiler.OutputFormat.JSON_ELEMENTS,
+            fe_conn=conn,
+            row_limit=row_limit,
+            turn=turn,
+        )
+    except ConnectionAbortedError:
+        raise
+    except Exception as ex:
+        if debug.flags.server:
+            markup.dump(ex)
+
+        # Part of the result might have been sent already, so the error
+        # is reported in the last line.
+        writer.send_chunk(
+            json.dumps({'error': _error_to_dict(ex)}).encode() + b'\n')
+    finally:
+        metrics.http_edgeql_query_duration.observe(
+            time.monotonic() - started_at)
+
+
+@cython.final
+cdef class JSONLinesConnection(frontend.FrontendConnection):
+
+    cdef:
+        object _writer
+
+    def __init__(self, writer):
+        self._writer = writer
+
+    cdef write(self, WriteBuffer buf):
+        # Turn a batch of DataRow messages, each carrying a single JSON
+        # element, into newline-delimited JSON.
+        cdef:
+            bytes data = bytes(buf)
+            const char *p = cpython.PyBytes_AS_STRING(data)
+            ssize_t size = len(data)
+            ssize_t pos = 0
+            int32_t msg_len
+            int32_t col_len
+            list lines = []
+
+        while pos < size:
+            # Byte1('D'), Int32 message length, Int16 column count,
+            # Int32 column length, Byte[n] column value.
+            msg_len = hton.unpack_int32(p + pos + 1)
+            col_len = hton.unpack_int32(p + pos + 7)
+            if col_len > 0:
+                lines.append(data[pos + 11:pos + 11 + col_len])
+                lines.append(b'\n')
+            pos += 1 + msg_len
+
+        if lines:
+            self._writer.send_chunk(b''.join(lines))
+
+    cdef flush(self):
+        pass
+
+    cdef get_write_waiter(self):
+        return self._writer.get_write_waiter()
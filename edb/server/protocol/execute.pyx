@@ -54,6 +54,7 @@ async def execute(
     *,
     fe_conn: Optional[frontend.FrontendConnection] = None,
     use_prep_stmt: bint = False,
+    row_limit: Optional[int] = None,
 ):
     cdef:
         bytes state = None, orig_state = None
@@ -70,7 +71,7 @@ async def execute(
     data = None
 
     try:
-        if be_conn.last_state == state:
+        if be_conn.has_state(state):
             # the current status in be_conn is in sync with dbview, skip the
             # state restoring
             state = None
@@ -103,6 +104,10 @@ async def execute(
                         use_prep_stmt=use_prep_stmt,
                         state=state,
                         dbver=dbv.dbver,
+                        row_limit=(
+                            row_limit if row_limit is not None
+                            else server.get_backend_stream_row_limit()
+                        ),
                     )
 
                     if query_unit.set_global and data:
@@ -157,6 +162,48 @@ async def execute(
     return data
 
 
+async def execute_pipeline(
+    be_conn: pgcon.PGConnection,
+    dbv: dbview.DatabaseConnectionView,
+    pipeline: list,
+    state: bytes,
+    *,
+    fe_conn: frontend.FrontendConnection,
+    on_complete,
+):
+    """Execute a batch of read-only queries in a single backend round-trip.
+
+    *pipeline* is a list of ``(compiled, bind_data)`` pairs with the
+    arguments already recoded, and *state* is the serialized session
+    state all of them run with.  *on_complete* is called after each
+    query with its index in the pipeline and the error, if any.
+    """
+    cdef list queries = []
+
+    for compiled, bind_data in pipeline:
+        query_unit = compiled.query_unit_group[0]
+        dbv.start(query_unit)
+        queries.append((query_unit, bind_data))
+
+    def _on_complete(i, error):
+        if error is None:
+            dbv.on_success(queries[i][0], None)
+        else:
+            dbv.on_error()
+        on_complete(i, error)
+
+    if be_conn.has_state(state):
+        state = None
+
+    await be_conn.parse_execute_pipeline(
+        queries=queries,
+        fe_conn=fe_conn,
+        on_complete=_on_complete,
+        state=state,
+        dbver=dbv.dbver,
+    )
+
+
 async def execute_script(
     conn: pgcon.PGConnection,
     dbv: dbview.DatabaseConnectionView,
@@ -170,9 +217,11 @@ async def execute_script(
         ssize_t sent = 0
         bint in_tx
         object user_schema, cached_reflection, global_schema
+        object changed_schema_objects
         WriteBuffer bind_data
 
     user_schema = cached_reflection = global_schema = None
+    changed_schema_objects = None
     unit_group = compiled.query_unit_group
     if unit_group.tx_control:
         # TODO: move to the server.compiler once binary_v0 is dropped
@@ -184,6 +233,8 @@ async def execute_script(
     in_tx = dbv.in_tx()
     if not in_tx:
         orig_state = state = dbv.serialize_state()
+        if conn.has_state(state):
+            state = None
 
     data = None
 
@@ -227,9 +278,11 @@ async def execute_script(
                 dbv.start_implicit(query_unit)
                 config_ops = query_unit.config_ops
 
-                if query_unit.user_schema:
+                if query_unit.updates_user_schema:
                     user_schema = query_unit.user_schema
                     cached_reflection = query_unit.cached_reflection
+                    changed_schema_objects = (
+                        query_unit.changed_schema_objects)
 
                 if query_unit.global_schema:
                     global_schema = query_unit.global_schema
@@ -285,7 +338,8 @@ async def execute_script(
     else:
         if not in_tx:
             side_effects = dbv.commit_implicit_tx(
-                user_schema, global_schema, cached_reflection
+                user_schema, global_schema, cached_reflection,
+                changed_schema_objects,
             )
             if side_effects:
                 signal_side_effects(dbv, side_effects)
@@ -340,10 +394,24 @@ def signal_side_effects(dbv, side_effects):
         return
 
     if side_effects & dbview.SideEffects.SchemaChanges:
+        changes = {}
+        change = dbv.last_schema_change
+        if (
+            change is not None
+            and len(change[2]) <= edbdef.SYSEVENT_SCHEMA_CHANGES_MAX_OBJECTS
+        ):
+            # Let the other servers only introspect the changed objects.
+            base_version, version, object_ids = change
+            changes = dict(
+                base_version=str(base_version),
+                version=str(version),
+                object_ids=[str(objid) for objid in object_ids],
+            )
         server.create_task(
             server._signal_sysevent(
                 'schema-changes',
                 dbname=dbv.dbname,
+                **changes,
             ),
             interruptable=False,
         )
@@ -390,39 +458,149 @@ async def parse_execute_json(
     globals_: Mapping[str, Any] = immutables.Map(),
     output_format: compiler.OutputFormat = compiler.OutputFormat.JSON,
     query_cache_enabled: Optional[bool] = None,
-) -> bytes:
+    fe_conn: Optional[frontend.FrontendConnection] = None,
+    row_limit: Optional[int] = None,
+    turn: Optional[Any] = None,
+) -> Optional[bytes]:
     if query_cache_enabled is None:
         query_cache_enabled = not (
             debug.flags.disable_qcache or debug.flags.edgeql_compile)
 
     server = db.server
-    dbv = await server.new_dbview(
-        dbname=db.name,
-        query_cache=query_cache_enabled,
-        protocol_version=edbdef.CURRENT_PROTOCOL,
-    )
+    dbv = await _acquire_json_dbview(db, query_cache_enabled)
+    try:
+        compiled = await _parse_json(dbv, query, output_format)
+        qug = compiled.query_unit_group
+        if fe_conn is not None and len(qug) > 1:
+            raise errors.QueryError(
+                'only single-statement queries can be streamed')
+
+        if turn is not None:
+            # Pipelined HTTP requests that only read run concurrently.
+            await turn.start(not qug.capabilities)
+
+        pgcon = await server.acquire_pgcon(
+            db.name,
+            state=(<dbview.DatabaseConnectionView>dbv).serialize_state(),
+        )
+        try:
+            return await execute_json(
+                pgcon,
+                dbv,
+                compiled,
+                variables=variables,
+                globals_=globals_,
+                fe_conn=fe_conn,
+                use_prep_stmt=len(qug) == 1 and bool(qug[0].sql_hash),
+                row_limit=row_limit,
+            )
+        finally:
+            server.release_pgcon(db.name, pgcon)
+    finally:
+        if query_cache_enabled:
+            server.release_pooled_dbview(dbv)
+
+
+async def parse_execute_json_batch(
+    db: dbview.Database,
+    queries: list,
+    *,
+    transaction: bool = False,
+    query_cache_enabled: Optional[bool] = None,
+    turn: Optional[Any] = None,
+) -> list:
+    """Compile and execute a batch of queries on a single connection.
+
+    *queries* is a list of ``(query, variables, globals)`` tuples.
+    Returns a list with either the JSON result or the error of each
+    query.  If *transaction* is true, the batch is executed in a single
+    transaction, and the first error is raised instead.  The *turn* of a
+    pipelined HTTP request is started once all the queries are compiled.
+    """
+    if query_cache_enabled is None:
+        query_cache_enabled = not (
+            debug.flags.disable_qcache or debug.flags.edgeql_compile)
+
+    server = db.server
+    dbv = await _acquire_json_dbview(db, query_cache_enabled)
+    try:
+        batch = []
+        for query, variables, globals_ in queries:
+            try:
+                compiled = await _parse_json(
+                    dbv, query, compiler.OutputFormat.JSON)
+            except Exception as ex:
+                if transaction:
+                    raise
+                compiled = ex
+            batch.append((compiled, variables, globals_))
+
+        if turn is not None:
+            await turn.start(all(
+                isinstance(compiled, Exception)
+                or not compiled.query_unit_group.capabilities
+                for compiled, _, _ in batch
+            ))
+
+        pgcon = await server.acquire_pgcon(
+            db.name,
+            state=(<dbview.DatabaseConnectionView>dbv).serialize_state(),
+        )
+        try:
+            return await execute_json_batch(
+                pgcon, dbv, batch, transaction=transaction)
+        finally:
+            server.release_pgcon(db.name, pgcon)
+    finally:
+        if query_cache_enabled:
+            server.release_pooled_dbview(dbv)
+
+
+async def _acquire_json_dbview(
+    db: dbview.Database,
+    query_cache_enabled: bool,
+):
+    server = db.server
+    if query_cache_enabled:
+        # Requests coming from HTTP are stateless, so they can share
+        # views with each other instead of setting up their own.
+        return await server.acquire_pooled_dbview(
+            dbname=db.name,
+            protocol_version=edbdef.CURRENT_PROTOCOL,
+        )
+    else:
+        return await server.new_dbview(
+            dbname=db.name,
+            query_cache=query_cache_enabled,
+            protocol_version=edbdef.CURRENT_PROTOCOL,
+        )
+
 
+async def _parse_json(
+    dbv: dbview.DatabaseConnectionView,
+    query: str,
+    output_format: compiler.OutputFormat,
+    allow_capabilities: compiler.Capability = (
+        compiler.Capability.MODIFICATIONS),
+) -> dbview.CompiledQuery:
     query_req = dbview.QueryRequestInfo(
         edgeql.Source.from_string(query),
         protocol_version=edbdef.CURRENT_PROTOCOL,
         input_format=compiler.InputFormat.JSON,
         output_format=output_format,
-        allow_capabilities=compiler.Capability.MODIFICATIONS,
+        allow_capabilities=allow_capabilities,
     )
-
     compiled = await dbv.parse(query_req)
 
-    pgcon = await server.acquire_pgcon(db.name)
-    try:
-        return await execute_json(
-            pgcon,
-            dbv,
-            compiled,
-            variables=variables,
-            globals_=globals_,
+    # The capabilities are only checked when the query is compiled, and
+    # the query cache is shared with requests allowing more of them.
+    capabilities = compiled.query_unit_group.capabilities
+    if capabilities & ~allow_capabilities:
+        raise capabilities.make_error(
+            allow_capabilities,
+            errors.DisabledCapabilityError,
         )
-    finally:
-        server.release_pgcon(db.name, pgcon)
+    return compiled
 
 
 async def execute_json(
@@ -434,26 +612,13 @@ async def execute_json(
     *,
     fe_conn: Optional[frontend.FrontendConnection] = None,
     use_prep_stmt: bint = False,
-) -> bytes:
+    row_limit: Optional[int] = None,
+) -> Optional[bytes]:
     if globals_:
-        dbv.set_globals(immutables.Map({
-            "__::__edb_json_globals__": config.SettingValue(
-                name="__::__edb_json_globals__",
-                value=_encode_json_value(globals_),
-                source='global',
-                scope=qltypes.ConfigScope.GLOBAL,
-            )
-        }))
+        _set_json_globals(dbv, globals_)
 
     qug = compiled.query_unit_group
-
-    args = []
-    if qug.in_type_args:
-        for param in qug.in_type_args:
-            value = variables.get(param.name)
-            args.append(value)
-
-    bind_args = _encode_args(args)
+    bind_args = _encode_json_args(qug, variables)
 
     if len(qug) > 1:
         data = await execute_script(
@@ -470,18 +635,152 @@ async def execute_json(
             compiled,
             bind_args,
             fe_conn=fe_conn,
+            use_prep_stmt=use_prep_stmt,
+            row_limit=row_limit,
         )
 
     if fe_conn is None:
-        if not data or len(data) > 1 or len(data[0]) != 1:
-            raise errors.InternalServerError(
-                f'received incorrect response data for a JSON query')
-
-        return data[0][0]
+        return _get_json_result(data)
     else:
         return None
 
 
+async def execute_json_batch(
+    be_conn: pgcon.PGConnection,
+    dbv: dbview.DatabaseConnectionView,
+    batch: list,
+    *,
+    transaction: bint = False,
+) -> list:
+    """Execute a batch of compiled JSON queries.
+
+    *batch* is a list of ``(compiled, variables, globals)`` tuples,
+    where *compiled* may also be the error the query failed to compile
+    with.  Consecutive single-statement queries are sent to the backend
+    in one pipeline; the rest are executed one by one.
+    """
+    cdef:
+        list results = [None] * len(batch)
+        list pipeline = []
+        list indexes = []
+
+    async def flush_pipeline():
+        if not pipeline:
+            return
+
+        def on_complete(i, error):
+            if error is None:
+                dbv.on_success(pipeline[i][0], None)
+            else:
+                dbv.on_error()
+                results[indexes[i]] = error
+
+        state = dbv.serialize_state()
+        if be_conn.has_state(state):
+            state = None
+
+        try:
+            data = await be_conn.parse_execute_pipeline(
+                queries=pipeline,
+                fe_conn=None,
+                on_complete=on_complete,
+                state=state,
+                dbver=dbv.dbver,
+                atomic=transaction,
+            )
+        except Exception:
+            dbv.on_error()
+            raise
+
+        for i, rows in zip(indexes, data):
+            if results[i] is None:
+                results[i] = _get_json_result(rows)
+
+        pipeline.clear()
+        indexes.clear()
+
+    for i, (compiled, variables, globals_) in enumerate(batch):
+        if isinstance(compiled, Exception):
+            results[i] = compiled
+            continue
+
+        qug = compiled.query_unit_group
+        if (
+            len(qug) == 1
+            and len(qug[0].sql) == 1
+            and not qug[0].set_global
+            and not qug[0].config_ops
+        ):
+            try:
+                _set_json_globals(dbv, globals_)
+                bind_data = args_ser.recode_bind_args(
+                    dbv, compiled, _encode_json_args(qug, variables))
+            except Exception as ex:
+                if transaction:
+                    raise
+                results[i] = ex
+                continue
+            dbv.start(qug[0])
+            pipeline.append((qug[0], bind_data))
+            indexes.append(i)
+        elif transaction:
+            raise errors.QueryError(
+                'only single-statement queries can be executed '
+                'in a transactional batch')
+        else:
+            await flush_pipeline()
+            try:
+                _set_json_globals(dbv, globals_)
+                results[i] = await execute_json(
+                    be_conn,
+                    dbv,
+                    compiled,
+                    variables=variables,
+                    globals_=globals_,
+                    use_prep_stmt=len(qug) == 1 and bool(qug[0].sql_hash),
+                )
+            except Exception as ex:
+                results[i] = ex
+
+    await flush_pipeline()
+    return results
+
+
+cdef _set_json_globals(
+    dbview.DatabaseConnectionView dbv,
+    object globals_,
+):
+    if globals_:
+        dbv.set_globals(immutables.Map({
+            "__::__edb_json_globals__": config.SettingValue(
+                name="__::__edb_json_globals__",
+                value=_encode_json_value(globals_),
+                source='global',
+                scope=qltypes.ConfigScope.GLOBAL,
+            )
+        }))
+    else:
+        dbv.set_globals(immutables.Map())
+
+
+cdef bytes _encode_json_args(object qug, object variables):
+    args = []
+    if qug.in_type_args:
+        for param in qug.in_type_args:
+            value = variables.get(param.name)
+            args.append(value)
+
+    return _encode_args(args)
+
+
+cdef bytes _get_json_result(list data):
+    if not data or len(data) > 1 or len(data[0]) != 1:
+        raise errors.InternalServerError(
+            f'received incorrect response data for a JSON query')
+
+    return data[0][0]
+
+
 cdef bytes _encode_json_value(object val):
     if isinstance(val, decimal.Decimal):
         jarg = str(val)
@@ -24,3 +24,4 @@ cdef class FrontendConnection:
 
     cdef write(self, WriteBuffer buf)
     cdef flush(self)
+    cdef get_write_waiter(self)
@@ -24,3 +24,8 @@ cdef class FrontendConnection:
 
     cdef flush(self):
         raise NotImplementedError
+
+    cdef get_write_waiter(self):
+        # Return an awaitable resolved once the connection can take more
+        # data, or None if it can take it right away.
+        return None
@@ -33,6 +33,7 @@ cdef class HttpRequest:
         public bytes host
         public bytes authorization
         public object params
+        public object turn
 
 
 cdef class HttpResponse:
@@ -43,6 +44,35 @@ cdef class HttpResponse:
         public bytes content_type
         public dict custom_headers
         public bytes body
+        public object stream
+
+
+cdef class PipelineTurn:
+
+    cdef:
+        PipelineTurn previous
+        PipelineTurn next
+        bint reading
+        bint finished
+        bint all_reading
+        bint all_finished
+        object waiter
+        bint wait_finished
+
+    cdef bint _previous_done(self, bint finished)
+    cdef _update(self)
+    cdef finish(self)
+
+
+cdef class PendingResponse:
+
+    cdef:
+        HttpRequest request
+        PipelineTurn turn
+        HttpResponse response
+        list data
+        bint ready
+        bint close_connection
 
 
 cdef class HttpProtocol:
@@ -54,12 +84,16 @@ cdef class HttpProtocol:
         object parser
         object transport
         object unprocessed
+        object pipeline
         object sslctx
-        bint in_response
+        bint streaming
+        bint closing
         bint first_data_call
         bint external_auth
         bint respond_hsts
         bint is_tls
+        bint chunked
+        object write_waiter
         object binary_endpoint_security
         object http_endpoint_security
 
@@ -70,11 +104,16 @@ cdef class HttpProtocol:
     cdef _bad_request(self, HttpRequest request, HttpResponse response,
                       str message)
     cdef _return_binary_error(self, binary.EdgeConnection proto)
+    cdef list _make_response(self, bytes req_version, bytes resp_status,
+                             bytes content_type, dict custom_headers,
+                             bytes body, bint close_connection)
+    cdef list _make_error_response(self, ex)
     cdef _write(self, bytes req_version, bytes resp_status,
                 bytes content_type, dict custom_headers, bytes body,
                 bint close_connection)
 
-    cdef write(self, HttpRequest request, HttpResponse response)
+    cdef list serialize(self, HttpRequest request, HttpResponse response)
+    cdef write_chunk(self, bytes data)
 
     cdef unhandled_exception(self, ex)
     cdef resume(self)
@@ -20,6 +20,8 @@
 include "./consts.pxi"
 
 
+cimport cython
+
 import asyncio
 import collections
 import http
@@ -78,9 +80,119 @@ cdef class HttpResponse:
         self.content_type = b'text/plain'
         self.custom_headers = {}
         self.body = b''
+        self.stream = None
         self.close_connection = False
 
 
+@cython.final
+cdef class PipelineTurn:
+    """Keeps the effects of pipelined requests in the order received.
+
+    Pipelined requests are handled concurrently.  Each of them waits
+    for ``wait_reads()`` before it looks at the schema, and calls
+    ``start()`` once it knows whether it only reads: reading requests
+    go on right away, the other ones wait for the requests received
+    before them to finish, and the requests received after them wait
+    until they are done.
+    """
+
+    def __cinit__(self, PipelineTurn previous):
+        self.previous = previous
+        self.next = None
+        self.reading = False
+        self.finished = False
+        self.all_reading = False
+        self.all_finished = False
+        self.waiter = None
+        self.wait_finished = False
+
+        if previous is not None:
+            previous.next = self
+        self._update()
+
+    async def wait_reads(self):
+        await self._wait(False)
+
+    async def start(self, bint read_only):
+        if read_only:
+            await self._wait(False)
+            self.reading = True
+            self._update()
+        else:
+            await self._wait(True)
+
+    async def _wait(self, bint finished):
+        if self._previous_done(finished):
+            return
+        self.wait_finished = finished
+        self.waiter = asyncio.get_running_loop().create_future()
+        await self.waiter
+
+    cdef bint _previous_done(self, bint finished):
+        if self.previous is None:
+            return True
+        elif finished:
+            return self.previous.all_finished
+        else:
+            return self.previous.all_reading
+
+    cdef _update(self):
+        cdef:
+            bint all_reading
+            bint all_finished
+
+        all_reading = (
+            (self.reading or self.finished) and self._previous_done(False)
+        )
+        all_finished = self.finished and self._previous_done(True)
+
+        if (
+            self.waiter is not None
+            and self._previous_done(self.wait_finished)
+        ):
+            if not self.waiter.done():
+                self.waiter.set_result(None)
+            self.waiter = None
+
+        if self.previous is not None and self.previous.all_finished:
+            # Don't keep the whole history of the connection around.
+            self.previous = None
+
+        if (
+            all_reading != self.all_reading
+            or all_finished != self.all_finished
+        ):
+            self.all_reading = all_reading
+            self.all_finished = all_finished
+            if self.next is not None:
+                self.next._update()
+
+    cdef finish(self):
+        if not self.finished:
+            self.finished = True
+            self._update()
+
+
+@cython.final
+cdef class PendingResponse:
+
+    def __cinit__(self, HttpRequest request, PipelineTurn previous):
+        self.request = request
+        self.response = HttpResponse()
+        self.turn = PipelineTurn(previous)
+        self.data = None
+        self.ready = False
+        self.close_connection = False
+        request.turn = self.turn
+
+
+cdef inline bint _is_safe(HttpRequest request):
+    # Safe methods don't change anything on the server (RFC 9110, 9.2.1),
+    # so requests using them can be handled concurrently with other ones
+    # that only read.
+    return request.method == b'GET' or request.method == b'HEAD'
+
+
 cdef class HttpProtocol:
 
     def __init__(
@@ -100,8 +212,12 @@ cdef class HttpProtocol:
 
         self.parser = None
         self.current_request = None
-        self.in_response = False
+        # Requests received but not handled yet, and requests being
+        # handled, whose responses are waiting to be sent in order.
         self.unprocessed = None
+        self.pipeline = collections.deque()
+        self.streaming = False
+        self.closing = False
         self.first_data_call = True
 
         self.binary_endpoint_security = binary_endpoint_security
@@ -109,6 +225,8 @@ cdef class HttpProtocol:
         self.respond_hsts = False  # redirect non-TLS HTTP clients to TLS URL
 
         self.is_tls = False
+        self.chunked = False
+        self.write_waiter = None
 
     def connection_made(self, transport):
         self.transport = transport
@@ -116,12 +234,23 @@ cdef class HttpProtocol:
     def connection_lost(self, exc):
         self.transport = None
         self.unprocessed = None
+        # Wake up a streaming response; its next write will fail.
+        self.resume_writing()
 
     def pause_writing(self):
-        pass
+        if self.write_waiter is None:
+            self.write_waiter = self.loop.create_future()
 
     def resume_writing(self):
-        pass
+        if self.write_waiter is not None:
+            if not self.write_waiter.done():
+                self.write_waiter.set_result(None)
+            self.write_waiter = None
+
+    def get_write_waiter(self):
+        # Return an awaitable resolved once the transport can take more
+        # data, or None if it can take it right away.
+        return self.write_waiter
 
     def eof_received(self):
         pass
@@ -185,6 +314,9 @@ cdef class HttpProtocol:
                     is srvargs.ServerEndpointSecurityMode.Tls
                 )
 
+        if self.closing:
+            return
+
         try:
             self.parser.feed_data(data)
         except Exception as ex:
@@ -219,24 +351,16 @@ cdef class HttpProtocol:
         self.current_request = HttpRequest()
 
     def on_message_complete(self):
-        self.transport.pause_reading()
-
         req = self.current_request
 
         req.version = self.parser.get_http_version().encode()
         req.should_keep_alive = self.parser.should_keep_alive()
         req.method = self.parser.get_method().upper()
 
-        if self.in_response:
-            # pipelining support
-            if self.unprocessed is None:
-                self.unprocessed = collections.deque()
-            self.unprocessed.append(req)
-        else:
-            self.in_response = True
-            self.server.create_task(
-                self._handle_request(req), interruptable=False
-            )
+        if self.unprocessed is None:
+            self.unprocessed = collections.deque()
+        self.unprocessed.append(req)
+        self.resume()
 
         self.server._http_last_minute_requests += 1
 
@@ -247,10 +371,35 @@ cdef class HttpProtocol:
         self.unprocessed = None
 
     cdef unhandled_exception(self, ex):
+        cdef PendingResponse pending
+
+        if not self.pipeline:
+            if self.transport is not None:
+                self.transport.writelines(self._make_error_response(ex))
+            self.close()
+            return
+
+        # The responses to the requests received before the bad one
+        # have to go out first; stop taking any more requests and let
+        # the pipeline send the error and close the connection after
+        # them.
+        self.closing = True
+        self.unprocessed = None
+        if self.transport is not None:
+            self.transport.pause_reading()
+
+        pending = PendingResponse(HttpRequest(), None)
+        pending.turn.finish()
+        pending.data = self._make_error_response(ex)
+        pending.close_connection = True
+        pending.ready = True
+        self.pipeline.append(pending)
+
+    cdef list _make_error_response(self, ex):
         if debug.flags.server:
             markup.dump(ex)
 
-        self._write(
+        return self._make_response(
             b'1.0',
             b'400 Bad Request',
             b'text/plain',
@@ -258,31 +407,116 @@ cdef class HttpProtocol:
             f'{type(ex).__name__}: {ex}'.encode(),
             True)
 
-        self.close()
-
     cdef resume(self):
-        if self.transport is None:
+        cdef:
+            PendingResponse pending
+            PipelineTurn previous
+
+        if self.transport is None or self.closing:
             return
 
-        if self.unprocessed:
+        # Pipelined requests are handled concurrently, their turns make
+        # the ones changing anything wait for the requests received
+        # before them, and the other way around.
+        while (
+            self.unprocessed
+            and len(self.pipeline) < edbdef.HTTP_PORT_MAX_PIPELINE_DEPTH
+        ):
             req = self.unprocessed.popleft()
+            if self.pipeline:
+                previous = (<PendingResponse>self.pipeline[-1]).turn
+            else:
+                previous = None
+            pending = PendingResponse(req, previous)
+            self.pipeline.append(pending)
             self.server.create_task(
-                self._handle_request(req), interruptable=False
+                self._handle_request(pending), interruptable=False
             )
+
+        if (
+            len(self.pipeline) + len(self.unprocessed or ())
+            >= edbdef.HTTP_PORT_MAX_PIPELINE_DEPTH
+        ):
+            self.transport.pause_reading()
         else:
             self.transport.resume_reading()
 
+    async def _flush_pipeline(self):
+        # Send out the responses that are ready, in the order in which
+        # the requests were received, coalescing them into a single
+        # vectored write.
+        cdef:
+            PendingResponse pending
+            list data = []
+            bint close_connection = False
+
+        while self.pipeline and not self.streaming:
+            pending = self.pipeline[0]
+            if not pending.ready:
+                break
+
+            if pending.data is not None:
+                data.extend(pending.data)
+            elif (
+                pending.response.stream is not None
+                and self.transport is not None
+            ):
+                if data and self.transport is not None:
+                    self.transport.writelines(data)
+                    data = []
+                self.streaming = True
+                try:
+                    await self._write_stream(
+                        pending.request, pending.response)
+                finally:
+                    self.streaming = False
+                if pending.response.close_connection:
+                    pending.close_connection = True
+
+            self.pipeline.popleft()
+            pending.turn.finish()
+            if pending.close_connection:
+                close_connection = True
+                break
+
+        if data and self.transport is not None:
+            self.transport.writelines(data)
+
+        if close_connection:
+            self.close()
+        else:
+            self.resume()
+
     cdef _write(self, bytes req_version, bytes resp_status,
                 bytes content_type, dict custom_headers, bytes body,
                 bint close_connection):
         if self.transport is None:
             return
+        self.transport.writelines(self._make_response(
+            req_version,
+            resp_status,
+            content_type,
+            custom_headers,
+            body,
+            close_connection,
+        ))
+
+    cdef list _make_response(self, bytes req_version, bytes resp_status,
+                             bytes content_type, dict custom_headers,
+                             bytes body, bint close_connection):
         data = [
             b'HTTP/', req_version, b' ', resp_status, b'\r\n',
             b'Content-Type: ', content_type, b'\r\n',
-            b'Content-Length: ', f'{len(body)}'.encode(), b'\r\n',
         ]
 
+        if body is not None:
+            data.append(b'Content-Length: ')
+            data.append(f'{len(body)}'.encode())
+            data.append(b'\r\n')
+        elif self.chunked:
+            # The body is streamed by write_chunk()
+            data.append(b'Transfer-Encoding: chunked\r\n')
+
         for key, value in custom_headers.items():
             data.append(f'{key}: {value}\r\n'.encode())
 
@@ -298,12 +532,15 @@ cdef class HttpProtocol:
             data.append(b'Connection: close\r\n')
         data.append(b'\r\n')
         if body:
-            data.append(body)
-        self.transport.write(b''.join(data))
+            # Keep the body a separate buffer of the vectored write
+            # instead of copying it.
+            return [b''.join(data), body]
+        else:
+            return [b''.join(data)]
 
-    cdef write(self, HttpRequest request, HttpResponse response):
+    cdef list serialize(self, HttpRequest request, HttpResponse response):
         assert type(response.status) is HTTPStatus
-        self._write(
+        return self._make_response(
             request.version,
             f'{response.status.value} {response.status.phrase}'.encode(),
             response.content_type,
@@ -311,6 +548,52 @@ cdef class HttpProtocol:
             response.body,
             response.close_connection)
 
+    cdef write_chunk(self, bytes data):
+        if self.transport is None:
+            raise ConnectionAbortedError
+        if not self.chunked:
+            if data:
+                self.transport.write(data)
+        elif data:
+            self.transport.write(b''.join((
+                f'{len(data):x}\r\n'.encode(), data, b'\r\n',
+            )))
+        else:
+            self.transport.write(b'0\r\n\r\n')
+
+    def send_chunk(self, data: bytes):
+        """Write a part of a streamed response body."""
+        if data:
+            self.write_chunk(data)
+
+    async def _write_stream(self, HttpRequest request, HttpResponse response):
+        # Chunked encoding is an HTTP/1.1 feature, older clients get
+        # the body as is and the end of the connection marks its end.
+        self.chunked = request.version != b'1.0'
+        if not self.chunked:
+            response.close_connection = True
+
+        assert type(response.status) is HTTPStatus
+        self._write(
+            request.version,
+            f'{response.status.value} {response.status.phrase}'.encode(),
+            response.content_type,
+            response.custom_headers,
+            None,
+            response.close_connection)
+
+        try:
+            await response.stream(self)
+            self.write_chunk(b'')
+        except Exception as ex:
+            # The response has already started, so all we can do is to
+            # break the connection to let the client know it's incomplete.
+            if debug.flags.server:
+                markup.dump(ex)
+            response.close_connection = True
+        finally:
+            self.chunked = False
+
     def _switch_to_binary_protocol(self, data=None):
         binproto = binary.new_edge_connection(
             self.server,
@@ -369,9 +652,23 @@ cdef class HttpProtocol:
         ))
         proto.close()
 
-    async def _handle_request(self, HttpRequest request):
+    async def _handle_request(self, PendingResponse pending):
+        try:
+            await self._handle_pending_request(pending)
+        except Exception as ex:
+            pending.data = self._make_error_response(ex)
+            pending.close_connection = True
+
+        if pending.response.stream is None or pending.data is not None:
+            # Streamed responses are produced when they are written.
+            pending.turn.finish()
+        pending.ready = True
+        await self._flush_pipeline()
+
+    async def _handle_pending_request(self, PendingResponse pending):
         cdef:
-            HttpResponse response = HttpResponse()
+            HttpRequest request = pending.request
+            HttpResponse response = pending.response
 
         if self.transport is None:
             return
@@ -380,21 +677,21 @@ cdef class HttpProtocol:
             if request.host:
                 path = request.url.path.lstrip(b'/')
                 loc = b'https://' + request.host + b'/' + path
-                self.transport.write(
+                pending.data = [
                     b'HTTP/1.1 301 Moved Permanently\r\n'
                     b'Strict-Transport-Security: max-age=31536000\r\n'
                     b'Location: ' + loc + b'\r\n'
                     b'\r\n'
-                )
+                ]
             else:
                 msg = b'Request is missing a header: Host\r\n'
-                self.transport.write(
+                pending.data = [
                     b'HTTP/1.1 400 Bad Request\r\n'
                     b'Content-Length: ' + str(len(msg)).encode() + b'\r\n'
                     b'\r\n' + msg
-                )
+                ]
 
-            self.close()
+            pending.close_connection = True
             return
 
         if self.is_tls:
@@ -416,19 +713,16 @@ cdef class HttpProtocol:
                     f"value: {self.http_endpoint_security}"
                 )
 
-        try:
-            await self.handle_request(request, response)
-        except Exception as ex:
-            self.unhandled_exception(ex)
-            return
-
-        self.write(request, response)
-        self.in_response = False
+        # The requests received before this one might still change the
+        # schema this one is compiled against.
+        await pending.turn.wait_reads()
+        await self.handle_request(request, response)
 
-        if response.close_connection or not request.should_keep_alive:
-            self.close()
-        else:
-            self.resume()
+        if response.stream is None:
+            pending.data = self.serialize(request, response)
+        pending.close_connection = (
+            response.close_connection or not request.should_keep_alive
+        )
 
     async def handle_request(self, HttpRequest request, HttpResponse response):
         path = urllib.parse.unquote(request.url.path.decode('ascii'))
@@ -437,6 +731,15 @@ cdef class HttpProtocol:
         path_parts_len = len(path_parts)
         route = path_parts[0]
 
+        if not (
+            route == 'db'
+            and path_parts_len > 2
+            and path_parts[2] in ('edgeql', 'graphql')
+        ):
+            # The query extensions start their turn once they know what
+            # the query does, everything else goes by the request method.
+            await request.turn.start(_is_safe(request))
+
         if route == 'db':
             if path_parts_len < 2:
                 return self._not_found(request, response)
@@ -495,10 +798,10 @@ cdef class HttpProtocol:
                     response.body = await binary.eval_buffer(
                         self.server,
                         database=dbname,
-                        data=self.current_request.body,
+                        data=request.body,
                         conn_params=conn_params,
                         protocol_version=proto_ver,
-                        auth_data=self.current_request.authorization,
+                        auth_data=request.authorization,
                         transport=srvargs.ServerConnTransport.HTTP,
                     )
                     response.status = http.HTTPStatus.OK
@@ -25,9 +25,11 @@ from edb import errors
 from edb.common import debug
 from edb.common import markup
 
+from edb.server import args as srvargs
 from edb.server import compiler
 from edb.server import defines as edbdef
 
+from . import binary  # type: ignore
 from . import execute  # type: ignore
 
 
@@ -40,12 +42,18 @@ async def handle_request(
     try:
         if path_parts == ['status', 'ready'] and request.method == b'GET':
             await handle_status_request(request, response, server)
+        elif path_parts == ['profile'] and request.method == b'GET':
+            await handle_profile_request(request, response, server)
         else:
             response.body = b'Unknown path'
             response.status = http.HTTPStatus.NOT_FOUND
             response.close_connection = True
 
         return
+    except errors.AuthenticationError as ex:
+        _response_error(
+            response, http.HTTPStatus.UNAUTHORIZED, str(ex), type(ex)
+        )
     except errors.BackendUnavailableError as ex:
         _response_error(
             response, http.HTTPStatus.SERVICE_UNAVAILABLE, str(ex), type(ex)
@@ -98,3 +106,40 @@ async def handle_status_request(
     )
     response.body = result
     return
+
+
+async def handle_profile_request(
+    request,
+    response,
+    server,
+):
+    # The profile shows what the server is busy with, so it is only for
+    # superusers, authenticated like the binary protocol over HTTP.
+    params = request.params or {}
+    user = params.get(b'user', edbdef.EDGEDB_SUPERUSER.encode()).decode()
+    await binary.authenticate(
+        server,
+        user,
+        request.authorization,
+        srvargs.ServerConnTransport.HTTP,
+    )
+    role = server.get_roles().get(user)
+    if role is None or not role['superuser']:
+        raise errors.AuthenticationError(
+            'authentication failed: the profile is only available '
+            'to superusers')
+
+    if not server.is_profiler_enabled():
+        response.body = (
+            b'The sampling profiler is disabled, enable it with '
+            b'CONFIGURE INSTANCE SET sampling_profiler_rate := 100;'
+        )
+        response.status = http.HTTPStatus.NOT_FOUND
+        response.close_connection = True
+        return
+
+    # Stacks sampled since the previous request, so that polling the
+    # endpoint yields a stream of profiles.
+    response.status = http.HTTPStatus.OK
+    response.content_type = b'text/plain; charset=utf-8'
+    response.body = (await server.collect_profile()).encode()
@@ -45,12 +45,15 @@ from edb import errors
 
 from edb.common import devmode
 from edb.common import retryloop
+from edb.common import sampler
 from edb.common import taskgroup
+from edb.common import uuidgen
 from edb.common import windowedsum
 
 from edb.schema import reflection as s_refl
 from edb.schema import roles as s_role
 from edb.schema import schema as s_schema
+from edb.schema import version as s_ver
 
 from edb.server import args as srvargs
 from edb.server import cache
@@ -98,6 +101,7 @@ class Server(ha_base.ClusterProtocol):
     _instance_data: Mapping[str, str]
     _sys_queries: Mapping[str, str]
     _local_intro_query: bytes
+    _local_intro_objects_query: bytes
     _global_intro_query: bytes
     _report_config_typedesc: bytes
     _report_config_data: bytes
@@ -141,6 +145,8 @@ class Server(ha_base.ClusterProtocol):
         netport,
         new_instance: bool,
         listen_sockets: tuple[socket.socket, ...] = (),
+        reuse_port: bool = False,
+        admin_socket: bool = True,
         testmode: bool = False,
         binary_endpoint_security: srvargs.ServerEndpointSecurityMode = (
             srvargs.ServerEndpointSecurityMode.Tls),
@@ -155,6 +161,10 @@ class Server(ha_base.ClusterProtocol):
             srvargs.DEFAULT_AUTH_METHODS),
         admin_ui: bool = False,
         instance_name: str,
+        compiled_query_cache_dir: Optional[pathlib.Path] = None,
+        compiler_pool_shared_schemas: bool = False,
+        backend_stream_row_limit: int = 0,
+        dump_parallelism: int = 1,
     ):
         self.__loop = asyncio.get_running_loop()
         self._config_settings = config.get_settings()
@@ -183,6 +193,9 @@ class Server(ha_base.ClusterProtocol):
             max_capacity=pool_capacity,
         )
         self._pg_unavailable_msg = None
+        # Prepared statements recently used on the backend connections,
+        # per database; used to pre-warm the other connections.
+        self._pg_hot_stmts: Dict[str, cache.HotStatements] = {}
 
         # DB state will be initialized in init().
         self._dbindex = None
@@ -190,10 +203,14 @@ class Server(ha_base.ClusterProtocol):
         self._runstate_dir = runstate_dir
         self._internal_runstate_dir = internal_runstate_dir
         self._max_backend_connections = max_backend_connections
+        self._backend_stream_row_limit = backend_stream_row_limit
+        self._dump_parallelism = dump_parallelism
         self._compiler_pool = None
         self._compiler_pool_size = compiler_pool_size
+        self._sampler = sampler.StackSampler('server')
         self._compiler_pool_mode = compiler_pool_mode
         self._compiler_pool_addr = compiler_pool_addr
+        self._compiler_pool_shared_schemas = compiler_pool_shared_schemas
         self._suggested_client_pool_size = max(
             min(max_backend_connections,
                 defines.MAX_SUGGESTED_CLIENT_POOL_SIZE),
@@ -207,6 +224,10 @@ class Server(ha_base.ClusterProtocol):
 
         self._listen_hosts = nethosts
         self._listen_port = netport
+        # Set when other processes serve the same addresses (see
+        # frontends.py); only one of them serves the admin socket.
+        self._reuse_port = reuse_port
+        self._admin_socket = admin_socket
 
         self._sys_auth: Tuple[Any, ...] = tuple()
 
@@ -241,8 +262,11 @@ class Server(ha_base.ClusterProtocol):
 
         self._servers = {}
 
-        self._http_query_cache = cache.StatementsCache(
-            maxsize=defines.HTTP_PORT_QUERY_CACHE_SIZE)
+        self._compiled_query_store: Optional[cache.CompiledQueryStore] = None
+        if compiled_query_cache_dir is not None:
+            self._compiled_query_store = cache.CompiledQueryStore(
+                compiled_query_cache_dir)
+        self._compiled_query_flushes: set[str] = set()
 
         self._http_last_minute_requests = windowedsum.WindowedSum()
         self._http_request_logger = None
@@ -381,6 +405,12 @@ class Server(ha_base.ClusterProtocol):
                 time.monotonic() - started_at)
         if ha_serial == self._ha_master_serial:
             rv.set_server(self)
+            hot_stmts = self._pg_hot_stmts.get(dbname)
+            if hot_stmts is None:
+                hot_stmts = cache.HotStatements(
+                    maxsize=defines.BACKEND_PREWARM_STMTS)
+                self._pg_hot_stmts[dbname] = hot_stmts
+            rv.set_hot_stmts(hot_stmts)
             if self._backend_adaptive_ha is not None:
                 self._backend_adaptive_ha.on_pgcon_made(
                     dbname == defines.EDGEDB_SYSTEM_DB
@@ -497,6 +527,28 @@ class Server(ha_base.ClusterProtocol):
             metrics.background_errors.inc(1.0, 'idle_clients_collector')
             raise
 
+    async def _reinit_profiler(self) -> None:
+        assert self._dbindex is not None
+        rate = config.lookup(
+            'sampling_profiler_rate', self._dbindex.get_sys_config())
+        rate = max(rate, 0)
+        if rate == self._sampler.rate:
+            return
+
+        self._sampler.start(rate)
+        if self._compiler_pool is not None:
+            await self._compiler_pool.set_profiler_rate(rate)
+
+    def is_profiler_enabled(self) -> bool:
+        return bool(self._sampler.rate)
+
+    async def collect_profile(self) -> str:
+        stacks = self._sampler.collect()
+        if self._compiler_pool is not None:
+            sampler.merge_collapsed(
+                stacks, await self._compiler_pool.collect_profile())
+        return sampler.format_collapsed(stacks)
+
     async def _create_compiler_pool(self):
         args = dict(
             pool_size=self._compiler_pool_size,
@@ -510,7 +562,11 @@ class Server(ha_base.ClusterProtocol):
         )
         if self._compiler_pool_mode == srvargs.CompilerPoolMode.Remote:
             args['address'] = self._compiler_pool_addr
+        else:
+            args['shared_schemas'] = self._compiler_pool_shared_schemas
         self._compiler_pool = await compiler_pool.create_compiler_pool(**args)
+        if self._sampler.rate:
+            await self._compiler_pool.set_profiler_rate(self._sampler.rate)
 
     async def _destroy_compiler_pool(self):
         if self._compiler_pool is not None:
@@ -549,20 +605,32 @@ class Server(ha_base.ClusterProtocol):
     def remove_dbview(self, dbview):
         return self._dbindex.remove_view(dbview)
 
+    async def acquire_pooled_dbview(self, *, dbname, protocol_version):
+        db = self.get_db(dbname=dbname)
+        await db.introspection()
+        return self._dbindex.acquire_pooled_view(
+            dbname, protocol_version=protocol_version
+        )
+
+    def release_pooled_dbview(self, dbview):
+        return self._dbindex.release_pooled_view(dbview)
+
     def get_global_schema(self):
         return self._dbindex.get_global_schema()
 
     def get_compilation_system_config(self):
         return self._dbindex.get_compilation_system_config()
 
-    async def acquire_pgcon(self, dbname):
+    async def acquire_pgcon(self, dbname, *, state=None):
+        # If the serialized session state is given, prefer a connection
+        # that has it applied already, so that it needn't be restored.
         if self._pg_unavailable_msg is not None:
             raise errors.BackendUnavailableError(
                 'Postgres is not available: ' + self._pg_unavailable_msg
             )
 
         for _ in range(self._pg_pool.max_capacity):
-            conn = await self._pg_pool.acquire(dbname)
+            conn = await self._pg_pool.acquire(dbname, affinity=state)
             if conn.is_healthy():
                 return conn
             else:
@@ -581,12 +649,43 @@ class Server(ha_base.ClusterProtocol):
             if not discard:
                 logger.warning('Released an unhealthy pgcon; discard now.')
             discard = True
+        elif not discard and self._maybe_prewarm_pgcon(dbname, conn):
+            # The connection is released once it's pre-warmed.
+            return
         try:
-            self._pg_pool.release(dbname, conn, discard=discard)
+            self._pg_pool.release(
+                dbname, conn, discard=discard, affinity=conn.last_state)
         except Exception:
             metrics.background_errors.inc(1.0, 'release_pgcon')
             raise
 
+    def _maybe_prewarm_pgcon(self, dbname, conn):
+        if not self._accept_new_tasks or self._dbindex is None:
+            return False
+        db = self._dbindex.maybe_get_db(dbname)
+        if db is None:
+            return False
+        stmts = conn.get_prewarm_stmts(db.dbver)
+        if not stmts:
+            return False
+        self.create_task(
+            self._prewarm_pgcon(dbname, conn, stmts, db.dbver),
+            interruptable=True,
+        )
+        return True
+
+    async def _prewarm_pgcon(self, dbname, conn, stmts, dbver):
+        # Prepare the statements that are hot on the other connections
+        # to the database off the request path, in a single round-trip,
+        # before the connection goes back to the pool.
+        try:
+            await conn.prewarm(stmts, dbver)
+        except Exception:
+            logger.debug(
+                'could not pre-warm a backend connection', exc_info=True)
+        finally:
+            self.release_pgcon(dbname, conn)
+
     async def load_sys_config(self):
         async with self._use_sys_pgcon() as syscon:
             query = self.get_sys_query('sysconfig')
@@ -598,6 +697,7 @@ class Server(ha_base.ClusterProtocol):
         cfg = await self.load_sys_config()
         self._dbindex.update_sys_config(cfg)
         self._reinit_idle_gc_collector()
+        await self._reinit_profiler()
 
     def schedule_reported_config_if_needed(self, setting_name):
         setting = self._config_settings[setting_name]
@@ -669,6 +769,51 @@ class Server(ha_base.ClusterProtocol):
             schema_class_layout=self._schema_class_layout,
         )
 
+    async def _introspect_user_schema_changes(
+        self, conn, dbname, base_version, version, object_ids
+    ):
+        # Only reload the objects changed by a remote DDL, if we have
+        # the schema it was applied to.  Returns None if the whole
+        # schema needs to be introspected instead.
+        db = self.maybe_get_db(dbname=dbname)
+        if db is None or db.user_schema is None:
+            return None
+        schema = db.user_schema
+        current_version = s_ver.get_schema_version(schema)
+        if current_version == version:
+            # The DDL was ours, or we have already caught up.
+            return schema
+        if current_version != base_version:
+            return None
+
+        try:
+            ids = s_refl.get_changed_objects_closure(schema, object_ids)
+            json_data = await conn.sql_fetch_val(
+                self._local_intro_objects_query,
+                # A binary jsonb argument: version byte, then the text.
+                args=(
+                    b'\x01'
+                    + json.dumps([str(objid) for objid in ids]).encode(),
+                ),
+            )
+            schema = s_refl.parse_changes_into(
+                std_schema=self._std_schema,
+                global_schema=self.get_global_schema(),
+                schema=schema,
+                data=json_data if json_data is not None else b'[]',
+                object_ids=ids,
+                schema_class_layout=self._schema_class_layout,
+            )
+        except Exception:
+            logger.exception(
+                "could not apply schema changes to database '%s'", dbname)
+            return None
+
+        if s_ver.get_schema_version(schema) != version:
+            # More DDL has been applied since the notification was sent.
+            return None
+        return schema
+
     async def _acquire_intro_pgcon(self, dbname):
         try:
             conn = await self.acquire_pgcon(dbname)
@@ -686,13 +831,18 @@ class Server(ha_base.ClusterProtocol):
                 raise
         return conn
 
-    async def introspect_db(self, dbname):
+    async def introspect_db(self, dbname, *, schema_change=None):
         """Use this method to (re-)introspect a DB.
 
         If the DB is already registered in self._dbindex, its
         schema, config, etc. would simply be updated. If it's missing
         an entry for it would be created.
 
+        *schema_change*, if given, is a (base_version, version,
+        object_ids) tuple describing the remote DDL that triggered
+        the introspection, which allows to only reload the changed
+        schema objects.
+
         All remote notifications of remote events should use this method
         to refresh the state. Even if the remote event was a simple config
         change, a lot of other events could happen before it was sent to us
@@ -708,7 +858,15 @@ class Server(ha_base.ClusterProtocol):
             return
 
         try:
-            user_schema = await self.introspect_user_schema(conn)
+            user_schema = None
+            if schema_change is not None:
+                user_schema = await self._introspect_user_schema_changes(
+                    conn, dbname, *schema_change)
+                if user_schema is not None:
+                    metrics.schema_introspections.inc(1.0, 'incremental')
+            if user_schema is None:
+                user_schema = await self.introspect_user_schema(conn)
+                metrics.schema_introspections.inc(1.0, 'full')
 
             reflection_cache_json = await conn.sql_fetch_val(
                 b'''
@@ -757,6 +915,89 @@ class Server(ha_base.ClusterProtocol):
         finally:
             self.release_pgcon(dbname, conn)
 
+        if self._compiled_query_store is not None:
+            await self._restore_compiled_queries(dbname)
+
+    def _get_compiled_query_fingerprint(self, db) -> bytes:
+        assert self._dbindex is not None
+        return cache.compiled.schema_fingerprint(
+            db.user_schema,
+            self._dbindex.get_global_schema(),
+            db.db_config,
+            self._dbindex.get_compilation_system_config(),
+        )
+
+    async def _restore_compiled_queries(self, dbname):
+        assert self._compiled_query_store is not None
+        db = self.maybe_get_db(dbname=dbname)
+        if db is None or db.user_schema is None:
+            return
+
+        dbver = db.dbver
+        fingerprint = self._get_compiled_query_fingerprint(db)
+        try:
+            entries = await self.__loop.run_in_executor(
+                None, self._compiled_query_store.load, dbname, fingerprint)
+        except Exception:
+            metrics.background_errors.inc(1.0, 'load_compiled_queries')
+            logger.exception(
+                "could not load compiled queries of database '%s'", dbname)
+            return
+
+        if not entries or db.dbver != dbver:
+            # Nothing to restore, or the schema has changed while
+            # we were loading the entries.
+            return
+
+        restored = db.restore_compiled_queries(entries)
+        logger.info(
+            "restored %d compiled queries for database '%s'",
+            restored, dbname,
+        )
+
+    def on_compiled_query_cached(self, dbname: str) -> None:
+        if (
+            self._compiled_query_store is None
+            or dbname in self._compiled_query_flushes
+            or not self._accept_new_tasks
+        ):
+            return
+
+        # Write-behind: persist the cache after a delay, so that
+        # a burst of compilations results in a single write.
+        self._compiled_query_flushes.add(dbname)
+        self.create_task(
+            self._flush_compiled_queries(dbname), interruptable=True)
+
+    async def _flush_compiled_queries(self, dbname: str) -> None:
+        assert self._compiled_query_store is not None
+        try:
+            await asyncio.sleep(defines.COMPILED_QUERY_CACHE_FLUSH_DELAY)
+        finally:
+            self._compiled_query_flushes.discard(dbname)
+
+        db = self.maybe_get_db(dbname=dbname)
+        if db is None or db.user_schema is None:
+            return
+
+        fingerprint = self._get_compiled_query_fingerprint(db)
+        entries = db.get_compiled_query_entries()
+        if not entries:
+            return
+
+        try:
+            await self.__loop.run_in_executor(
+                None,
+                self._compiled_query_store.save,
+                dbname,
+                fingerprint,
+                entries,
+            )
+        except Exception:
+            metrics.background_errors.inc(1.0, 'save_compiled_queries')
+            logger.exception(
+                "could not save compiled queries of database '%s'", dbname)
+
     async def introspect_db_config(self, conn):
         result = await conn.sql_fetch_val(self.get_sys_query('dbconfig'))
         return config.from_json(config.get_settings(), result)
@@ -928,6 +1169,11 @@ class Server(ha_base.ClusterProtocol):
                 WHERE key = 'local_intro_query';
             ''')
 
+            self._local_intro_objects_query = await syscon.sql_fetch_val(b'''\
+                SELECT text FROM edgedbinstdata.instdata
+                WHERE key = 'local_intro_objects_query';
+            ''')
+
             self._global_intro_query = await syscon.sql_fetch_val(b'''\
                 SELECT text FROM edgedbinstdata.instdata
                 WHERE key = 'global_intro_query';
@@ -1145,6 +1391,9 @@ class Server(ha_base.ClusterProtocol):
             if self._dbindex.has_db(dbname):
                 self._dbindex.unregister_db(dbname)
             self._block_new_connections.discard(dbname)
+            self._pg_hot_stmts.pop(dbname, None)
+            if self._compiled_query_store is not None:
+                self._compiled_query_store.discard(dbname)
         except Exception:
             metrics.background_errors.inc(1.0, 'on_after_drop_db')
             raise
@@ -1169,6 +1418,9 @@ class Server(ha_base.ClusterProtocol):
             elif setting_name == 'session_idle_timeout':
                 self._reinit_idle_gc_collector()
 
+            elif setting_name == 'sampling_profiler_rate':
+                await self._reinit_profiler()
+
             self.schedule_reported_config_if_needed(setting_name)
         except Exception:
             metrics.background_errors.inc(1.0, 'on_system_config_set')
@@ -1188,6 +1440,9 @@ class Server(ha_base.ClusterProtocol):
             elif setting_name == 'session_idle_timeout':
                 self._reinit_idle_gc_collector()
 
+            elif setting_name == 'sampling_profiler_rate':
+                await self._reinit_profiler()
+
             self.schedule_reported_config_if_needed(setting_name)
         except Exception:
             metrics.background_errors.inc(1.0, 'on_system_config_reset')
@@ -1332,15 +1587,29 @@ class Server(ha_base.ClusterProtocol):
 
         self.create_task(task(), interruptable=True)
 
-    def _on_remote_ddl(self, dbname):
+    def _on_remote_ddl(
+        self, dbname, base_version=None, version=None, object_ids=None
+    ):
         if not self._accept_new_tasks:
             return
 
+        schema_change = None
+        if (
+            base_version is not None
+            and version is not None
+            and object_ids is not None
+        ):
+            schema_change = (
+                uuidgen.UUID(base_version),
+                uuidgen.UUID(version),
+                [uuidgen.UUID(objid) for objid in object_ids],
+            )
+
         # Triggered by a postgres notification event 'schema-changes'
         # on the __edgedb_sysevent__ channel
         async def task():
             try:
-                await self.introspect_db(dbname)
+                await self.introspect_db(dbname, schema_change=schema_change)
             except Exception:
                 metrics.background_errors.inc(1.0, 'on_remote_ddl')
                 raise
@@ -1592,6 +1861,8 @@ class Server(ha_base.ClusterProtocol):
                 kwargs = {"sock": sock}
             else:
                 kwargs = {"host": host, "port": port}
+                if self._reuse_port:
+                    kwargs["reuse_port"] = True
             return await self.__loop.create_server(proto_factory, **kwargs)
         except Exception as e:
             logger.warning(
@@ -1626,6 +1897,7 @@ class Server(ha_base.ClusterProtocol):
         admin: bool = True,
         sockets: tuple[socket.socket, ...] = (),
     ):
+        admin = admin and self._admin_socket
         servers = {}
         if port == 0:
             # Automatic port selection requires us to start servers
@@ -1829,6 +2101,7 @@ class Server(ha_base.ClusterProtocol):
         )
 
         await self._cluster.start_watching(self)
+        await self._reinit_profiler()
         await self._create_compiler_pool()
 
         if self._startup_script and self._new_instance:
@@ -1913,6 +2186,7 @@ class Server(ha_base.ClusterProtocol):
                 await tg.__aexit__(*sys.exc_info())
 
             await self._destroy_compiler_pool()
+            self._sampler.stop()
 
         finally:
             if self.__sys_pgcon is not None:
@@ -1986,6 +2260,12 @@ class Server(ha_base.ClusterProtocol):
     def get_backend_runtime_params(self) -> Any:
         return self._cluster.get_runtime_params()
 
+    def get_backend_stream_row_limit(self) -> int:
+        return self._backend_stream_row_limit
+
+    def get_dump_parallelism(self) -> int:
+        return self._dump_parallelism
+
     def set_pg_unavailable_msg(self, msg):
         if msg is None or self._pg_unavailable_msg is None:
             self._pg_unavailable_msg = msg
@@ -19,6 +19,7 @@
 
 from __future__ import annotations
 
+import base64
 import contextlib
 import http.client
 import json
@@ -27,6 +28,7 @@ import urllib.parse
 import urllib.request
 
 import edgedb
+from edgedb import scram
 
 from edb.errors import base as base_errors
 
@@ -97,6 +99,126 @@ class BaseHttpTest:
         self.http_con_send_request(con, params, path=path)
         return self.http_con_read_response(con)
 
+    def http_scram_auth(self, user, password):
+        """Authenticate with SCRAM at /auth/token.
+
+        Return the (body, headers, status) of the last response, whose
+        body is the token on success, the SCRAM session id and the
+        expected server signature.
+        """
+        with self.http_con() as con:
+            con.request('GET', '/auth/token')
+            _, headers, status = self.http_con_read_response(con)
+            self.assertEqual(status, 401)
+            self.assertEqual(
+                headers, headers | {'www-authenticate': 'scram-sha-256'}
+            )
+
+        client_nonce = scram.generate_nonce()
+        client_first, client_first_bare = scram.build_client_first_message(
+            client_nonce, user
+        )
+        client_first_b64 = base64.b64encode(
+            client_first.encode('ascii')
+        ).decode('ascii')
+
+        with self.http_con() as con:
+            con.request(
+                'GET',
+                '/auth/token',
+                headers={
+                    'Authorization': f'SCRAM-SHA-256 data={client_first_b64}'
+                },
+            )
+            resp = con.getresponse()
+            headers = {k.lower(): v for k, v in resp.getheaders()}
+            self.assertEqual(resp.status, 401)
+
+        scheme, _, data = headers['www-authenticate'].partition(' ')
+        self.assertEqual(scheme, 'SCRAM-SHA-256')
+
+        values = {}
+        for kv_str in data.split():
+            key, _, value = kv_str.rstrip(',').partition('=')
+            values[key] = value
+
+        self.assertIn('sid', values)
+        self.assertIn('data', values)
+
+        sid = values['sid']
+        server_first = base64.b64decode(values['data'])
+
+        server_nonce, salt, itercount = scram.parse_server_first_message(
+            server_first
+        )
+
+        client_final, expected_server_sig = scram.build_client_final_message(
+            password,
+            salt,
+            itercount,
+            client_first_bare.encode('utf-8'),
+            server_first,
+            server_nonce,
+        )
+        client_final_b64 = base64.b64encode(
+            client_final.encode('ascii')
+        ).decode('ascii')
+
+        with self.http_con() as con:
+            con.request(
+                'GET',
+                '/auth/token',
+                headers={
+                    'Authorization': f'SCRAM-SHA-256 sid={sid} '
+                    f'data={client_final_b64}'
+                },
+            )
+            resp = con.getresponse()
+            content = resp.read()
+            headers = {k.lower(): v for k, v in resp.getheaders()}
+            return content, headers, resp.status, sid, expected_server_sig
+
+    def http_con_pipeline(self, con, requests: list, *, path=''):
+        """Send GET requests for all *requests* params at once.
+
+        Return the list of (body, headers, status) of the responses, which
+        are read only after all of the requests have been sent.
+        """
+        api_path = self.get_api_path()
+        host = self.http_host  # type: ignore
+        con.send(b''.join(
+            f'GET {api_path}/{path}?{urllib.parse.urlencode(params)} '
+            f'HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode()
+            for params in requests
+        ))
+        return self.http_con_read_responses(con, len(requests))
+
+    def http_con_read_responses(self, con, count: int):
+        """Read *count* responses from the raw socket of *con*."""
+        results = []
+        with con.sock.makefile('rb') as f:
+            for _ in range(count):
+                _, status, _ = f.readline().split(b' ', 2)
+                headers = {}
+                while (line := f.readline().strip()):
+                    k, v = line.decode().split(':', 1)
+                    headers[k.strip().lower()] = v.strip().lower()
+
+                if headers.get('transfer-encoding') == 'chunked':
+                    body = b''
+                    while (size := int(f.readline().strip(), 16)):
+                        body += f.read(size)
+                        f.readline()
+                    f.readline()
+                else:
+                    assert 'content-length' in headers, \
+                        'cannot read a response without a Content-Length'
+                    body = f.read(int(headers['content-length']))
+
+                results.append((body, headers, int(status)))
+
+        return results
+
 
 class BaseHttpExtensionTest(BaseHttpTest):
 
@@ -180,6 +302,17 @@ class EdgeQLTestCase(BaseHttpExtensionTest, server.QueryTestCase):
 
         raise edgedb.EdgeDBError._from_code(ex_code, ex_msg)
 
+    def edgeql_batch(self, queries, *, transaction=False):
+        url = self.http_addr
+        if transaction:
+            url += '?transaction=true'
+        req = urllib.request.Request(url, method='POST')
+        req.add_header('Content-Type', 'application/json')
+        response = urllib.request.urlopen(
+            req, json.dumps(queries).encode(), context=self.tls_context
+        )
+        return json.loads(response.read())
+
     def assert_edgeql_query_result(self, query, result, *,
                                    msg=None, sort=None,
                                    use_http_post=True,
@@ -211,10 +344,12 @@ class GraphQLTestCase(BaseHttpExtensionTest, server.QueryTestCase):
     def graphql_query(self, query, *, operation_name=None,
                       use_http_post=True,
                       variables=None,
-                      globals=None):
-        req_data = {
-            'query': query
-        }
+                      globals=None,
+                      extensions=None):
+        req_data = {}
+
+        if query is not None:
+            req_data['query'] = query
 
         if operation_name is not None:
             req_data['operationName'] = operation_name
@@ -224,6 +359,8 @@ class GraphQLTestCase(BaseHttpExtensionTest, server.QueryTestCase):
                 req_data['variables'] = variables
             if globals is not None:
                 req_data['globals'] = globals
+            if extensions is not None:
+                req_data['extensions'] = extensions
             req = urllib.request.Request(self.http_addr, method='POST')
             req.add_header('Content-Type', 'application/json')
             response = urllib.request.urlopen(
@@ -235,6 +372,8 @@ class GraphQLTestCase(BaseHttpExtensionTest, server.QueryTestCase):
                 req_data['variables'] = json.dumps(variables)
             if globals is not None:
                 req_data['globals'] = json.dumps(globals)
+            if extensions is not None:
+                req_data['extensions'] = json.dumps(extensions)
             response = urllib.request.urlopen(
                 f'{self.http_addr}/?{urllib.parse.urlencode(req_data)}',
                 context=self.tls_context,
@@ -272,13 +411,15 @@ class GraphQLTestCase(BaseHttpExtensionTest, server.QueryTestCase):
                                     operation_name=None,
                                     use_http_post=True,
                                     variables=None,
-                                    globals=None):
+                                    globals=None,
+                                    extensions=None):
         res = self.graphql_query(
             query,
             operation_name=operation_name,
             use_http_post=use_http_post,
             variables=variables,
-            globals=globals)
+            globals=globals,
+            extensions=extensions)
 
         if sort is not None:
             # GQL will always have a single object returned. The data is
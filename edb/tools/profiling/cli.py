@@ -101,3 +101,33 @@ def perfviz(
     prof.aggregate(
         pathlib.Path(out), sort_by=sort_by, width=width, threshold=threshold
     )
+
+
+@edbcommands.command()
+@click.option(
+    "--out",
+    default=str(profiler.EDGEDB_DIR / "flamegraph.svg"),
+    show_default=True,
+    help="Output SVG file",
+)
+@click.option(
+    "--width",
+    default=1920,
+    show_default=True,
+    help="Width of the SVG flame graph in pixels",
+)
+@click.argument("input", type=click.File("r"), default="-")
+def flamegraph(input: TextIO, out: str, width: int) -> None:
+    """Render collapsed stacks into an SVG flame graph.
+
+    Reads the stacks from INPUT or the standard input, e.g. sampled by
+    a running server and served to superusers at its /server/profile
+    endpoint:
+
+        curl -k -H "Authorization: Bearer $TOKEN" \\
+            https://localhost:5656/server/profile | edb flamegraph
+    """
+    stats = profiler.parse_collapsed(input)
+    if not stats.samples:
+        raise click.ClickException("No samples to render")
+    profiler.render_collapsed_svg(stats, out, width=width)
@@ -456,6 +456,46 @@ class MemoryFrame:
     )
 
 
+@dataclasses.dataclass
+class SampleFrame:
+    """A node of a tree of sampled call stacks.
+
+    Built from collapsed stacks, e.g. served by the /server/profile
+    endpoint of a running server (see edb/common/sampler.py).
+    """
+    samples: int = 0
+    callees: Dict[FunctionID, SampleFrame] = dataclasses.field(
+        default_factory=dict
+    )
+
+
+# "func_name (path/to/module.py:lineno)", as produced by the sampler.
+COLLAPSED_FRAME_RE = re.compile(
+    r"^(?P<name>.*) \((?P<path>.*):(?P<line>\d+)\)$"
+)
+
+
+def parse_collapsed(lines: Iterable[str]) -> SampleFrame:
+    """Build a tree of samples out of lines of collapsed stacks."""
+    root = SampleFrame()
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        stack, _, count = line.rpartition(" ")
+        samples = int(count)
+        root.samples += samples
+        frame = root
+        for name in stack.split(";"):
+            if m := COLLAPSED_FRAME_RE.match(name):
+                func = (m["path"], int(m["line"]), m["name"])
+            else:
+                func = ("~", 0, name)
+            frame = frame.callees.setdefault(func, SampleFrame())
+            frame.samples += samples
+    return root
+
+
 class ScopeRecorder(ast.NodeVisitor):
     """A nifty AST visitor that records all scope changes in the file."""
 
@@ -851,6 +891,37 @@ def build_svg_blocks_by_memory(
         x += caller.size
 
 
+def build_svg_blocks_by_samples(
+    root: SampleFrame,
+    *,
+    total: int,
+    level: int = 0,
+    x: int = 0,
+) -> Iterator[Block]:
+    for func, callee in root.callees.items():
+        if len(callee.callees) == 0 or level == 0:
+            color = 0
+        elif len(callee.callees) >= 2:
+            color = 1
+        else:
+            color = 2
+        yield Block(
+            func=func,
+            call_stack=(),
+            color=color,
+            level=level,
+            tooltip=(
+                f"{callee.samples / total:.2%} ({callee.samples} samples)"
+            ),
+            w=callee.samples,
+            x=x,
+        )
+        yield from build_svg_blocks_by_samples(
+            callee, total=total, level=level + 1, x=x,
+        )
+        x += callee.samples
+
+
 def render_svg_section(
     blocks: List[Block],
     maxw: float,
@@ -985,6 +1056,33 @@ def render_memory_svg(
         outf.write(mem_svg)
 
 
+def render_collapsed_svg(
+    stats: SampleFrame,
+    out: Union[pathlib.Path, str],
+    *,
+    width: int = 1920,  # in pixels
+    block_height: int = 24,  # in pixels
+    font_size: int = 12,
+) -> None:
+    """Render an SVG flame graph of sampled call stacks to `out`."""
+    if not stats.samples:
+        raise ValueError("no samples to render")
+    with PROFILING_JS.open() as js_file:
+        javascript = js_file.read()
+    blocks = list(build_svg_blocks_by_samples(stats, total=stats.samples))
+    svg = render_svg_section(
+        blocks,
+        stats.samples,
+        [COLORS, CCOLORS, DCOLORS],
+        block_height=block_height,
+        font_size=font_size,
+        width=width,
+        javascript=javascript,
+    )
+    with open(out, "w") as outf:
+        outf.write(svg)
+
+
 SVG = """\
 <?xml version="1.0" standalone="no"?>
 <!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" \
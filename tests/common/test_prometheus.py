@@ -358,3 +358,140 @@ class TestPrometheusClient(unittest.TestCase):
         pmc_r = run_pmc()
         emc_r = run_emc()
         self.assertEqual(pmc_r, emc_r)
+
+    def test_prometheus_08(self):
+
+        def run_pmc():
+            registry = PMC.Registry()
+
+            test_labeled_hist = PMC.Histogram(
+                'test_labeled_hist_seconds', 'A test labeled histogram',
+                labelnames=['lane'], registry=registry)
+
+            r1 = PMC.generate(registry)
+
+            test_labeled_hist.labels('compile').observe(0.22)
+            test_labeled_hist.labels('compile').observe(2.0)
+
+            r2 = PMC.generate(registry)
+
+            test_labeled_hist.labels('heavy').observe(0.43)
+
+            r3 = PMC.generate(registry)
+
+            return [r1, r2, r3]
+
+        def run_emc():
+            r = EP.Registry()
+
+            test_labeled_hist = r.new_labeled_histogram(
+                'test_labeled_hist', 'A test labeled histogram',
+                unit=prom.Unit.SECONDS,
+                labels=('lane',)
+            )
+
+            r1 = r.generate()
+
+            test_labeled_hist.observe(0.22, 'compile')
+            test_labeled_hist.observe(2.0, 'compile')
+
+            r2 = r.generate()
+
+            test_labeled_hist.observe(0.43, 'heavy')
+
+            r3 = r.generate()
+
+            return [r1, r2, r3]
+
+        pmc_r = run_pmc()
+        emc_r = run_emc()
+        self.assertEqual(pmc_r, emc_r)
+
+    def test_prometheus_09(self):
+
+        def run_pmc():
+            registry = PMC.Registry()
+
+            test_labeled_gauge = PMC.Gauge(
+                'test_labeled_gauge', 'A test labeled gauge',
+                labelnames=['pid'], registry=registry)
+
+            test_labeled_gauge.labels('1').set(10)
+            test_labeled_gauge.labels('2').set(20)
+
+            r1 = PMC.generate(registry)
+
+            test_labeled_gauge.remove('1')
+
+            r2 = PMC.generate(registry)
+
+            return [r1, r2]
+
+        def run_emc():
+            r = EP.Registry()
+
+            test_labeled_gauge = r.new_labeled_gauge(
+                'test_labeled_gauge', 'A test labeled gauge',
+                labels=('pid',)
+            )
+
+            test_labeled_gauge.set(10, '1')
+            test_labeled_gauge.set(20, '2')
+
+            r1 = r.generate()
+
+            test_labeled_gauge.remove('1')
+
+            r2 = r.generate()
+
+            return [r1, r2]
+
+        pmc_r = run_pmc()
+        emc_r = run_emc()
+        self.assertEqual(pmc_r, emc_r)
+
+    def test_prometheus_10(self):
+
+        def run_pmc():
+            registry = PMC.Registry()
+
+            test_labeled_counter = PMC.Counter(
+                'test_labeled_counter', 'A test labeled counter',
+                labelnames=['database', 'result'], registry=registry)
+
+            test_labeled_counter.labels('db1', 'hit').inc(1)
+            test_labeled_counter.labels('db1', 'miss').inc(2)
+            test_labeled_counter.labels('db2', 'hit').inc(3)
+
+            r1 = PMC.generate(registry)
+
+            test_labeled_counter.remove('db1', 'hit')
+            test_labeled_counter.remove('db1', 'miss')
+
+            r2 = PMC.generate(registry)
+
+            return [r1, r2]
+
+        def run_emc():
+            r = EP.Registry()
+
+            test_labeled_counter = r.new_labeled_counter(
+                'test_labeled_counter_total', 'A test labeled counter',
+                labels=('database', 'result')
+            )
+
+            test_labeled_counter.inc(1, 'db1', 'hit')
+            test_labeled_counter.inc(2, 'db1', 'miss')
+            test_labeled_counter.inc(3, 'db2', 'hit')
+
+            r1 = r.generate()
+
+            test_labeled_counter.remove_matching('db1')
+
+            r2 = r.generate()
+
+            return [r1, r2]
+
+        pmc_r = run_pmc()
+        emc_r = run_emc()
+        self.assertEqual(pmc_r, emc_r)
@@ -17,7 +17,13 @@
 #
 
 
+import json
 import os
+import sys
+import time
+import unittest
+import urllib.parse
+import urllib.request
 
 import edgedb
 
@@ -317,3 +323,219 @@ class TestHttpEdgeQL(tb.EdgeQLTestCase):
                 globals={'default::test_global_str': 'foo'},
                 use_http_post=use_http_post,
             )
+
+    def test_http_edgeql_query_globals_04(self):
+        # Views are reused between HTTP requests, make sure that
+        # the globals of one request do not leak into the next one.
+        Q = r'''select (global test_global_str) ?? <str>$test'''
+
+        for i in range(5):
+            self.assert_edgeql_query_result(
+                Q,
+                [f'foo{i}'],
+                variables={'test': '!'},
+                globals={'default::test_global_str': f'foo{i}'},
+            )
+
+            self.assert_edgeql_query_result(
+                Q,
+                ['!'],
+                variables={'test': '!'},
+            )
+
+    def test_http_edgeql_batch_01(self):
+        results = self.edgeql_batch([
+            {'query': 'select 1 + <int64>$x', 'variables': {'x': 1}},
+            {'query': 'select 1 / 0'},
+            {
+                'query': 'select global test_global_str',
+                'globals': {'default::test_global_str': 'foo'},
+            },
+            {'query': 'select global test_global_str'},
+            {'query': 'select 1; select 2'},
+        ])
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0], {'data': [2]})
+        self.assertIn('division by zero', results[1]['error']['message'])
+        self.assertEqual(results[2], {'data': ['foo']})
+        self.assertEqual(results[3], {'data': []})
+        self.assertEqual(results[4], {'data': [2]})
+
+    def test_http_edgeql_batch_02(self):
+        results = self.edgeql_batch([
+            {'query': 'select 1 +'},
+            {'query': 'select <str>$x', 'variables': {'x': 'ok'}},
+        ])
+
+        self.assertIn('error', results[0])
+        self.assertEqual(results[1], {'data': ['ok']})
+
+    def test_http_edgeql_batch_transaction_01(self):
+        results = self.edgeql_batch([
+            {'query': 'insert Setting { name := "batch_tx", value := "1" }'},
+            {'query': 'select 1 / 0'},
+        ], transaction=True)
+
+        self.assertIn('division by zero', results['error']['message'])
+        self.assert_edgeql_query_result(
+            r'''select Setting filter .name = "batch_tx"''',
+            [],
+        )
+
+        results = self.edgeql_batch([
+            {'query': 'insert Setting { name := "batch_tx", value := "1" }'},
+            {'query': 'select count(Setting filter .name = "batch_tx")'},
+        ], transaction=True)
+
+        try:
+            self.assertEqual(len(results), 2)
+            self.assertEqual(results[1], {'data': [1]})
+        finally:
+            self.edgeql_query(
+                r'''delete Setting filter .name = "batch_tx"''')
+
+    def test_http_edgeql_stream_01(self):
+        req = urllib.request.Request(self.http_addr, method='POST')
+        req.add_header('Content-Type', 'application/json')
+        req.add_header('Accept', 'application/x-ndjson')
+        response = urllib.request.urlopen(
+            req,
+            json.dumps({
+                'query': 'select {<str>$x, "b"} ++ <str>range_unpack('
+                         'range(0, <int64>$n))',
+                'variables': {'x': 'a', 'n': 3000},
+            }).encode(),
+            context=self.tls_context,
+        )
+
+        self.assertEqual(
+            response.headers['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response.headers['Transfer-Encoding'], 'chunked')
+        lines = response.read().splitlines()
+        self.assertEqual(len(lines), 6000)
+        self.assertEqual(
+            {json.loads(line) for line in lines},
+            {f'{p}{i}' for p in 'ab' for i in range(3000)},
+        )
+
+    def test_http_edgeql_stream_02(self):
+        req = urllib.request.Request(self.http_addr, method='POST')
+        req.add_header('Content-Type', 'application/json')
+        req.add_header('Accept', 'application/x-ndjson')
+        response = urllib.request.urlopen(
+            req,
+            json.dumps({'query': 'select 1 / 0'}).encode(),
+            context=self.tls_context,
+        )
+
+        lines = response.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn(
+            'division by zero', json.loads(lines[0])['error']['message'])
+
+    def test_http_edgeql_stream_03(self):
+        req = urllib.request.Request(self.http_addr, method='POST')
+        req.add_header('Content-Type', 'application/json')
+        req.add_header('Accept', 'application/x-ndjson')
+        response = urllib.request.urlopen(
+            req,
+            json.dumps({'query': 'select 1; select 2'}).encode(),
+            context=self.tls_context,
+        )
+
+        lines = response.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        error = json.loads(lines[0])['error']
+        self.assertEqual(error['type'], 'QueryError')
+        self.assertEqual(
+            error['message'], 'only single-statement queries can be streamed')
+
+    def test_http_edgeql_pipelining_01(self):
+        # Read-only requests are handled concurrently, but the responses
+        # must still come back in order.
+        queries = [
+            {'query': 'select <int64>$x', 'variables': json.dumps({'x': i})}
+            for i in range(20)
+        ]
+        queries[7] = {'query': 'select 1 +'}
+
+        with self.http_con() as con:
+            results = self.http_con_pipeline(con, queries)
+
+        self.assertEqual(len(results), 20)
+        for i, (body, _headers, status) in enumerate(results):
+            self.assertEqual(status, 200)
+            if i == 7:
+                self.assertIn('error', json.loads(body))
+            else:
+                self.assertEqual(json.loads(body), {'data': [i]})
+
+    def test_http_edgeql_pipelining_02(self):
+        # A malformed request must be answered after the responses to
+        # the requests sent before it.
+        api_path = self.get_api_path()
+        host = self.http_host  # type: ignore
+        query = urllib.parse.urlencode({'query': 'select 1'})
+        request = f'GET {api_path}?{query} HTTP/1.1\r\nHost: {host}\r\n\r\n'
+
+        with self.http_con() as con:
+            con.send(request.encode() * 3 + b'NOT HTTP\r\n\r\n')
+            results = self.http_con_read_responses(con, 4)
+
+        for body, _headers, status in results[:3]:
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(body), {'data': [1]})
+
+        _, headers, status = results[3]
+        self.assertEqual(status, 400)
+        self.assertEqual(headers['connection'], 'close')
+
+    def test_http_edgeql_pipelining_03(self):
+        # Data modifications run after the requests received before them
+        # and before the ones received after them.
+        count = 'select count(Setting filter .name = "pipelined")'
+        queries = [
+            {'query': count},
+            {'query': 'insert Setting { name := "pipelined", value := "1" }'},
+            {'query': count},
+            {'query': 'delete Setting filter .name = "pipelined"'},
+            {'query': count},
+        ]
+
+        with self.http_con() as con:
+            results = self.http_con_pipeline(con, queries)
+
+        counts = [
+            json.loads(body)['data']
+            for i, (body, _headers, _status) in enumerate(results)
+            if i % 2 == 0
+        ]
+        self.assertEqual(counts, [[0], [1], [0]])
+        for _body, _headers, status in results:
+            self.assertEqual(status, 200)
+
+    @unittest.skipUnless(
+        os.environ.get('EDGEDB_TEST_HTTP_BENCHMARK'),
+        'set EDGEDB_TEST_HTTP_BENCHMARK=1 to run HTTP benchmarks')
+    def test_http_edgeql_pipelining_benchmark(self):
+        # The server handles HTTP on a single event loop, so this is
+        # the throughput of one core.
+        depth = 16
+        rounds = 500
+        queries = [{'query': 'select 1'}] * depth
+
+        with self.http_con() as con:
+            # Warm up the caches.
+            self.http_con_pipeline(con, queries)
+
+            started_at = time.monotonic()
+            for _ in range(rounds):
+                self.http_con_pipeline(con, queries)
+            elapsed = time.monotonic() - started_at
+
+        print(
+            f'\n/db/<name>/edgeql: {depth * rounds / elapsed:.0f} '
+            f'requests/sec per core (pipeline depth {depth})',
+            file=sys.stderr,
+        )
@@ -17,6 +17,7 @@
 #
 
 
+import hashlib
 import json
 import os
 import uuid
@@ -130,6 +131,89 @@ class TestGraphQLFunctional(tb.GraphQLTestCase):
             with self.assertRaises(OSError):
                 self.http_con_request(con, {}, path='non-existant')
 
+    def test_graphql_http_persisted_query_01(self):
+        # Persisted queries are stored in the database, so the hash has
+        # to be new for the query to be unknown at first.
+        query = f'''
+            query persisted_01_{uuid.uuid4().hex} {{
+                Setting(order: {{value: {{dir: ASC}}}}) {{
+                    value
+                }}
+            }}
+        '''
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        extensions = json.dumps({
+            'persistedQuery': {'version': 1, 'sha256Hash': query_hash},
+        })
+        expected = {'Setting': [{'value': 'blue'}, {'value': 'full'},
+                                {'value': 'none'}]}
+
+        with self.http_con() as con:
+            data, headers, status = self.http_con_request(
+                con, {'extensions': extensions})
+            self.assertEqual(status, 200)
+            err = json.loads(data)['errors'][0]
+            self.assertIn('PersistedQueryNotFound', err['message'])
+            self.assertEqual(
+                err['extensions'], {'code': 'PERSISTED_QUERY_NOT_FOUND'})
+
+            data, headers, status = self.http_con_request(
+                con, {'query': query, 'extensions': extensions})
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(data)['data'], expected)
+
+            for _ in range(3):
+                data, headers, status = self.http_con_request(
+                    con, {'extensions': extensions})
+                self.assertEqual(status, 200)
+                self.assertEqual(json.loads(data)['data'], expected)
+
+    def test_graphql_http_persisted_query_02(self):
+        query = r'''
+            query persisted_02($name: String) {
+                User(filter: {name: {eq: $name}}) {
+                    name
+                }
+            }
+        '''
+        extensions = {
+            'persistedQuery': {
+                'version': 1,
+                'sha256Hash': hashlib.sha256(query.encode()).hexdigest(),
+            },
+        }
+
+        for use_http_post in [True, False]:
+            self.assert_graphql_query_result(
+                query,
+                {'User': [{'name': 'John'}]},
+                use_http_post=use_http_post,
+                variables={'name': 'John'},
+                extensions=extensions,
+            )
+
+            self.assert_graphql_query_result(
+                None,
+                {'User': [{'name': 'Jane'}]},
+                use_http_post=use_http_post,
+                variables={'name': 'Jane'},
+                extensions=extensions,
+            )
+
+    def test_graphql_http_persisted_query_03(self):
+        extensions = json.dumps({
+            'persistedQuery': {'version': 1, 'sha256Hash': '0' * 64},
+        })
+
+        with self.http_con() as con:
+            data, headers, status = self.http_con_request(
+                con, {'query': '{ Setting { value } }',
+                      'extensions': extensions})
+
+            self.assertEqual(status, 400)
+            self.assertEqual(headers['connection'], 'close')
+            self.assertIn(b'does not match the query', data)
+
     def test_graphql_functional_query_01(self):
         for _ in range(10):  # repeat to test prepared pgcon statements
             self.assert_graphql_query_result(r"""
@@ -34,3 +34,56 @@ class TestHttpSystemAPI(tb.BaseHttpTest, tb_server.ConnectedTestCase):
 
             self.assertEqual(status, 200)
             self.assertIn(b'OK', data)
+
+    def _get_profile(self, headers):
+        with self.http_con() as con:
+            con.request('GET', f'{self.http_addr}/profile', headers=headers)
+            return self.http_con_read_response(con)
+
+    async def test_http_sys_api_profile(self):
+        _, _, status = self._get_profile({})
+        self.assertEqual(status, 401)
+
+        args = self.get_connect_args()
+        token, _, status, _, _ = self.http_scram_auth(
+            args['user'], args['password'])
+        self.assertEqual(status, 200)
+        headers = {
+            'Authorization': f'Bearer {token.decode("ascii")}',
+            'X-EdgeDB-User': args['user'],
+        }
+
+        _, _, status = self._get_profile(
+            {'Authorization': 'Bearer bogus', 'X-EdgeDB-User': args['user']})
+        self.assertEqual(status, 401)
+
+        _, _, status = self._get_profile(headers)
+        self.assertEqual(status, 404)
+
+        await self.con.execute('''
+            CONFIGURE INSTANCE SET sampling_profiler_rate := 1000;
+        ''')
+        try:
+            # Give the profiler some CPU time to sample, compiling
+            # distinct queries keeps the compiler workers busy too.
+            for i in range(50):
+                await self.con.query(
+                    f'SELECT count(schema::Object) + {i}')
+
+            data, resp_headers, status = self._get_profile(headers)
+            self.assertEqual(status, 200)
+            self.assertTrue(
+                resp_headers['content-type'].startswith('text/plain'))
+            lines = data.decode().splitlines()
+            self.assertTrue(lines)
+            for line in lines:
+                stack, _, count = line.rpartition(' ')
+                self.assertRegex(stack, r'^(server|compiler_worker);')
+                self.assertGreater(int(count), 0)
+        finally:
+            await self.con.execute('''
+                CONFIGURE INSTANCE RESET sampling_profiler_rate;
+            ''')
+
+        _, _, status = self._get_profile(headers)
+        self.assertEqual(status, 404)
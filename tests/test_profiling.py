@@ -21,10 +21,13 @@ from typing import *  # NoQA
 
 import pathlib
 import tempfile
+import time
 import unittest
 import unittest.mock
 
+from edb.common import sampler
 from edb.tools import profiling
+from edb.tools.profiling import profiler as profiling_profiler
 
 
 class FakeAtexit:
@@ -39,6 +42,12 @@ def regular_function(arg):
     return hash(arg)
 
 
+def busy_function(seconds):
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        pass
+
+
 class ProfilingTestCase(unittest.TestCase):
     def test_tools_profiling_basic(self) -> None:
         atexit = FakeAtexit()
@@ -87,3 +96,40 @@ class ProfilingTestCase(unittest.TestCase):
             out_contents = out.read()
             self.assertIn("profiled_function", out_contents)
             self.assertIn("regular_function", out_contents)
+
+    def test_tools_profiling_sampler(self) -> None:
+        s = sampler.StackSampler("test")
+        s.start(1000)
+        try:
+            busy_function(0.2)
+        finally:
+            s.stop()
+        stacks = s.collect()
+        # stop() discards whatever was not collected yet
+        self.assertEqual(stacks, {})
+
+        s.start(1000)
+        try:
+            busy_function(0.2)
+            stacks = s.collect()
+        finally:
+            s.stop()
+        self.assertEqual(s.rate, 0)
+
+        self.assertTrue(stacks)
+        self.assertTrue(all(st.startswith("test;") for st in stacks))
+        self.assertTrue(any("busy_function (" in st for st in stacks))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = profiling_profiler.parse_collapsed(
+                sampler.format_collapsed(stacks).splitlines()
+            )
+            self.assertEqual(root.samples, sum(stacks.values()))
+            self.assertEqual(
+                list(root.callees), [("~", 0, "test")]
+            )
+
+            out_file = pathlib.Path(tmpdir) / "flamegraph.svg"
+            profiling_profiler.render_collapsed_svg(root, out_file)
+            with out_file.open() as out:
+                self.assertIn("busy_function", out.read())
@@ -130,6 +130,80 @@ class TestProtocol(ProtocolTestCase):
             transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
         )
 
+    async def test_proto_execute_pipelined(self):
+        await self.con.connect()
+
+        # Only cached queries get pipelined, so run them once first.
+        await self._execute('SELECT 1')
+        await self.con.recv_match(protocol.CommandComplete, status='SELECT')
+        await self.con.recv_match(protocol.ReadyForCommand)
+        await self._execute('SELECT 1/0')
+        await self.con.recv_match(
+            protocol.ErrorResponse,
+            message='division by zero'
+        )
+        await self.con.recv_match(protocol.ReadyForCommand)
+
+        def execute(command_text):
+            return protocol.Execute(
+                annotations=[],
+                allowed_capabilities=protocol.Capability.ALL,
+                compilation_flags=protocol.CompilationFlag(0),
+                implicit_limit=0,
+                command_text=command_text,
+                output_format=protocol.OutputFormat.NONE,
+                expected_cardinality=protocol.Cardinality.MANY,
+                input_typedesc_id=b'\0' * 16,
+                output_typedesc_id=b'\0' * 16,
+                state_typedesc_id=b'\0' * 16,
+                arguments=b'',
+                state_data=b'',
+            )
+
+        # A failed query doesn't affect the ones queued after it,
+        # and a query that can't be pipelined is still run in order.
+        await self.con.send(
+            execute('SELECT 1'), protocol.Sync(),
+            execute('SELECT 1/0'), protocol.Sync(),
+            execute('SELECT 1'), protocol.Sync(),
+            execute('START TRANSACTION'), protocol.Sync(),
+            execute('SELECT 1'), protocol.Sync(),
+            execute('ROLLBACK'), protocol.Sync(),
+        )
+        await self.con.recv_match(protocol.CommandComplete, status='SELECT')
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
+        )
+        await self.con.recv_match(
+            protocol.ErrorResponse,
+            message='division by zero'
+        )
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
+        )
+        await self.con.recv_match(protocol.CommandComplete, status='SELECT')
+        await self.con.recv_match(protocol.ReadyForCommand)
+        await self.con.recv_match(
+            protocol.CommandComplete,
+            status='START TRANSACTION'
+        )
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.IN_TRANSACTION,
+        )
+        await self.con.recv_match(protocol.CommandComplete, status='SELECT')
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.IN_TRANSACTION,
+        )
+        await self.con.recv_match(protocol.CommandComplete, status='ROLLBACK')
+        await self.con.recv_match(
+            protocol.ReadyForCommand,
+            transaction_state=protocol.TransactionState.NOT_IN_TRANSACTION,
+        )
+
     async def test_proto_flush_01(self):
 
         await self.con.connect()
@@ -20,7 +20,12 @@
 from __future__ import annotations
 from typing import *
 
+import os
+import pickle
 import re
+import sys
+import time
+import unittest
 
 from edb import errors
 
@@ -34,13 +39,11 @@ from edb.schema import ddl as s_ddl
 from edb.schema import links as s_links
 from edb.schema import name as s_name
 from edb.schema import objtypes as s_objtypes
+from edb.schema import schema as s_schema
 
 from edb.testbase import lang as tb
 from edb.tools import test
 
-if TYPE_CHECKING:
-    from edb.schema import schema as s_schema
-
 
 class TestSchema(tb.BaseSchemaLoadTest):
     DEFAULT_MODULE = 'test'
@@ -2003,6 +2006,167 @@ class TestSchema(tb.BaseSchemaLoadTest):
             }
         """
 
+    def test_schema_delta_01(self):
+        schema = self.load_schema("""
+            type Object1 {
+                property name -> str
+            };
+            type Object2;
+        """)
+
+        new_schema = self.run_ddl(schema, '''
+            ALTER TYPE test::Object1 CREATE PROPERTY title -> str;
+            CREATE TYPE test::Object3 EXTENDING test::Object1;
+            DROP TYPE test::Object2;
+        ''')
+
+        delta = new_schema.get_delta(schema)
+        changed = delta.get_changed_object_ids()
+        self.assertIn(schema.get('test::Object2').id, changed)
+        self.assertNotIn(schema.get('std::str').id, changed)
+        self.assertLess(len(changed), new_schema.get_object_count() // 10)
+
+        # Compiler workers apply deltas to their own copy of the schema.
+        base = pickle.loads(pickle.dumps(schema, -1))
+        delta = pickle.loads(pickle.dumps(delta, -1))
+        restored = base.apply_delta(delta)
+
+        self.assertIsNone(restored.get('test::Object2', default=None))
+        obj1 = restored.get('test::Object1')
+        obj3 = restored.get('test::Object3')
+        self.assertIsNotNone(
+            obj1.getptr(restored, s_name.UnqualName('title')))
+        self.assertTrue(obj3.issubclass(restored, obj1))
+        self.assertIn(obj3, restored.get_referrers(obj1))
+
+        with self.assertRaises(ValueError):
+            restored.apply_delta(delta)
+
+    def _get_objects_by_scan(self, schema, **kwargs):
+        # What get_objects() returns, without the object index.
+        ids = [obj.id for obj in schema.get_objects(exclude_internal=False)]
+        kwargs.setdefault('included_modules', None)
+        kwargs.setdefault('excluded_modules', None)
+        return s_schema.SchemaIterator(schema, ids, **kwargs)
+
+    def test_schema_get_objects_01(self):
+        schema = self.load_schema("""
+            type Object1 {
+                property name -> str
+            };
+            abstract type Object2;
+            scalar type Scalar1 extending str;
+        """)
+        schema.get_objects()
+
+        schema = self.run_ddl(schema, '''
+            CREATE TYPE test::Object3 EXTENDING test::Object1;
+            ALTER TYPE test::Object1 RENAME TO test::Object4;
+            CREATE MODULE other;
+            CREATE TYPE other::Object5;
+        ''')
+
+        for kwargs in [
+            {},
+            {'exclude_internal': False},
+            {'exclude_stdlib': True},
+            {'exclude_global': True},
+            {'type': s_objtypes.ObjectType},
+            {'type': s_objtypes.ObjectType, 'exclude_stdlib': True},
+            {'type': s_links.Link, 'exclude_stdlib': True},
+            {'included_modules': [s_name.UnqualName('test')]},
+            {'excluded_modules': [s_name.UnqualName('test')]},
+            {
+                'type': s_objtypes.ObjectType,
+                'included_modules': [s_name.UnqualName('other')],
+            },
+        ]:
+            with self.subTest(**kwargs):
+                objs = list(schema.get_objects(**kwargs))
+                self.assertEqual(len(objs), len(set(objs)))
+                self.assertEqual(
+                    set(objs),
+                    set(self._get_objects_by_scan(schema, **kwargs)),
+                )
+
+        names = {
+            str(obj.get_name(schema))
+            for obj in schema.get_objects(
+                type=s_objtypes.ObjectType, exclude_stdlib=True)
+        }
+        self.assertIn('test::Object4', names)
+        self.assertIn('other::Object5', names)
+        self.assertNotIn('test::Object1', names)
+        self.assertNotIn('std::BaseObject', names)
+
+    def test_schema_memo_01(self):
+        schema = self.load_schema("""
+            type Object1;
+            type Object2 extending Object1;
+        """)
+        obj1 = schema.get('test::Object1')
+        obj2 = schema.get('test::Object2')
+        stats = s_schema.MEMO_STATS['referrers']
+
+        self.assertIn(obj2, schema.get_referrers(obj1))
+        hits = stats.hits
+        schema.get_referrers(obj1)
+        self.assertEqual(stats.hits, hits + 1)
+
+        # Schemas derived without changing any reference share
+        # the memoized referrers.
+        new_schema = schema.set_obj_field(obj2, 'abstract', True)
+        self.assertIn(obj2, new_schema.get_referrers(obj1))
+        self.assertEqual(stats.hits, hits + 2)
+
+        new_schema = self.run_ddl(new_schema, '''
+            CREATE TYPE test::Object3 EXTENDING test::Object1;
+        ''')
+        obj3 = new_schema.get('test::Object3')
+        self.assertIn(obj3, new_schema.get_referrers(obj1))
+        self.assertNotIn(obj3, schema.get_referrers(obj1))
+
+        restored = pickle.loads(pickle.dumps(new_schema, -1))
+        self.assertIsNone(restored._memo)
+        self.assertEqual(
+            restored.get_referrers(obj1),
+            new_schema.get_referrers(obj1),
+        )
+
+    @unittest.skipUnless(
+        os.environ.get('EDGEDB_TEST_SCHEMA_BENCHMARK'),
+        'set EDGEDB_TEST_SCHEMA_BENCHMARK=1 to run schema benchmarks')
+    def test_schema_get_objects_benchmark(self):
+        schema = self.load_schema(''.join(
+            f"""
+                type Object{i} {{
+                    property name -> str;
+                    property value -> int64;
+                    link next -> Object{i + 1};
+                }};
+            """
+            for i in range(2000)
+        ) + 'type Object2000;')
+
+        def measure(get_objects):
+            rounds = 20
+            started_at = time.monotonic()
+            for _ in range(rounds):
+                count = sum(1 for _ in get_objects())
+            return (time.monotonic() - started_at) / rounds, count
+
+        kwargs = dict(type=s_objtypes.ObjectType, exclude_stdlib=True)
+        indexed, count = measure(lambda: schema.get_objects(**kwargs))
+        scan, _ = measure(
+            lambda: self._get_objects_by_scan(schema, **kwargs))
+
+        print(
+            f'\nget_objects(type=ObjectType, exclude_stdlib=True): '
+            f'{count} of {schema.get_object_count()} objects in '
+            f'{indexed * 1000:.2f}ms, {scan * 1000:.2f}ms with a full scan',
+            file=sys.stderr,
+        )
+
 
 class TestGetMigration(tb.BaseSchemaLoadTest):
     """Test migration deparse consistency.
@@ -25,14 +25,19 @@ import subprocess
 import sys
 import tempfile
 import time
+from unittest import mock
+
+import immutables
 
 from edb import edgeql
 from edb.testbase import lang as tb
 from edb.testbase import server as tbs
 from edb.server import args as edbargs
+from edb.server import defines
 from edb.server import compiler as edbcompiler
 from edb.server.compiler_pool import amsg
 from edb.server.compiler_pool import pool
+from edb.server.compiler_pool import queue
 from edb.server.dbview import dbview
 
 
@@ -42,6 +47,8 @@ class TestServerCompiler(tb.BaseSchemaLoadTest):
         type Foo {
             property bar -> str;
         }
+
+        type SubFoo extending Foo;
     '''
 
     @classmethod
@@ -66,6 +73,65 @@ class TestServerCompiler(tb.BaseSchemaLoadTest):
             ''',
         )
 
+    def test_server_compiler_changed_schema_objects_01(self):
+        compiler = tb.new_compiler()
+        context = edbcompiler.new_compiler_context(
+            user_schema=self.schema,
+            modaliases={None: 'default'},
+        )
+
+        unit_group = compiler._compile(
+            ctx=context,
+            source=edgeql.Source.from_string('''
+                CREATE TYPE Baz {
+                    CREATE LINK foo -> Foo;
+                };
+            '''),
+        )
+        # The unit only carries the changes, not the whole new schema.
+        self.assertIsNone(unit_group[0].user_schema)
+        changed = unit_group[0].changed_schema_objects
+        self.assertIsNotNone(changed)
+
+        # Foo itself is not altered, but queries on it and on its
+        # descendants have new backlinks to resolve.
+        for name in ('default::Foo', 'default::SubFoo'):
+            with self.subTest(name=name):
+                self.assertIn(self.schema.get(name).id, changed.ids)
+
+    def test_server_compiler_changed_schema_objects_02(self):
+        compiler = tb.new_compiler()
+        context = edbcompiler.new_compiler_context(
+            user_schema=self.schema,
+            modaliases={None: 'default'},
+        )
+
+        def compile(eql):
+            unit_group = compiler._compile(
+                ctx=context,
+                source=edgeql.Source.from_string(eql),
+            )
+            return unit_group[0]
+
+        compile('START TRANSACTION')
+
+        # DDL in a transaction block carries the new schema, but the
+        # changes are only computed once, when committing.
+        for eql in ('CREATE TYPE Baz', 'CREATE TYPE Qux'):
+            unit = compile(eql)
+            self.assertIsNotNone(unit.user_schema)
+            self.assertIsNone(unit.changed_schema_objects)
+
+        unit = compile('COMMIT')
+        self.assertIsNone(unit.user_schema)
+        changed = unit.changed_schema_objects
+        self.assertIsNotNone(changed)
+
+        schema = context.state.current_tx().get_schema(self._std_schema)
+        for name in ('default::Baz', 'default::Qux'):
+            with self.subTest(name=name):
+                self.assertIn(schema.get(name).id, changed.ids)
+
 
 class ServerProtocol(amsg.ServerProtocol):
     def __init__(self):
@@ -421,3 +487,202 @@ class TestCompilerPool(tbs.TestCase):
                 ) for _ in range(4)))
             finally:
                 await pool_.stop()
+
+    async def test_server_compiler_pool_shared_schemas(self):
+        with tempfile.TemporaryDirectory() as td:
+            pool_ = await pool.create_compiler_pool(
+                runstate_dir=td,
+                pool_size=2,
+                dbindex=dbview.DatabaseIndex(
+                    None,
+                    std_schema=self._std_schema,
+                    global_schema=None,
+                    sys_config={},
+                ),
+                backend_runtime_params=None,
+                std_schema=self._std_schema,
+                refl_schema=self._refl_schema,
+                schema_class_layout=self._schema_class_layout,
+                shared_schemas=True,
+            )
+            snapshots_dir = pool_._snapshots._path
+            try:
+                self.assertTrue(os.listdir(snapshots_dir))
+
+                context = edbcompiler.new_compiler_context(
+                    user_schema=self._std_schema,
+                    modaliases={None: 'default'},
+                )
+                await pool_.compile_in_tx(
+                    context.state.current_tx().id,
+                    pickle.dumps(context.state),
+                    0,
+                    edgeql.Source.from_string('SELECT 123'),
+                    edbcompiler.OutputFormat.BINARY,
+                    False, 101, False, True, False, (0, 12), True
+                )
+            finally:
+                await pool_.stop()
+
+            self.assertFalse(os.path.exists(snapshots_dir))
+
+    async def test_server_compiler_pool_tx_state(self):
+        with tempfile.TemporaryDirectory() as td:
+            pool_ = await pool.create_compiler_pool(
+                runstate_dir=td,
+                pool_size=2,
+                dbindex=dbview.DatabaseIndex(
+                    None,
+                    std_schema=self._std_schema,
+                    global_schema=None,
+                    sys_config={},
+                ),
+                backend_runtime_params=None,
+                std_schema=self._std_schema,
+                refl_schema=self._refl_schema,
+                schema_class_layout=self._schema_class_layout,
+            )
+            try:
+                context = edbcompiler.new_compiler_context(
+                    user_schema=self._std_schema,
+                    modaliases={None: 'default'},
+                )
+                context.state.start_tx()
+                txid = context.state.current_tx().id
+
+                async def compile(tx_state, query):
+                    _, tx_state, _ = await pool_.compile_in_tx(
+                        txid,
+                        tx_state,
+                        0,
+                        edgeql.Source.from_string(query),
+                        edbcompiler.OutputFormat.BINARY,
+                        False, 101, False, True, False, (0, 12), True
+                    )
+                    return tx_state
+
+                tx_state = await compile(
+                    pickle.dumps(context.state), 'SELECT 1')
+                self.assertEqual(tx_state.seq, 1)
+                self.assertEqual(len(tx_state.replay), 1)
+
+                # The worker keeps the state, so the next statements
+                # go to it and the state is not shipped again.
+                worker = next(
+                    w for w in pool_._workers.values()
+                    if tx_state.handle in w._tx_states
+                )
+                tx_state = await compile(tx_state, 'SELECT 2')
+                self.assertEqual(worker._tx_states[tx_state.handle], 2)
+                self.assertEqual(len(tx_state.replay), 2)
+
+                # DDL cannot be replayed, so the state is pickled back.
+                tx_state = await compile(tx_state, 'CREATE MODULE foo')
+                self.assertEqual(tx_state.seq, 3)
+                self.assertEqual(tx_state.replay, ())
+
+                tx_state = await compile(tx_state, 'SELECT 3')
+                self.assertEqual(len(tx_state.replay), 1)
+
+                # Another worker rebuilds the state of the lost one.
+                pool_._ready_evt.clear()
+                os.kill(worker.get_pid(), signal.SIGTERM)
+                await asyncio.wait_for(pool_._ready_evt.wait(), 10)
+                tx_state = await compile(tx_state, 'SELECT 4')
+                self.assertEqual(tx_state.seq, 5)
+                self.assertEqual(len(tx_state.replay), 2)
+            finally:
+                await pool_.stop()
+
+    async def test_server_compiler_pool_evict_dbs(self):
+        with tempfile.TemporaryDirectory() as td:
+            pool_ = await pool.create_compiler_pool(
+                runstate_dir=td,
+                pool_size=1,
+                dbindex=dbview.DatabaseIndex(
+                    None,
+                    std_schema=self._std_schema,
+                    global_schema=None,
+                    sys_config={},
+                ),
+                backend_runtime_params=None,
+                std_schema=self._std_schema,
+                refl_schema=self._refl_schema,
+                schema_class_layout=self._schema_class_layout,
+            )
+            try:
+                async def compile(dbname):
+                    await pool_.compile(
+                        dbname,
+                        self._std_schema,
+                        self._std_schema,
+                        immutables.Map(),
+                        immutables.Map(),
+                        immutables.Map(),
+                        edgeql.Source.from_string('SELECT 1'),
+                        None, None,
+                        edbcompiler.OutputFormat.BINARY,
+                        False, 101, False, True, False, (1, 0),
+                    )
+
+                worker = next(iter(pool_._workers.values()))
+                size = pool_._estimate_schema_size(self._std_schema)
+                with mock.patch.object(
+                    defines, 'BACKEND_COMPILER_WORKER_DBS_SIZE', size * 2
+                ):
+                    await compile('a')
+                    await compile('b')
+                    self.assertEqual(list(worker._dbs.keys()), ['a', 'b'])
+
+                    await compile('a')
+                    await compile('c')
+                    # 'b' is the least recently used database.
+                    self.assertEqual(list(worker._db_sizes), ['a', 'c'])
+                    self.assertEqual(set(worker._dbs.keys()), {'a', 'c'})
+
+                    # The evicted database gets its state sent in full.
+                    preargs, _ = await pool_._compute_compile_preargs(
+                        worker, 'b', self._std_schema, self._std_schema,
+                        immutables.Map(), immutables.Map(), immutables.Map(),
+                    )
+                    self.assertEqual(preargs[:2], ('b', ('a',)))
+                    self.assertIsNotNone(preargs[2])
+            finally:
+                await pool_.stop()
+
+
+class TestWorkerQueue(tbs.TestCase):
+
+    async def test_server_compiler_pool_queue_fairness(self):
+        workers = queue.WorkerQueue(asyncio.get_running_loop())
+        order = []
+
+        async def request(name, lane, key):
+            worker = await workers.acquire(lane=lane, key=key)
+            order.append(name)
+            await asyncio.sleep(0)
+            workers.release(worker)
+
+        tasks = [
+            asyncio.create_task(request(name, lane, key))
+            for name, lane, key in [
+                ('a0', queue.Lane.Compile, 'a'),
+                ('a1', queue.Lane.Compile, 'a'),
+                ('h0', queue.Lane.Heavy, 'a'),
+                ('a2', queue.Lane.Compile, 'a'),
+                ('a3', queue.Lane.Compile, 'a'),
+                ('a4', queue.Lane.Compile, 'a'),
+                ('b0', queue.Lane.Compile, 'b'),
+            ]
+        ]
+        await asyncio.sleep(0.01)
+        self.assertEqual(workers.count_waiters(), 7)
+
+        workers.release(object())
+        await asyncio.gather(*tasks)
+
+        # Databases take turns in a lane, and the heavy lane is only
+        # served after the compile lane has been preferred a few times.
+        self.assertEqual(
+            order, ['a0', 'b0', 'a1', 'a2', 'h0', 'a3', 'a4'])
+        self.assertEqual(workers.count_waiters(), 0)
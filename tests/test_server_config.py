@@ -1048,6 +1048,16 @@ class TestServerConfig(tb.QueryTestCase):
                     durprop := '12 seconds'
             ''')
 
+    async def test_server_proto_configure_invalid_bounds(self):
+        with self.assertRaisesRegex(
+                edgedb.ConfigurationError,
+                r"invalid setting value for sampling_profiler_rate: "
+                r"maximum allowed value is 10000"):
+            await self.con.execute('''
+                configure instance set
+                    sampling_profiler_rate := 1000000
+            ''')
+
     async def test_server_proto_configure_invalid_enum(self):
         with self.assertRaisesRegex(
             edgedb.InvalidValueError,
@@ -346,6 +346,105 @@ class TestServerOps(tb.TestCase):
             finally:
                 await con.aclose()
 
+    async def test_server_ops_backend_stream_row_limit(self):
+        async with tb.start_edgedb_server(
+            env={'EDGEDB_SERVER_BACKEND_STREAM_ROW_LIMIT': '7'},
+        ) as sd:
+            con = await sd.connect()
+            try:
+                # No rows, exactly one batch, and many batches.
+                for num in (0, 7, 100):
+                    result = await con.query(
+                        'SELECT array_unpack(<array<int64>>$0)',
+                        list(range(num)),
+                    )
+                    self.assertEqual(list(result), list(range(num)))
+
+                # An error in a later batch must not wreck the connection.
+                with self.assertRaises(errors.DivisionByZeroError):
+                    await con.query(
+                        'SELECT 1 // (50 - array_unpack(<array<int64>>$0))',
+                        list(range(100)),
+                    )
+                self.assertEqual(await con.query_single('SELECT 1'), 1)
+            finally:
+                await con.aclose()
+
+    async def test_server_ops_dump_parallelism(self):
+        async with tb.start_edgedb_server(
+            env={'EDGEDB_SERVER_DUMP_PARALLELISM': '3'},
+        ) as sd:
+            con = await sd.connect()
+            try:
+                await con.execute('CREATE DATABASE dump_src')
+                await con.execute('CREATE DATABASE dump_tgt')
+            finally:
+                await con.aclose()
+
+            con = await sd.connect(database='dump_src')
+            try:
+                for name in ('A', 'B', 'C', 'D'):
+                    await con.execute(f'''
+                        CREATE TYPE {name} {{
+                            CREATE PROPERTY val -> int64;
+                        }};
+                        FOR x IN {{range_unpack(range(0, 1000))}}
+                        UNION (INSERT {name} {{ val := x }});
+                    ''')
+            finally:
+                await con.aclose()
+
+            with tempfile.NamedTemporaryFile() as f:
+                tb.CLITestCaseMixin.run_cli_on_connection(
+                    sd.get_connect_args(database='dump_src'),
+                    'dump', f.name,
+                )
+                tb.CLITestCaseMixin.run_cli_on_connection(
+                    sd.get_connect_args(database='dump_tgt'),
+                    'restore', f.name,
+                )
+
+            con = await sd.connect(database='dump_tgt')
+            try:
+                for name in ('A', 'B', 'C', 'D'):
+                    self.assertEqual(
+                        await con.query_single(f'SELECT sum({name}.val)'),
+                        sum(range(1000)),
+                    )
+            finally:
+                await con.aclose()
+
+    async def test_server_ops_frontend_processes(self):
+        async with tb.start_edgedb_server(
+            env={'EDGEDB_SERVER_FRONTEND_PROCESSES': '2'},
+        ) as sd:
+            # The kernel spreads the connections over both processes.
+            cons = [await sd.connect() for _ in range(8)]
+            try:
+                await cons[0].execute('''
+                    CREATE TYPE Frontend {
+                        CREATE PROPERTY num -> int64;
+                    };
+                ''')
+
+                # The schema change is signaled to the other process,
+                # which may take a moment to pick it up.
+                for i, con in enumerate(cons):
+                    async for tr in self.try_until_succeeds(
+                            ignore=errors.InvalidReferenceError):
+                        async with tr:
+                            await con.execute(
+                                f'INSERT Frontend {{ num := {i} }}')
+
+                for con in cons:
+                    self.assertEqual(
+                        await con.query_single('SELECT sum(Frontend.num)'),
+                        sum(range(len(cons))),
+                    )
+            finally:
+                for con in cons:
+                    await con.aclose()
+
     async def test_server_ops_detect_postgres_pool_size(self):
         actual = random.randint(50, 100)
 
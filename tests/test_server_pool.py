@@ -430,6 +430,14 @@ class SingleBlockPool(pool_impl.BasePool[C]):
         return len(self._queue._getters)
 
 
+class ReactivePool(connpool.Pool[C]):
+    # The regular pool without warm spare connections, used as a baseline
+    # to tell how much the prediction helps.
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(spare_conns=0, **kwargs)
+
+
 class SimulatedCase(unittest.TestCase, metaclass=SimulatedCaseMeta):
     full_qps: typing.Optional[int] = None  # set by the base test
 
@@ -586,7 +594,7 @@ class SimulatedCase(unittest.TestCase, metaclass=SimulatedCaseMeta):
             )
 
     async def simulate_and_collect_stats(self, testname, spec):
-        pools = [connpool.Pool, connpool._NaivePool]
+        pools = [connpool.Pool, ReactivePool, connpool._NaivePool]
 
         js_data = []
         for pool_cls in pools:
@@ -1290,6 +1298,130 @@ class TestServerConnpoolSimulation(SimulatedCase):
             ]
         )
 
+    def test_server_connpool_11(self):
+        return Spec(
+            desc='''
+            This is a test for the warm spare connections in Mode A. A single
+            database gets a steady trickle of queries with periodic spikes on
+            top of it, and connecting is expensive. The pool should see the
+            load rising and open connections ahead of it, so that the queries
+            at the spike fronts don't wait for a whole connect round trip.
+            Ramp-ups (t1) are easier to predict than sudden steps (t0).
+            ''',
+            timeout=20,
+            duration=1.1,
+            capacity=100,
+            conn_cost_base=0.1,
+            conn_cost_var=0.02,
+            score=[
+                AbsoluteLatency(
+                    weight=0.3, group=range(1), percentile='P99',
+                    v100=0.05, v90=0.1, v60=0.15, v0=0.3,
+                ),
+                AbsoluteLatency(
+                    weight=0.3, group=range(1, 2), percentile='P99',
+                    v100=0.05, v90=0.1, v60=0.15, v0=0.3,
+                ),
+                AbsoluteLatency(
+                    weight=0.3, group=range(2), percentile='P75',
+                    v100=0.001, v90=0.005, v60=0.02, v0=0.1,
+                ),
+                ConnectionOverhead(
+                    weight=0.1, v100=30, v90=60, v60=100, v0=200
+                ),
+            ],
+            dbs=[
+                DBSpec(
+                    db='t0',
+                    start_at=0,
+                    end_at=1.0,
+                    qps=100,
+                    query_cost_base=0.02,
+                    query_cost_var=0.005,
+                ),
+            ] + [
+                DBSpec(
+                    db='t0',
+                    start_at=start_at,
+                    end_at=start_at + 0.15,
+                    qps=600,
+                    query_cost_base=0.02,
+                    query_cost_var=0.005,
+                ) for start_at in (0.2, 0.5, 0.8)
+            ] + [
+                DBSpec(
+                    db='t1',
+                    start_at=0,
+                    end_at=1.0,
+                    qps=100,
+                    query_cost_base=0.02,
+                    query_cost_var=0.005,
+                ),
+            ] + [
+                DBSpec(
+                    db='t1',
+                    start_at=start_at + i * 0.03,
+                    end_at=start_at + 0.15,
+                    qps=100,
+                    query_cost_base=0.02,
+                    query_cost_var=0.005,
+                ) for start_at in (0.2, 0.5, 0.8) for i in range(5)
+            ]
+        )
+
+    def test_server_connpool_12(self):
+        return Spec(
+            desc='''
+            This is a test for the warm spare connections in Mode B. Several
+            databases (t0-t3) ramp their load up one after another, then down
+            again, without the pool ever reaching its max capacity. The hot
+            blocks should get their connections ahead of demand, while the
+            spare ones should decay as the load falls. t4 is a constantly
+            running reference block, which keeps the pool ticking until the
+            end, so that the ending capacity tells how well the spares decay.
+            ''',
+            timeout=20,
+            duration=1.5,
+            capacity=200,
+            conn_cost_base=0.08,
+            conn_cost_var=0.02,
+            score=[
+                AbsoluteLatency(
+                    weight=0.4, group=range(4), percentile='P99',
+                    v100=0.05, v90=0.1, v60=0.15, v0=0.3,
+                ),
+                AbsoluteLatency(
+                    weight=0.3, group=range(4), percentile='P75',
+                    v100=0.001, v90=0.005, v60=0.02, v0=0.1,
+                ),
+                EndingCapacity(
+                    weight=0.2, v100=4, v90=10, v60=20, v0=50,
+                ),
+                ConnectionOverhead(
+                    weight=0.1, v100=60, v90=120, v60=200, v0=400
+                ),
+            ],
+            dbs=[
+                DBSpec(
+                    db=f't{i}',
+                    start_at=i * 0.1 + j * 0.04,
+                    end_at=i * 0.1 + 0.6 - j * 0.04,
+                    qps=80,
+                    query_cost_base=0.02,
+                    query_cost_var=0.005,
+                ) for i in range(4) for j in range(5)
+            ] + [
+                DBSpec(
+                    db='t4',
+                    start_at=0,
+                    end_at=1.4,
+                    qps=50,
+                    query_cost_base=0.02,
+                    query_cost_var=0.005,
+                ),
+            ]
+        )
+
 
 class TestServerConnectionPool(unittest.TestCase):
 
@@ -1407,6 +1539,49 @@ class TestServerConnectionPool(unittest.TestCase):
 
         asyncio.run(main())
 
+    def test_connpool_affinity(self):
+        async def test():
+            pool = connpool.Pool(
+                connect=self.make_fake_connect(),
+                disconnect=self.make_fake_disconnect(),
+                max_capacity=5,
+            )
+
+            conns = [await pool.acquire('aaa') for _ in range(3)]
+            for conn, affinity in zip(conns, ['a', 'b', None]):
+                pool.release('aaa', conn, affinity=affinity)
+            block = pool._blocks['aaa']
+            self.assertEqual(block.idle_affinities, {'a': 1, 'b': 1})
+
+            # The connection with the requested affinity is preferred
+            # over the top of the stack.
+            conn = await pool.acquire('aaa', affinity='a')
+            self.assertIs(conn, conns[0])
+            self.assertEqual(block.idle_affinities, {'b': 1})
+            pool.release('aaa', conn, affinity='c')
+
+            # Without a match, the most recently used one is yielded.
+            conn = await pool.acquire('aaa', affinity='x')
+            self.assertIs(conn, conns[0])
+            pool.release('aaa', conn, affinity='b')
+            self.assertEqual(block.idle_affinities, {'b': 2})
+
+            conn = await pool.acquire('aaa', affinity='b')
+            self.assertIs(conn, conns[0])
+            conn2 = await pool.acquire('aaa', affinity='b')
+            self.assertIs(conn2, conns[1])
+            self.assertEqual(block.idle_affinities, {})
+            pool.release('aaa', conn)
+            pool.release('aaa', conn2)
+
+            await pool.prune_inactive_connections('aaa')
+            self.assertEqual(block.idle_affinities, {})
+
+        async def main():
+            await asyncio.wait_for(test(), timeout=5)
+
+        asyncio.run(main())
+
     class MockLogger(logging.Logger):
         logs: asyncio.Queue
 
@@ -19,6 +19,7 @@
 import asyncio
 import decimal
 import json
+import re
 import uuid
 import unittest
 
@@ -2250,6 +2251,86 @@ class TestServerProtoDdlPropagation(tb.QueryTestCase):
 
             await con2.aclose()
 
+    @unittest.skipUnless(devmode.is_in_dev_mode(),
+                         'the test requires devmode')
+    async def test_server_proto_ddlprop_incremental_01(self):
+        # An adjacent server only reloads the objects changed by a DDL,
+        # and must end up with the same schema as a full introspection.
+        conargs = self.get_connect_args()
+
+        await self.con.execute('''
+            CREATE TYPE IncrAltered {
+                CREATE PROPERTY foo -> str;
+            };
+            CREATE TYPE IncrDeleted;
+        ''')
+
+        server_args = {}
+        if self.backend_dsn:
+            server_args['backend_dsn'] = self.backend_dsn
+        else:
+            server_args['adjacent_to'] = self.con
+
+        async def describe(con):
+            return await con.query_single(
+                'DESCRIBE MODULE default AS DDL')
+
+        async with tb.start_edgedb_server(**server_args) as sd:
+            con2 = await sd.connect(
+                user=conargs.get('user'),
+                password=conargs.get('password'),
+                database=self.get_database_name(),
+            )
+            try:
+                await self.con.execute('''
+                    ALTER TYPE IncrAltered {
+                        CREATE PROPERTY bar -> int64;
+                    };
+                    CREATE TYPE IncrCreated {
+                        CREATE LINK altered -> IncrAltered;
+                    };
+                    DROP TYPE IncrDeleted;
+                ''')
+
+                async for tr in self.try_until_succeeds(
+                    ignore=(edgedb.InvalidReferenceError, AssertionError),
+                    timeout=30,
+                ):
+                    async with tr:
+                        await con2.query(
+                            'SELECT IncrCreated { altered: { bar } }')
+                        self.assertEqual(
+                            await describe(con2),
+                            await describe(self.con),
+                        )
+
+                metrics = sd.fetch_metrics()
+                self.assertRegex(
+                    metrics,
+                    r'\nedgedb_server_schema_introspections_total'
+                    r'\{mode="incremental"\} [1-9]',
+                )
+
+                with self.assertRaises(edgedb.InvalidReferenceError):
+                    await con2.query('SELECT IncrDeleted')
+
+                # A server starting now introspects the whole schema.
+                async with tb.start_edgedb_server(**server_args) as sd3:
+                    con3 = await sd3.connect(
+                        user=conargs.get('user'),
+                        password=conargs.get('password'),
+                        database=self.get_database_name(),
+                    )
+                    try:
+                        self.assertEqual(
+                            await describe(con2),
+                            await describe(con3),
+                        )
+                    finally:
+                        await con3.aclose()
+            finally:
+                await con2.aclose()
+
 
 class TestServerProtoDDL(tb.DDLTestCase):
 
@@ -2707,6 +2788,90 @@ class TestServerProtoDDL(tb.DDLTestCase):
         finally:
             await self.con.query('ROLLBACK')
 
+    async def test_server_proto_query_cache_invalidate_10(self):
+        # Creating a link does not alter its target type, but changes
+        # the backlinks of the target and of its descendants.
+        con1 = self.con
+        con2 = await self.connect(database=con1.dbname)
+        try:
+            await con2.execute('''
+                CREATE TYPE CacheInv_10_T;
+                CREATE TYPE CacheInv_10_Sub EXTENDING CacheInv_10_T;
+                CREATE TYPE CacheInv_10_A {
+                    CREATE LINK foo -> CacheInv_10_T;
+                };
+
+                INSERT CacheInv_10_A {
+                    foo := (INSERT CacheInv_10_Sub)
+                };
+            ''')
+
+            queries = [
+                'SELECT count(CacheInv_10_T.<foo)',
+                'SELECT count(CacheInv_10_Sub.<foo)',
+            ]
+
+            for query in queries:
+                for _ in range(5):
+                    self.assertEqual(await con1.query_single(query), 1)
+
+            await con2.execute('''
+                CREATE TYPE CacheInv_10_B {
+                    CREATE LINK foo -> CacheInv_10_T;
+                };
+
+                INSERT CacheInv_10_B {
+                    foo := (SELECT CacheInv_10_Sub LIMIT 1)
+                };
+            ''')
+
+            for query in queries:
+                for _ in range(5):
+                    self.assertEqual(await con1.query_single(query), 2)
+
+        finally:
+            await con2.aclose()
+
+    async def test_server_proto_query_cache_invalidate_11(self):
+        # A DDL only evicts the cached queries depending on the
+        # changed objects.
+        def get_compilations(sd):
+            m = re.search(
+                r'\nedgedb_server_edgeql_query_compilations_total'
+                r'\{path="compiler"\} ([\d.]+)',
+                sd.fetch_metrics(),
+            )
+            return float(m.group(1)) if m else 0.0
+
+        async with tb.start_edgedb_server() as sd:
+            con = await sd.connect()
+            try:
+                await con.execute('''
+                    CREATE TYPE CacheInv_11_Kept {
+                        CREATE PROPERTY name -> str;
+                    };
+                    CREATE TYPE CacheInv_11_Changed;
+                ''')
+
+                kept = 'SELECT CacheInv_11_Kept { name }'
+                changed = 'SELECT CacheInv_11_Changed'
+                await con.query(kept)
+                await con.query(changed)
+
+                await con.execute('''
+                    ALTER TYPE CacheInv_11_Changed {
+                        CREATE PROPERTY name -> str;
+                    };
+                ''')
+
+                compilations = get_compilations(sd)
+                await con.query(kept)
+                self.assertEqual(get_compilations(sd), compilations)
+                await con.query(changed)
+                self.assertEqual(get_compilations(sd), compilations + 1)
+            finally:
+                await con.aclose()
+
     async def test_server_proto_backend_tid_propagation_01(self):
         async with self._run_and_rollback():
             await self.con.execute('''
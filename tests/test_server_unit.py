@@ -17,9 +17,14 @@
 #
 
 
+import pathlib
+import tempfile
 import unittest
 
+from edb.server import frontends
 from edb.server import server
+from edb.server.cache import compiled as compiled_cache
+from edb.server.cache import stmt_cache
 
 
 class TestServerUnittests(unittest.TestCase):
@@ -108,3 +113,105 @@ class TestServerUnittests(unittest.TestCase):
                 (set(expected[0]), set(expected[1]))
             )
             self.assertEqual(tuple(has_wildcards), expected_wildcard)
+
+    def test_server_unittest_split_backend_connections(self):
+        CASES = [
+            (100, 1, [100]),
+            (100, 4, [25, 25, 25, 25]),
+            (10, 3, [4, 3, 3]),
+            (5, 5, [1, 1, 1, 1, 1]),
+            (3, 4, [1, 1, 1, 0]),
+        ]
+
+        for total, nprocs, expected in CASES:
+            split = frontends.split_backend_connections(total, nprocs)
+            self.assertEqual(split, expected)
+            self.assertEqual(sum(split), total)
+
+
+class TestCompiledQueryStore(unittest.TestCase):
+
+    def test_server_unittest_compiled_query_store(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = compiled_cache.CompiledQueryStore(pathlib.Path(td))
+            entries = [(b'key1', 'unit1'), (b'key2', 'unit2')]
+
+            self.assertEqual(store.load('db', b'fp'), [])
+
+            store.save('db', b'fp', entries)
+            self.assertEqual(store.load('db', b'fp'), entries)
+            # Stale fingerprint
+            self.assertEqual(store.load('db', b'fp2'), [])
+            # Other databases are not affected
+            self.assertEqual(store.load('other', b'fp'), [])
+
+            store.save('db', b'fp2', entries[:1])
+            self.assertEqual(store.load('db', b'fp2'), entries[:1])
+            self.assertEqual(store.load('db', b'fp'), [])
+
+            store.discard('db')
+            store.discard('db')
+            self.assertEqual(store.load('db', b'fp2'), [])
+            self.assertEqual(list(pathlib.Path(td).iterdir()), [])
+
+
+class TestSizedStatementsCache(unittest.TestCase):
+
+    def test_server_unittest_sized_stmt_cache(self):
+        cache = stmt_cache.SizedStatementsCache(maxsize=100)
+
+        self.assertEqual(cache.put('a', 1, 40), 0)
+        self.assertEqual(cache.put('b', 2, 40), 0)
+        self.assertEqual(cache.size, 80)
+        self.assertEqual(cache.get('a', None), 1)
+
+        # 'b' is the least recently used entry now.
+        self.assertEqual(cache.put('c', 3, 40), 1)
+        self.assertEqual(cache.size, 80)
+        self.assertIsNone(cache.get('b', None))
+        self.assertEqual(cache.get('c', None), 3)
+
+        # Replacing an entry accounts for its new size.
+        self.assertEqual(cache.put('c', 4, 10), 0)
+        self.assertEqual(cache.size, 50)
+
+        # Entries larger than the cache are not stored at all.
+        self.assertEqual(cache.put('d', 5, 101), 0)
+        self.assertNotIn('d', cache)
+        self.assertEqual(len(cache), 2)
+
+        self.assertEqual(cache.clear(), 2)
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(len(cache), 0)
+
+
+class TestHotStatements(unittest.TestCase):
+
+    def test_server_unittest_hot_statements(self):
+        hot = stmt_cache.HotStatements(maxsize=2)
+        self.assertEqual(hot.generation, 0)
+
+        hot.touch(b'h1', b'SELECT 1', 1)
+        hot.touch(b'h2', b'SELECT 2', 1)
+        self.assertEqual(hot.generation, 2)
+        self.assertEqual(
+            hot.get_statements(1),
+            [(b'h1', b'SELECT 1'), (b'h2', b'SELECT 2')],
+        )
+
+        # Using a known statement doesn't bump the generation,
+        # but protects it from eviction.
+        hot.touch(b'h1', b'SELECT 1', 1)
+        self.assertEqual(hot.generation, 2)
+        hot.touch(b'h3', b'SELECT 3', 1)
+        self.assertEqual(hot.generation, 3)
+        self.assertEqual(
+            hot.get_statements(1),
+            [(b'h1', b'SELECT 1'), (b'h3', b'SELECT 3')],
+        )
+
+        # Statements prepared for another dbver are not returned.
+        hot.touch(b'h1', b'SELECT 1', 2)
+        self.assertEqual(hot.generation, 4)
+        self.assertEqual(hot.get_statements(1), [(b'h3', b'SELECT 3')])
+        self.assertEqual(hot.get_statements(2), [(b'h1', b'SELECT 1')])